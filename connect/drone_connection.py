@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 
 import asyncio
-from mavsdk import System
 
 class DroneConnection:
-    def __init__(self, sys_address: str = "udpin://0.0.0.0:14540"):
+    def __init__(self, sys_address: str = "udpin://0.0.0.0:14540", mavsdk_server_address: str = None,
+                 mavsdk_server_port: int = 50051):
+        from mavsdk import System # Ağır import; sadece bağlantı nesnesi oluşturulurken yüklenir
+
         self.sys_address = sys_address
-        self.drone = System()
+        # mavsdk_server_address verilirse dışarıda çalışan bir mavsdk_server kullanılır (yeni süreç açılmaz)
+        if mavsdk_server_address is not None:
+            self.drone = System(mavsdk_server_address=mavsdk_server_address, port=mavsdk_server_port)
+        else:
+            self.drone = System()
     
     async def connect(self) -> None:
         print(f"Connecting to drone at {self.sys_address}")
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+import time
+from collections import deque
+
+STAMP_MODULO = 2 ** 32 # Paketlerdeki zaman damgası: milisaniye mod 2^32 (~49 gün), 72 bayta sığsın diye
+LATENCY_BUCKETS_MS = (5, 10, 20, 50, 100, 200, 500, 1000, 2000) # Histogram üst sınırları; sonuncusu "daha büyük"
+DEFAULT_SYNC_WINDOW = 16 # Eş başına tutulan senkronizasyon örneği
+DEFAULT_REPLY_TIMEOUT = 5.0 # Saniye; isteğimizden bu kadar sonra gelen cevap eşleştirilmez
+
+def wall_ms(now: float = None) -> int:
+    """Duvar saatini paket damgası biçiminde (ms mod 2^32) döndürür."""
+    if now is None:
+        now = time.time()
+    return int(now * 1000) % STAMP_MODULO
+
+def unwrap_ms(stamp: int, reference: float) -> float:
+    """ms mod 2^32 damgasını, reference (saniye) zamanına en yakın tam zamana (saniye) çevirir."""
+    reference_ms = int(reference * 1000)
+    base = reference_ms - reference_ms % STAMP_MODULO
+    candidates = (base - STAMP_MODULO + stamp, base + stamp, base + STAMP_MODULO + stamp)
+    return min(candidates, key=lambda value: abs(value - reference_ms)) / 1000.0
+
+class LatencyStats:
+    '''Tek yönlü gecikme / bilgi yaşı histogramı (milisaniye kovaları).'''
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.histogram = [0] * (len(self.buckets_ms) + 1)
+        self.samples = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, latency: float):
+        latency_ms = latency * 1000
+        for index, limit in enumerate(self.buckets_ms):
+            if latency_ms <= limit:
+                break
+        else:
+            index = len(self.buckets_ms)
+        self.histogram[index] += 1
+        self.samples += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.samples if self.samples else 0.0
+
+    def summary(self) -> str:
+        labels = [f"<={limit}ms" for limit in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        histogram = ", ".join(f"{label}:{count}" for label, count in zip(labels, self.histogram) if count)
+        return f"{self.samples} örnek, ort={self.mean * 1000:.1f}ms, max={self.max * 1000:.1f}ms | {histogram}"
+
+class PeerClock:
+    '''
+    Bir eşin saat farkı (offset) ve kayma (drift) tahmini.
+    offset = eşin saati - yerel saat. NTP'deki gibi en düşük gidiş-dönüş gecikmeli örnek en güvenilir
+    kabul edilir; kayma, düşük gecikmeli örneklerin offset'lerine doğru uydurularak bulunur.
+    '''
+    def __init__(self, window: int = DEFAULT_SYNC_WINDOW):
+        self.samples = deque(maxlen=window) # (yerel zaman, offset, gidiş-dönüş gecikmesi)
+        self.offset = 0.0
+        self.drift = 0.0 # saniye/saniye
+        self.reference_time = 0.0
+        self.delay = None
+        self.latency = LatencyStats()
+
+    @property
+    def synced(self) -> bool:
+        return bool(self.samples)
+
+    def add_sample(self, t1: float, t2: float, t3: float, t4: float):
+        """
+        t1: isteğin yerel gönderim zamanı, t2: eşin alma zamanı, t3: eşin cevap gönderim zamanı,
+        t4: cevabın yerel alma zamanı.
+        """
+        offset = ((t2 - t1) + (t3 - t4)) / 2
+        delay = (t4 - t1) - (t3 - t2)
+        if delay < 0:
+            return # Damga sarması veya saat sıçraması; örnek güvenilmez
+        self.samples.append(((t1 + t4) / 2, offset, delay))
+        self._estimate()
+
+    def _estimate(self):
+        best_time, best_offset, best_delay = min(self.samples, key=lambda sample: sample[2])
+        self.offset, self.reference_time, self.delay = best_offset, best_time, best_delay
+        # Kayma için sadece gecikmesi en iyiye yakın örnekler kullanılır (kuyrukta beklemiş örnekler atılır)
+        good = [(t, o) for t, o, d in self.samples if d <= best_delay * 2 + 0.005]
+        if len(good) >= 3 and good[-1][0] - good[0][0] >= 1.0:
+            mean_t = sum(t for t, _ in good) / len(good)
+            mean_o = sum(o for _, o in good) / len(good)
+            variance = sum((t - mean_t) ** 2 for t, _ in good)
+            if variance > 0:
+                self.drift = sum((t - mean_t) * (o - mean_o) for t, o in good) / variance
+
+    def set_estimate(self, offset: float, drift: float, reference_time: float, delay: float):
+        """Başka bir süreçte yapılmış tahmini (örn. ayrı radyo süreci) doğrudan yükler."""
+        self.offset, self.drift, self.reference_time, self.delay = offset, drift, reference_time, delay
+        if not self.samples or self.samples[-1][0] != reference_time:
+            self.samples.append((reference_time, offset, delay))
+
+    def offset_at(self, local_time: float) -> float:
+        return self.offset + self.drift * (local_time - self.reference_time)
+
+    def to_local(self, peer_time: float) -> float:
+        """Eşin saatine göre verilmiş bir zamanı yerel saate çevirir."""
+        return peer_time - self.offset_at(peer_time)
+
+class ClockSync:
+    '''
+    'H' el sıkışmaları üzerinden NTP benzeri saat senkronizasyonu.
+    İstek: gönderim anında damgalanan 'H' paketi ('m' alanı); p={"d": hedef} ile sadece hedef cevap verir.
+    Yer istasyonunun isteklerine tüm dronlar cevap verir; kalp atışları damgasızdır ve cevaplanmaz.
+    Cevap: 'H' paketi, p={"b": isteğin alınma zamanı, "d": isteği gönderen}, kendi 'm' damgasıyla.
+    Cevaplar yayınlanabilir (AT modu) veya başka düğümlerce duyulabilir; sadece bize adreslenmiş ("d") ve son
+    isteğimizden (note_request) reply_timeout içinde gelen cevaplar örnek olarak alınır. İsteğin damgası cevapta
+    tekrarlanmaz (hedef id ile birlikte 72 bayta sığmaz); gönderim zamanını istek sahibi kendisi saklar.
+    Damgalı her paket için eşin saat farkıyla tek yönlü gecikme ölçülür.
+    '''
+    def __init__(self, window: int = DEFAULT_SYNC_WINDOW, node_id: str = None,
+                 reply_timeout: float = DEFAULT_REPLY_TIMEOUT):
+        """:param node_id: Bu düğümün id'si; verilmezse cevabın hedefi kontrol edilmez."""
+        self.window = window
+        self.node_id = node_id
+        self.reply_timeout = reply_timeout
+        self.peers = {} # drone_id -> PeerClock
+        self._request_stamp = None # Son gönderdiğimiz isteğin 'm' damgası
+        self.foreign_replies = 0 # Başka düğüme ait veya eşleşmeyen, yok sayılan cevap
+
+    def note_request(self, stamp: int):
+        """Gönderilen damgalı isteğin damgasını kaydeder; cevaplar bu gönderim zamanıyla eşleştirilir."""
+        self._request_stamp = stamp
+
+    def peer(self, peer_id: str) -> PeerClock:
+        clock = self.peers.get(peer_id)
+        if clock is None:
+            clock = self.peers[peer_id] = PeerClock(self.window)
+        return clock
+
+    def handle_handshake(self, record):
+        """
+        Gelen 'H' kaydını işler. İstekse gönderilecek cevabın parametrelerini, değilse None döndürür.
+        """
+        params = record.params
+        if "b" in params:
+            t4 = record.timestamp
+            t1 = unwrap_ms(self._request_stamp, t4) if self._request_stamp is not None else None
+            if ((self.node_id is not None and params.get("d") != self.node_id) or t1 is None
+                    or not 0 <= t4 - t1 <= self.reply_timeout):
+                self.foreign_replies += 1 # Bize ait olmayan cevap; örnek alınırsa saat farkı bozulur
+                return None
+            if record.sent_at is not None:
+                self.peer(record.sender).add_sample(t1, unwrap_ms(params["b"], t4), unwrap_ms(record.sent_at, t4), t4)
+            return None
+        if record.sent_at is None:
+            return None # Damgasız eski el sıkışma; cevap verilmez
+        return {"b": wall_ms(record.timestamp), "d": record.sender}
+
+    def send_time(self, record):
+        """Damgalı paketin gönderildiği anı yerel saate göre döndürür. Bilinmiyorsa None."""
+        if record.sent_at is None:
+            return None
+        clock = self.peers.get(record.sender)
+        if clock is None or not clock.synced:
+            return None
+        return clock.to_local(unwrap_ms(record.sent_at, record.timestamp))
+
+    def observe(self, record):
+        """Damgalı paketin tek yönlü gecikmesini eşin histogramına ekler; gecikmeyi döndürür."""
+        sent = self.send_time(record)
+        if sent is None:
+            return None
+        latency = record.timestamp - sent
+        self.peers[record.sender].latency.record(max(latency, 0.0))
+        return latency
+
+    def age(self, record, now: float = None):
+        """Paketteki bilginin yaşı (saniye): gönderim anından şimdiye. Bilinmiyorsa None."""
+        sent = self.send_time(record)
+        if sent is None:
+            return None
+        return (time.time() if now is None else now) - sent
+
+    def summary(self) -> str:
+        lines = []
+        for peer_id, clock in sorted(self.peers.items()):
+            if clock.synced:
+                lines.append(f"{peer_id}: offset={clock.offset * 1000:.1f}ms drift={clock.drift * 1e6:.1f}ppm "
+                             f"rtt={clock.delay * 1000:.1f}ms, gecikme {clock.latency.summary()}")
+        return "\n".join(lines) if lines else "Senkronize eş yok."
+
+class PeerPositionTracker:
+    '''
+    Eşlerin son iki konumundan hız tahmin eder ve konumu bilgi yaşı kadar ileriye kestirir.
+    Gönderim zamanı ClockSync ile yerel saate çevrilir; senkron yoksa alınma zamanı kullanılır.
+    '''
+    def __init__(self, clock_sync: ClockSync = None, max_extrapolation: float = 5.0):
+        self.clock_sync = clock_sync
+        self.max_extrapolation = max_extrapolation # Saniye; daha eski bilgi ileri kestirilmez
+        self._fixes = {} # drone_id -> ((zaman, lat, lon), önceki)
+
+    def update(self, peer_id: str, lat: float, lon: float, record=None, now: float = None):
+        fix_time = None
+        if record is not None and self.clock_sync is not None:
+            fix_time = self.clock_sync.send_time(record)
+        if fix_time is None:
+            fix_time = record.timestamp if record is not None else (time.time() if now is None else now)
+        last = self._fixes.get(peer_id)
+        previous = last[0] if last is not None else None
+        if previous is not None and fix_time <= previous[0]:
+            return # Eski veya tekrar eden konum
+        self._fixes[peer_id] = ((fix_time, lat, lon), previous)
+
+    def latest(self, peer_id: str):
+        """Eşin son konumu ve hızı: (zaman, lat, lon, lat/s, lon/s) veya bilinmiyorsa None."""
+        entry = self._fixes.get(peer_id)
+        if entry is None:
+            return None
+        (t1, lat1, lon1), previous = entry
+        if previous is None or t1 <= previous[0]:
+            return t1, lat1, lon1, 0.0, 0.0
+        t0, lat0, lon0 = previous
+        return t1, lat1, lon1, (lat1 - lat0) / (t1 - t0), (lon1 - lon0) / (t1 - t0)
+
+    def predict(self, peer_id: str, now: float = None):
+        """Eşin şu anki tahmini konumu: (lat, lon, bilgi_yaşı) veya bilinmiyorsa None."""
+        entry = self._fixes.get(peer_id)
+        if entry is None:
+            return None
+        now = time.time() if now is None else now
+        (t1, lat1, lon1), previous = entry
+        age = now - t1
+        if previous is None or age > self.max_extrapolation:
+            return lat1, lon1, age
+        t0, lat0, lon0 = previous
+        dt = t1 - t0
+        if dt <= 0:
+            return lat1, lon1, age
+        return lat1 + (lat1 - lat0) / dt * age, lon1 + (lon1 - lon0) / dt * age, age
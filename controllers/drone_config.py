@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import argparse
+import platform
+
+# --- Varsayılan Yapılandırma ---
+# Öncelik sırası (sonraki öncekini ezer): varsayılanlar < profil < dosya < ortam değişkenleri < komut satırı
+DEFAULT_CONFIG = {
+    "drone_id": "1",
+    "sys_address": "udpin://0.0.0.0:14540",
+    "mavsdk_server_address": None, # Verilirse zaten çalışan mavsdk_server'a bağlanılır (örn. "localhost")
+    "mavsdk_server_port": 50051,
+    "port": None, # None veya "auto": otomatik bulunur, bulunamazsa etkileşimli terminalde sorulur
+    "baudrate": 57600,
+    "target_alt": 20.0,
+    "telemetry_send_interval": 1.0,
+    "adaptive_telemetry": False, # True: telemetri hızı kanal yüküne göre AIMD ile ayarlanır
+    "telemetry_min_interval": 0.2, # Saniye, uyarlanabilir telemetrinin alt sınırı
+    "telemetry_max_interval": 5.0, # Saniye, uyarlanabilir telemetrinin üst sınırı
+    "relay_types": [],
+    "waypoints": [],
+    "startup_budget": 10.0, # Saniye, "radyo açık, telemetri akıyor" hedefi
+    "tdma": False, # True: ortak kanalda zaman bölmeli gönderim (drone id'sine göre pencere)
+    "tdma_frame_period": 1.0, # Saniye, TDMA hedef çerçeve süresi
+    "radio_process": False, # True: XBee okuma/yazma, kodlama ve röle ayrı bir süreçte çalışır
+    "link_timeout": 15.0, # Saniye; bu süre boyunca hiç paket gelmezse XBee bağlantısı yenilenir (null: izlenmez)
+    "radio_send_interval": 1.0, # Saniye, gönderim kuyruğundan iki paket arası (TDMA kapalıyken); uyarlanabilir telemetri bununla sınırlıdır
+    "offboard": False, # True: waypointler offboard hız kontrolüyle (pure pursuit) takip edilir
+    "offboard_rate_hz": 20.0, # Offboard kontrol döngüsü frekansı (20-50 Hz)
+    "coverage": None, # {"polygon": [[lat, lon], ...], "footprint_width": 30, "overlap": 0.2, "angle": 0, "point_spacing": null}
+    "telemetry_bus": False, # True: telemetri paylaşılan belleğe (dronecore_<drone_id>) yayınlanır
+    "state_db": None, # Verilirse (örn. "drone_state.db") waypointler ve görev ilerlemesi SQLite'ta saklanır, yeniden başlatmada sürdürülür
+    "geofence": None, # {"include": [[[lat, lon], ...]], "exclude": [[[lat, lon], ...]]}
+}
+
+# Platforma göre profiller (eski rpi.py ile drone_controller.py arasındaki farklar)
+PROFILES = {
+    "sitl": {
+        "sys_address": "udpin://0.0.0.0:14540",
+        "target_alt": 20.0,
+        "waypoints": [
+            ["1", 47.397606, 8.543060, 20.0, 0],
+            ["2", 47.398106, 8.543560, 20.0, 90],
+            ["3", 47.397106, 8.544060, 20.0, 180],
+        ],
+    },
+    "rpi": {
+        "sys_address": "serial:///dev/ttyACM0:115200",
+        "target_alt": 10.0,
+        "waypoints": [
+            ["1", 40.325757, 36.473615, 10.0, 0],
+            ["2", 40.325733, 36.473877, 10.0, 0],
+            ["3", 40.325499, 36.473636, 10.0, 0],
+        ],
+    },
+}
+DEFAULT_PROFILE = "sitl"
+
+ENV_PREFIX = "DRONECORE_" # Örn. DRONECORE_PORT=/dev/ttyUSB0, DRONECORE_PROFILE=rpi
+
+# None (null) olabilen anahtarların tipi; varsayılanı None olup listede olmayanlar metin kalır
+OPTIONAL_TYPES = {
+    "link_timeout": float,
+    "coverage": dict, # JSON nesnesi
+    "geofence": dict, # JSON nesnesi
+}
+
+def _convert(key: str, value: str):
+    """Ortam değişkeni metnini varsayılan değerin (None ise OPTIONAL_TYPES'taki) tipine çevirir."""
+    default = DEFAULT_CONFIG.get(key)
+    if default is None or key in OPTIONAL_TYPES:
+        if value.strip().lower() in ("", "null", "none"):
+            return None
+        kind = OPTIONAL_TYPES.get(key, str)
+    else:
+        kind = type(default)
+    if kind is bool:
+        return value.lower() in ("1", "true", "yes", "evet")
+    if kind is int:
+        return int(value)
+    if kind is float:
+        return float(value)
+    if kind is dict:
+        parsed = json.loads(value)
+        if not isinstance(parsed, dict):
+            raise ValueError(f"{ENV_PREFIX}{key.upper()} bir JSON nesnesi olmalı.")
+        return parsed
+    if kind is list:
+        return json.loads(value) if value.startswith("[") else [item for item in value.split(",") if item]
+    return value
+
+def load_config_file(path: str) -> dict:
+    """JSON yapılandırma dosyasını okur."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _env_overrides(environ) -> dict:
+    overrides = {}
+    for key in DEFAULT_CONFIG:
+        value = environ.get(ENV_PREFIX + key.upper())
+        if value is not None:
+            overrides[key] = _convert(key, value)
+    return overrides
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="DroneCore drone kontrolcüsü")
+    parser.add_argument("--config", help="JSON yapılandırma dosyası")
+    parser.add_argument("--profile", choices=sorted(PROFILES), help="Platform profili")
+    parser.add_argument("--drone-id", dest="drone_id")
+    parser.add_argument("--port", help='XBee seri portu ("auto" ile otomatik bulunur)')
+    parser.add_argument("--baudrate", type=int)
+    parser.add_argument("--sys-address", dest="sys_address", help="MAVSDK bağlantı adresi")
+    parser.add_argument("--target-alt", dest="target_alt", type=float)
+    parser.add_argument("--startup-budget", dest="startup_budget", type=float)
+    parser.add_argument("--tdma", action="store_const", const=True, help="Zaman bölmeli (TDMA) gönderim")
+    parser.add_argument("--radio-process", dest="radio_process", action="store_const", const=True,
+                        help="XBee'yi ayrı bir süreçte çalıştır")
+    parser.add_argument("--link-timeout", dest="link_timeout", type=float,
+                        help="Bu kadar saniye paket gelmezse XBee bağlantısını yenile")
+    parser.add_argument("--radio-send-interval", dest="radio_send_interval", type=float,
+                        help="Gönderim kuyruğundan iki paket arası süre (saniye)")
+    parser.add_argument("--offboard", action="store_const", const=True, help="Offboard hız kontrolüyle yol takibi")
+    parser.add_argument("--offboard-rate", dest="offboard_rate_hz", type=float)
+    parser.add_argument("--telemetry-bus", dest="telemetry_bus", action="store_const", const=True,
+                        help="Telemetriyi yerel süreçler için paylaşılan belleğe yayınla")
+    parser.add_argument("--state-db", dest="state_db", help="Kalıcı durum deposu (SQLite) dosyası")
+    parser.add_argument("--adaptive-telemetry", dest="adaptive_telemetry", action="store_const", const=True,
+                        help="Telemetri hızını kanal yüküne göre ayarla (AIMD)")
+    return parser
+
+def load_config(argv=None, profile: str = None, environ=None) -> dict:
+    """
+    Varsayılanlar, profil, dosya, ortam değişkenleri ve komut satırını birleştirir.
+    :param argv: Komut satırı argümanları (None ise sys.argv kullanılır).
+    :param profile: Komut satırı/ortam profili vermezse kullanılacak profil (örn. rpi.py için "rpi").
+    :param environ: Ortam değişkenleri (None ise os.environ).
+    """
+    environ = os.environ if environ is None else environ
+    args = build_arg_parser().parse_args(argv)
+
+    profile_name = args.profile or environ.get(ENV_PREFIX + "PROFILE") or profile or DEFAULT_PROFILE
+    if profile_name not in PROFILES:
+        raise ValueError(f"Bilinmeyen profil: {profile_name}")
+
+    config = dict(DEFAULT_CONFIG)
+    config.update(PROFILES[profile_name])
+    config_path = args.config or environ.get(ENV_PREFIX + "CONFIG")
+    if config_path:
+        config.update(load_config_file(config_path))
+    config.update(_env_overrides(environ))
+    config.update({key: value for key, value in vars(args).items()
+                   if key not in ("config", "profile") and value is not None})
+    config["profile"] = profile_name
+    config["drone_id"] = str(config["drone_id"])
+    return config
+
+def ask_port() -> str:
+    """Port yapılandırılmadıysa kullanıcıya sorar (eski etkileşimli davranış)."""
+    print('XBee bağlantısı için port girin')
+    if platform.system() == 'Windows':
+        return "COM"+str(input('COM? :'))
+    elif platform.system() == 'Linux':
+        return "/dev/"+str(input('/dev/? :'))
+    return str(input(' :'))
+
+def resolve_port(config: dict) -> str:
+    """
+    Yapılandırmadaki portu döndürür. Port verilmemişse veya "auto" ise XBee otomatik aranır
+    ve bulunan baud hızı config["baudrate"]'e yazılır. Bulunamazsa ve terminal etkileşimliyse sorar.
+    """
+    port = config.get("port")
+    if port and port != "auto":
+        return port
+
+    from xbee_discovery import discover_xbee, serial_port_of
+    # Uçuş kontrolcüsü seri porttan bağlıysa (örn. rpi: /dev/ttyACM0) o port denenmez
+    link = discover_xbee(exclude=[serial_port_of(config.get("sys_address"))])
+    if link is not None:
+        config["baudrate"] = link.baudrate
+        return link.port
+    if sys.stdin is not None and sys.stdin.isatty():
+        return ask_port()
+    raise ValueError(f"XBee portu bulunamadı (--port veya {ENV_PREFIX}PORT ile belirtin).")
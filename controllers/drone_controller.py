@@ -1,48 +1,184 @@
 #!/usr/bin/env python3
 
 import time
-import platform
+_PROCESS_START = time.perf_counter() # Doğrudan çalıştırıldığında başlangıç referansı; giriş betikleri kendi değerini verir
 import asyncio
+import functools
+import itertools
 from waypoint_controller import waypoints, Waypoint
 from xbee_controller import *
-from mavsdk import System
+from drone_config import load_config, resolve_port
+from link_supervisor import LinkSupervisor
+from geofence import Geofence, GeofenceMonitor, GEOFENCE_BREACH
+from offboard_controller import OffboardFollower
+from clock_sync import PeerPositionTracker
+from tdma import TdmaSchedule
+from rate_controller import AimdRateController, TELEMETRY_COUNTER_MODULO, TELEMETRY_STAMP_EVERY
+from waypoint_sync import WaypointSyncClient
+from state_store import StateStore, STATE_WAYPOINT, STATE_MISSION
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from connect.drone_connection import DroneConnection
+from missions.mission_engine import (Mission, MissionStep, MissionEngine, MISSION_FAILED, MISSION_SUCCESSFUL,
+                                     MISSION_RUNNING, MISSION_PREEMPTED)
+from missions.coverage_planner import coverage_path, chunked
 
 class DroneController(DroneConnection):
-    def __init__(self, sys_address="udpin://0.0.0.0:14540", port: str = "/dev/ttyUSB0", drone_id: str = "1", baudrate: int = DEFAULT_BAUD_RATE):
-        super().__init__(sys_address=sys_address)
+    def __init__(self, sys_address="udpin://0.0.0.0:14540", port: str = "/dev/ttyUSB0", drone_id: str = "1", baudrate: int = DEFAULT_BAUD_RATE, relay_types=None,
+                 scheduler=None, mavsdk_server_address: str = None, mavsdk_server_port: int = 50051,
+                 tdma: bool = False, tdma_frame_period: float = 1.0, radio_process: bool = False,
+                 radio_send_interval: float = 1.0, loopback_air=None, link_timeout: float = 15.0):
+        super().__init__(sys_address=sys_address, mavsdk_server_address=mavsdk_server_address, mavsdk_server_port=mavsdk_server_port)
         self.flying_alt = 0
         self.target_alt = 20.0
 
         self.waypoint = waypoints() # waypoints sınıfından bir örnek oluşturuyoruz
 
         self.drone_id = drone_id
-        self.xbee = XBeeModule(port=port, baudrate=baudrate) 
-        self.BROADCAST_ADDR = "000000000000FFFF" 
+        # Yer istasyonu 'S' özetiyle waypoint deposunu karşılaştırır; sadece farklı kovalar yeniden gönderilir
+        self.waypoint_sync = WaypointSyncClient(self.waypoint, self.drone_id)
+        # relay_types verilirse bu drone o tipteki paketleri menzil dışındaki dronelara röle eder
+        # scheduler verilirse (sürü simülasyonu) XBee gönderimi ortak zamanlayıcıdan yapılır
+        # tdma True ise paketler sadece drone id'sinden türetilen zaman penceresinde gönderilir
+        # radio_process True ise XBee ayrı bir süreçte çalışır (GIL'i kontrol döngüsüyle paylaşmaz; scheduler ile olmaz)
+        # radio_send_interval: gönderim kuyruğundan iki paket arası süre (TDMA kapalıyken radyonun boşaltma hızı)
+        # loopback_air verilirse seri port yerine bellek içi ortak kanal kullanılır (sürü simülasyonu; port yok sayılır)
+        tdma_schedule = TdmaSchedule(drone_id, frame_period=tdma_frame_period) if tdma else None
+        # Radyo süreci (multiprocessing) ve loopback radyo sadece seçildiklerinde yüklenir
+        if loopback_air is not None:
+            from loopback_radio import LoopbackXBeeModule
+            self.xbee = LoopbackXBeeModule(loopback_air, node_id=drone_id, relay_types=relay_types, scheduler=scheduler,
+                                           tdma=tdma_schedule, send_interval=radio_send_interval)
+        elif radio_process:
+            from xbee_process import XBeeProcessModule
+            self.xbee = XBeeProcessModule(port=port, baudrate=baudrate, node_id=drone_id, relay_types=relay_types,
+                                          tdma=tdma_schedule, send_interval=radio_send_interval)
+        else:
+            self.xbee = XBeeModule(port=port, baudrate=baudrate, node_id=drone_id, relay_types=relay_types, scheduler=scheduler,
+                                   tdma=tdma_schedule, send_interval=radio_send_interval) 
+        self.BROADCAST_ADDR = BROADCAST_ADDR_HEX
+        self.ground_station_id = "0" # Yer istasyonunun drone id'si; adresi biliniyorsa durum/senkronizasyon paketleri unicast gider
         
         self.telemetry_send_interval = 1.0 
+        self.preflight_params = ("MIS_TAKEOFF_ALT", "MPC_XY_CRUISE") # Uçuş öncesi okunacak PX4 parametreleri
+        self.preflight_timeout = 60.0 # Saniye, uçuş öncesi aşamaların toplam süre sınırı
+        self.param_values = {}
+        self.phase_times = {} # Aşama adı -> süre (saniye)
+        self.telemetry_poll_interval = 0.1 # Telemetri döngüsünün uyanma aralığı
+        self.message_poll_interval = 0.01 # Mesaj döngüsünün uyanma aralığı (sürüde büyütülür)
+        self.message_batch_size = 32 # Her uyanışta işlenecek en fazla paket
         self.last_telemetry_send_time = 0
-        self.is_xbee_connected = False
+        self.is_xbee_connected = False # XBee oturumu açık mı (yeniden bağlanma sırasında da True kalır)
+        # Bağlantıyı izler, koparsa event loop'u bloklamadan yeniden kurar; periyodik 'H' kalp atışı gönderir
+        # Kalp atışı damgasızdır (cevaplanmaz); saat farkı yer istasyonuna adreslenmiş ayrı damgalı 'H' ile ölçülür
+        # link_timeout saniye boyunca hiç paket gelmezse bağlantı yenilenir (None: izlenmez)
+        self.link_supervisor = LinkSupervisor(
+            self.xbee, heartbeat_timeout=link_timeout,
+            heartbeat_package=XBeePackage(package_type="H", sender=self.drone_id),
+            time_sync_package=XBeePackage(package_type="H", sender=self.drone_id, params={"d": self.ground_station_id},
+                                          timestamped=True))
+        self.timestamp_telemetry = True # 'G' paketlerine gönderim damgası eklenir (alıcı bilgi yaşını ölçer)
+        self.peer_tracker = PeerPositionTracker(self.xbee.clock_sync) # Diğer dronların kestirilen konumları
+        # enable_adaptive_telemetry ile etkinleşir; telemetry_send_interval kuyruk ve 'F' geri bildirimine göre ayarlanır
+        self.rate_controller = None
+        self.telemetry_counter = 0 # 'G' paketlerindeki "n"; yer istasyonu boşluklardan kayıp oranını ölçer
+        self.telemetry_sent = 0 # Gönderilen 'G' sayısı; her TELEMETRY_STAMP_EVERY'inci paket "n" yerine damga taşır
+
+        # Başlangıç süresi: süreç başlangıcından ilk telemetri paketine kadar
+        self.startup_t0 = _PROCESS_START
+        self.startup_budget = None # Saniye; verilirse aşıldığında uyarı basılır
+        self.startup_time = None
+
+        # Görev motoru: 'O' emirleri çalışan görevi keser, emir bitince görev kaldığı yerden devam eder
+        self.mission_engine = MissionEngine(on_status=self._report_mission_status, on_checkpoint=self._persist_mission)
+        self.state_store = None # restore_state ile bağlanır; waypointler ve görev ilerlemesi yeniden başlatmada korunur
+        self._resumed_default = None # Depodan yüklenen yarım kalmış varsayılan görev
+        self.telemetry_bus = None # enable_telemetry_bus ile; aynı bilgisayardaki süreçler durumu paylaşılan bellekten okur
+        self.default_waypoint_ids = ("1","2","3")
+        # Alan taraması ayarları (coverage_path parametreleri); varsayılan görevin sonunda yol üretildikçe takip edilir
+        self.coverage = None
+        self.order_priority = 10 # Yer istasyonu emirlerinin önceliği (varsayılan görev 0)
+        self.is_preflight_done = False
+        self.is_airborne = False
+        # Kesilen görev devam ederken True olur; is_airborne telemetriden yenilenir (araya giren görev dronu indirmiş olabilir)
+        self._airborne_stale = False
+        self._preempted_missions = set()
+        self.geofence_monitor = None # set_geofence ile etkinleşir
+        self._hold_task = None # Geofence ihlalinde başlatılan bekleme (hold) komutu; kapanışta iptal edilir
+        # True ise waypointler goto_location yerine offboard hız kontrolüyle (pure pursuit) takip edilir
+        self.use_offboard = False
+        self.offboard_rate_hz = 20.0
+        self.offboard_cruise_speed = 5.0
+        self.offboard_stats = None # Son offboard yolunun döngü istatistikleri
         print(f"DroneController {self.drone_id} başlatıldı.")
 
     async def xbee_connect(self):
-        """XBee bağlantısını kurar."""
-        self.is_xbee_connected = self.xbee.connect() # Senkron çağrı, ayrı bir thread'de çalıştırmaya gerek yok, hızlı
-        if self.is_xbee_connected:
+        """
+        XBee oturumunu açar. Bloklayan connect çağrısı executor'da çalışır. İlk bağlantı kurulamasa da oturum
+        açık sayılır: paketler kuyrukta bekler ve LinkSupervisor bağlantıyı geri çekilmeyle yeniden dener.
+        """
+        connected = await self.link_supervisor.connect()
+        self.is_xbee_connected = True
+        if connected:
             print(f"DroneController {self.drone_id}: XBee bağlantısı başarılı.")
         else:
-            print(f"DroneController {self.drone_id}: XBee bağlantısı kurulamadı.")
-        return self.is_xbee_connected
+            print(f"DroneController {self.drone_id}: XBee bağlantısı kurulamadı, yeniden denenecek.")
+        return connected
 
     def xbee_disconnect(self):
         """XBee bağlantısını keser."""
+        self.link_supervisor.stop()
         self.xbee.disconnect()
         self.is_xbee_connected = False
         print(f"DroneController {self.drone_id}: XBee bağlantısı kesildi.")
 
+    def set_geofence(self, geofence: Geofence) -> None:
+        """Sınırı etkinleştirir: waypointler ve konum akışı bu sınıra göre denetlenir."""
+        self.waypoint.geofence = geofence
+        self.geofence_monitor = GeofenceMonitor(geofence, on_event=self._on_geofence_event)
+
+    def _on_geofence_event(self, event) -> None:
+        """Geofence ihlalinde dronu bekleme moduna alır ve yer istasyonuna bildirir."""
+        print(f"Drone {self.drone_id}: Geofence olayı: {event}")
+        if self.is_xbee_connected:
+            status_package = XBeePackage(package_type="MS", sender=self.drone_id,
+                                         params={"status": f"geofence-{event.kind}", "d": round(event.distance, 1)})
+            self.xbee.send_data(status_package, drone_id=self.ground_station_id)
+        if event.kind == GEOFENCE_BREACH and self.is_airborne and (self._hold_task is None or self._hold_task.done()):
+            self._hold_task = asyncio.get_running_loop().create_task(self._geofence_hold())
+
+    async def _geofence_hold(self) -> None:
+        """Bekleme komutunu gönderir; başarısız olursa kaydeder ve yer istasyonuna bildirir."""
+        try:
+            await self.drone.action.hold()
+            print(f"Drone {self.drone_id}: Geofence ihlali, bekleme moduna geçildi.")
+        except Exception as e:
+            print(f"Drone {self.drone_id}: Geofence ihlalinde bekleme moduna geçilemedi: {e}")
+            if self.is_xbee_connected:
+                self.xbee.send_data(XBeePackage(package_type="MS", sender=self.drone_id,
+                                                params={"status": "geofence-hold-failed"}),
+                                    drone_id=self.ground_station_id)
+
+    def enable_adaptive_telemetry(self, min_interval: float = 0.2, max_interval: float = 5.0) -> None:
+        """
+        Telemetri hızını AIMD ile uyarlar: kanal boşken hız artar, gönderim kuyruğu birikirse veya
+        yer istasyonu kayıp/gecikme bildirirse yarıya iner. Başlangıç aralığı telemetry_send_interval'dır.
+        Hız radyonun gönderim kapasitesiyle (xbee.send_capacity) sınırlıdır; min_interval'e ulaşmak için
+        radio_send_interval da küçültülmelidir.
+        """
+        self.rate_controller = AimdRateController(initial_interval=self.telemetry_send_interval,
+                                                  min_interval=min_interval, max_interval=max_interval)
+
+    def enable_telemetry_bus(self, name: str = None) -> None:
+        """
+        Son telemetriyi ve sürü durumunu paylaşılan belleğe yayınlar (varsayılan ad: dronecore_<drone_id>).
+        Diğer süreçler telemetry_bus.TelemetryBusReader ile okur.
+        """
+        from telemetry_bus import TelemetryBusWriter, bus_name # Paylaşılan bellek sadece etkinleşince yüklenir
+        self.telemetry_bus = TelemetryBusWriter(name or bus_name(self.drone_id))
+        print(f"Telemetri yolu paylaşılan bellekte: {self.telemetry_bus.name}")
+
     async def send_telemetry_loop(self) -> None:
         """
         Dronun güncel telemetri verilerini periyodik olarak gönderir.
@@ -61,6 +197,15 @@ class DroneController(DroneConnection):
                 async for position in position_stream:
                     last_known_lat = position.latitude_deg
                     last_known_lon = position.longitude_deg
+                    if self.geofence_monitor is not None:
+                        self.geofence_monitor.update(last_known_lat, last_known_lon)
+                    if self.telemetry_bus is not None:
+                        self.telemetry_bus.publish_state(lat=last_known_lat, lon=last_known_lon,
+                                                         abs_alt=position.absolute_altitude_m,
+                                                         rel_alt=position.relative_altitude_m,
+                                                         airborne=self.is_airborne,
+                                                         telemetry_interval=self.telemetry_send_interval,
+                                                         waypoint_version=self.waypoint.version)
             except asyncio.CancelledError:
                 print("Position stream updater görevi iptal edildi.")
             except Exception as e:
@@ -71,21 +216,36 @@ class DroneController(DroneConnection):
 
         try:
             while self.is_xbee_connected:
+                if self.rate_controller is not None:
+                    self.telemetry_send_interval = self.rate_controller.update(self.xbee.pending_count(),
+                                                                               send_capacity=self.xbee.send_capacity())
                 if last_known_lat is not None and last_known_lon is not None:
                     if time.time() - self.last_telemetry_send_time >= self.telemetry_send_interval:
+                        # "n" sayacı ve "m" damgası birlikte 72 bayta sığmaz; damga her TELEMETRY_STAMP_EVERY'inci pakette
+                        stamped = self.timestamp_telemetry and self.telemetry_sent % TELEMETRY_STAMP_EVERY == 0
+                        params = {
+                            "x": int(last_known_lat * 1000000),  
+                            "y": int(last_known_lon * 1000000), 
+                        }
+                        if not stamped:
+                            params["n"] = self.telemetry_counter
+                            self.telemetry_counter = (self.telemetry_counter + 1) % TELEMETRY_COUNTER_MODULO
                         gps_package = XBeePackage(
                             package_type="G",
                             sender=self.drone_id,
-                            params={
-                                "x": int(last_known_lat * 1000000),  
-                                "y": int(last_known_lon * 1000000), 
-                            }
+                            params=params,
+                            timestamped=stamped
                         )
-                        self.xbee.send_data(gps_package, remote_xbee_addr_hex=self.BROADCAST_ADDR)
+                        # Broadcast: yer istasyonunun yanında diğer dronlar da konumu kullanır
+                        # (röle, PeerPositionTracker, telemetri yolunun eş bölümü)
+                        self.xbee.send_data(gps_package)
                         self.last_telemetry_send_time = time.time()
+                        self.telemetry_sent += 1
+                        if self.startup_time is None:
+                            self._record_startup_time()
                         print(f"Drone {self.drone_id}: Telemetri paketi gönderim kuyruğuna eklendi. (Lat: {last_known_lat:.6f}, Lon: {last_known_lon:.6f})")
                 
-                await asyncio.sleep(0.1) # Diğer görevlerin çalışmasına izin ver
+                await asyncio.sleep(self.telemetry_poll_interval) # Diğer görevlerin çalışmasına izin ver
         finally:
             # Döngü sonlandığında veya hata oluştuğunda yardımcı görevi iptal et
             position_updater_task.cancel()
@@ -94,52 +254,89 @@ class DroneController(DroneConnection):
             except asyncio.CancelledError:
                 pass # Normal iptal
 
+    def _record_startup_time(self) -> None:
+        """İlk telemetri paketi kuyruğa girdiğinde başlangıç süresini ölçer ve bütçeyle karşılaştırır."""
+        self.startup_time = time.perf_counter() - self.startup_t0
+        print(f"DroneController {self.drone_id}: Radyo açık, telemetri akıyor ({self.startup_time:.2f} s).")
+        if self.startup_budget is not None and self.startup_time > self.startup_budget:
+            print(f"UYARI: Başlangıç süresi bütçeyi aştı ({self.startup_time:.2f} s > {self.startup_budget:.2f} s).")
+
     async def process_messages_loop(self) -> None:
         """
         Gelen mesajları XBeeModule kuyruğundan sürekli okur ve işler.
         Asenkron bir görev olarak çalışacak.
         """
         while self.is_xbee_connected:
-            incoming_package_json = self.xbee.read_received_data()
-            if incoming_package_json: 
-                print(f"\n--- DroneController {self.drone_id} - Gelen Paket İşleniyor ---")
-                
-                if "error" in incoming_package_json:
-                    print(f"  Paket işleme hatası: {incoming_package_json['error']}")
-                    if "raw_data_hex" in incoming_package_json:
-                        print(f"  Ham Veri (Hex): {incoming_package_json['raw_data_hex']}")
-                    if "source_addr" in incoming_package_json:
-                        print(f"  Kaynak Adres: {incoming_package_json['source_addr']}")
-                else:
-                    print(f"  Tip: {incoming_package_json.get('t')}")
-                    print(f"  Gönderen: {incoming_package_json.get('s')}")
-                    print(f"  Parametreler: {incoming_package_json.get('p')}")
-
-                    package_type = incoming_package_json.get('t')
-                    sender_id = incoming_package_json.get('s')
-                    params = incoming_package_json.get('p', {})
-                    match package_type:
-                        case "G":
-                            latitude = params.get('x') / 1000000.0 if params.get('x') is not None else "N/A"
-                            longitude = params.get('y') / 1000000.0 if params.get('y') is not None else "N/A"
-                            print(f"    GPS verisi alındı ve işlendi: Gönderen={sender_id}, Lat={latitude}, Lon={longitude}")
-                        case "H":
-                            print(f"    El sıkışma alındı: Gönderen={sender_id}")
-                        case "W":
-                            latitude = params.get('x') / 1000000.0 if params.get('x') is not None else "N/A"
-                            longitude = params.get('y') / 1000000.0 if params.get('y') is not None else "N/A"
-                            heading = params.get('h', 0) # Eğer heading pakette geliyorsa
-                            self.waypoint.add(sender_id,latitude,longitude,self.target_alt,heading)
-                        case "w":
-                            self.waypoint.remove(sender_id)
-                        case "O":
-                            print(f"    Görev için emir/order geldi: Görev id={sender_id}, Parametreler={params}")
-                        case "MC":
-                            print(f"    Göreve başlama onayı geldi: Gönderen={sender_id}, Görev numarası={params.get('id', 'N/A')}")
-                        case _: 
-                            print(f"    Bilinmeyen paket tipi alındı: {package_type}")
-                
-            await asyncio.sleep(0.01)
+            # Her uyanışta birikmiş paketler toplu işlenir, böylece bekleme aralığı büyütülebilir
+            for _ in range(self.message_batch_size):
+                incoming_package = self.xbee.read_received_data()
+                if incoming_package is None:
+                    break
+                self.handle_package(incoming_package)
+            await asyncio.sleep(self.message_poll_interval)
+
+    def handle_package(self, incoming_package) -> None:
+        """Tek bir gelen paketi tipine göre işler."""
+        print(f"\n--- DroneController {self.drone_id} - Gelen Paket İşleniyor ---")
+
+        if incoming_package.error is not None:
+            print(f"  Paket işleme hatası: {incoming_package.error}")
+            if incoming_package.raw_data is not None:
+                print(f"  Ham Veri (Hex): {incoming_package.raw_data_hex}")
+            if incoming_package.source_addr:
+                print(f"  Kaynak Adres: {incoming_package.source_addr}")
+        else:
+            package_type = incoming_package.package_type
+            sender_id = incoming_package.sender
+            params = incoming_package.params
+            print(f"  Tip: {package_type}")
+            print(f"  Gönderen: {sender_id}")
+            print(f"  Parametreler: {params}")
+
+            match package_type:
+                case "G":
+                    latitude = params.get('x') / 1000000.0 if params.get('x') is not None else "N/A"
+                    longitude = params.get('y') / 1000000.0 if params.get('y') is not None else "N/A"
+                    print(f"    GPS verisi alındı ve işlendi: Gönderen={sender_id}, Lat={latitude}, Lon={longitude}")
+                    if params.get('x') is not None and params.get('y') is not None:
+                        self.peer_tracker.update(sender_id, latitude, longitude, incoming_package)
+                        if self.telemetry_bus is not None:
+                            self.telemetry_bus.publish_peer(sender_id, *self.peer_tracker.latest(sender_id))
+                        age = self.xbee.clock_sync.age(incoming_package) if self.xbee.clock_sync is not None else None
+                        if age is not None:
+                            print(f"    Konum bilgisinin yaşı: {age * 1000:.0f} ms")
+                case "H":
+                    print(f"    El sıkışma alındı: Gönderen={sender_id}")
+                case "W":
+                    if params.get('x') is None or params.get('y') is None:
+                        # Koordinatsız waypoint eklenirse senkronizasyon özeti hesaplanamaz (wire_values sayı bekler)
+                        print(f"    Koordinatsız waypoint reddedildi: id={sender_id}, Parametreler={params}")
+                        return
+                    latitude = params['x'] / 1000000.0
+                    longitude = params['y'] / 1000000.0
+                    heading = params.get('h', 0) # Eğer heading pakette geliyorsa
+                    if not self.waypoint_sync.stage(sender_id,latitude,longitude,self.target_alt,heading):
+                        self.waypoint.add(sender_id,latitude,longitude,self.target_alt,heading)
+                case "w":
+                    self.waypoint.remove(sender_id)
+                case "O":
+                    print(f"    Görev için emir/order geldi: Görev id={sender_id}, Parametreler={params}")
+                    self.submit_mission(self.build_order_mission(sender_id, params))
+                    self.xbee.send_data(XBeePackage(package_type="MC", sender=self.drone_id, params={"id": sender_id}),
+                                        drone_id=self.ground_station_id)
+                case "S":
+                    for reply in self.waypoint_sync.handle(incoming_package):
+                        self.xbee.send_data(reply, drone_id=sender_id)
+                case "F":
+                    # Yer istasyonunun ölçtüğü bağlantı kalitesi: "l" kayıp yüzdesi, "d" ortalama gecikme (ms)
+                    print(f"    Bağlantı geri bildirimi: kayıp=%{params.get('l', 0)}, gecikme={params.get('d', 'N/A')} ms")
+                    if self.rate_controller is not None:
+                        delay = params.get('d')
+                        self.rate_controller.on_feedback(params.get('l', 0) / 100.0, None if delay is None else delay / 1000.0)
+                case "MC":
+                    print(f"    Göreve başlama onayı geldi: Gönderen={sender_id}, Görev numarası={params.get('id', 'N/A')}")
+                case _: 
+                    print(f"    Bilinmeyen paket tipi alındı: {package_type}")
 
     async def get_flying_altitude(self) -> float:
         """Yükseklik alınıyor (home + offset)"""
@@ -152,31 +349,145 @@ class DroneController(DroneConnection):
         print(f"-- Flying altitude set to: {self.flying_alt}m")
         return self.flying_alt
 
+    async def _timed(self, name: str, coro):
+        """Bir aşamayı çalıştırır ve süresini phase_times'a kaydeder."""
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.phase_times[name] = time.perf_counter() - started
+
+    async def _wait_connected(self) -> None:
+        async for state in self.drone.core.connection_state():
+            if state.is_connected:
+                print("-- Connected to drone!")
+                break
+
+    async def _wait_health(self) -> None:
+        async for health in self.drone.telemetry.health():
+            if health.is_global_position_ok and health.is_home_position_ok:
+                print("-- Global position estimate OK")
+                break
+
+    async def _fetch_params(self) -> None:
+        """Kalkış irtifasını ayarlar ve yapılandırılan parametreleri okur."""
+        await self.drone.action.set_takeoff_altitude(self.target_alt)
+        for name in self.preflight_params:
+            try:
+                self.param_values[name] = await self.drone.param.get_param_float(name)
+            except Exception as e:
+                print(f"Uyarı: {name} parametresi okunamadı: {e}")
+
+    async def _preflight_phases(self) -> None:
+        """Önce bağlantıyı bekler (sistem yokken action/param çağrıları NO_SYSTEM döner), sonra kalanları eşzamanlı çalıştırır."""
+        await self._timed("connection", self._wait_connected())
+        await asyncio.gather(
+            self._timed("health", self._wait_health()),
+            self._timed("home", self.get_flying_altitude()),
+            self._timed("params", self._fetch_params()),
+        )
+
+    async def preflight(self) -> None:
+        """
+        Uçuş öncesi aşamalarını çalıştırır: bağlantı kurulduktan sonra sağlık kontrolü,
+        home konumu (uçuş irtifası) ve parametreler eşzamanlı. Her aşamanın süresi phase_times'a yazılır.
+        """
+        started = time.perf_counter()
+        print(f"Connecting to drone at {self.sys_address}")
+        await self._timed("mavsdk_connect", self.drone.connect(system_address=self.sys_address))
+        status_text_task = asyncio.create_task(self.print_status_text(self.drone))
+        try:
+            await asyncio.wait_for(self._preflight_phases(), timeout=self.preflight_timeout)
+        except asyncio.TimeoutError:
+            print("Uçuş öncesi kontroller zaman aşımına uğradı! PX4'ün çalıştığından emin olun.")
+            raise
+        finally:
+            status_text_task.cancel()
+            await asyncio.gather(status_text_task, return_exceptions=True)
+        self.phase_times["preflight"] = time.perf_counter() - started
+        print(f"-- Uçuş öncesi tamamlandı ({self.phase_times['preflight']:.2f} s)")
+
+    async def _wait_takeoff_settled(self, altitude_tolerance: float = 0.5, max_vertical_speed: float = 0.3,
+                                    settle_samples: int = 5) -> None:
+        """
+        Kalkışın bittiğini irtifa ve dikey hızın oturmasından anlar (sabit bekleme yerine).
+        İrtifa hedefe tolerans içinde yaklaştığında ve dikey hız art arda settle_samples örnek
+        boyunca eşiğin altında kaldığında döner.
+        """
+        vertical_speed = None
+
+        async def update_vertical_speed():
+            nonlocal vertical_speed
+            async for velocity in self.drone.telemetry.velocity_ned():
+                vertical_speed = velocity.down_m_s
+
+        velocity_task = asyncio.create_task(update_vertical_speed())
+        stable = 0
+        try:
+            async for position in self.drone.telemetry.position():
+                current_relative_altitude = position.relative_altitude_m
+                near_target = current_relative_altitude >= self.target_alt - altitude_tolerance
+                still = vertical_speed is not None and abs(vertical_speed) <= max_vertical_speed
+                stable = stable + 1 if near_target and still else 0
+                if stable >= settle_samples:
+                    print(f"-- Drone reached flying altitude ({current_relative_altitude:.2f}m relative), ready for waypoint mission")
+                    break
+        finally:
+            velocity_task.cancel()
+            await asyncio.gather(velocity_task, return_exceptions=True)
 
     async def arm_and_takeoff(self) -> None:
         """Arm drone and takeoff"""
         print("-- Arm ediliyor...")
-        await self.drone.action.arm()
+        await self._timed("arm", self.drone.action.arm())
 
         print("-- Taking off...")
         await self.drone.action.takeoff()
 
-        # Dronun kalkış irtifasına ulaşmasını bekle
+        # Dronun kalkış irtifasına ulaşıp dengelenmesini bekle
         print(f"-- Waiting for drone to reach flying altitude (target: {self.target_alt}m relative)...")
-        
-        # Sadece hedef irtifaya ulaşana kadar pozisyon akışını dinle
-        async for position in self.drone.telemetry.position():
-            # Göreceli irtifayı kontrol et
-            current_relative_altitude = position.relative_altitude_m
-            print(f"  Current relative altitude: {current_relative_altitude:.2f}m") # İrtifa takibi için
+        await self._timed("takeoff", self._wait_takeoff_settled())
+
+    async def _resume_airborne(self) -> None:
+        """Kesilen görev kalkış adımını tekrar çalıştırmadan devam eder; drone bu arada indiyse yeniden kalkar."""
+        if self._airborne_stale:
+            await self.ensure_airborne()
+
+    async def go_to_waypoint(self, i) -> None:
+        """Tek bir waypointe gider ve orada 10 saniye bekler."""
+        await self._resume_airborne()
+        waypoint_obj = self.waypoint.read(i)
+        if waypoint_obj is None:
+            print(f"Hata: Waypoint {i} bulunamadı. Sonraki waypointe geçiliyor.")
+            return
+
+        await self._fly_to(i, waypoint_obj)
+        print(f"-- Entering hold mode at waypoint {i} for 10 seconds...")
+        await self.drone.action.hold()
+        await asyncio.sleep(10)
+        print(f"-- Finished loitering at waypoint {i}")
+
+    async def _fly_to(self, i, waypoint_obj) -> None:
+        """goto_location ile noktaya gider ve ulaşılana kadar bekler."""
+        print(f"-- Going to waypoint {i}: ({waypoint_obj.lat}, {waypoint_obj.lon}) at {waypoint_obj.alt}m, heading {waypoint_obj.hed}deg")
+        await self.drone.action.goto_location(waypoint_obj.lat, waypoint_obj.lon, waypoint_obj.alt, waypoint_obj.hed)
+
+        await asyncio.sleep(2)
+
+        print(f"-- Waypointe uçuluyor {i}...")
+        target_reached = False
+        while not target_reached:
+            async for position in self.drone.telemetry.position():
+                lat_diff = abs(position.latitude_deg - waypoint_obj.lat)
+                lon_diff = abs(position.longitude_deg - waypoint_obj.lon)
+                # Çok daha küçük bir eşik kullanarak daha hassas kontrol
+                if lat_diff < 0.00001 and lon_diff < 0.00001: 
+                    print(f"-- Reached waypoint {i}")
+                    target_reached = True
+                    break 
             
-            # Hedef irtifanın %90'ına ulaştığında (biraz esneklik için) veya tamamen hedef irtifaya ulaştığında
-            # Koşulu `self.target_alt` ile kullanmak daha mantıklı olacaktır.
-            if current_relative_altitude >= (self.target_alt * 0.95): # Hedef irtifanın %95'i
-                print(f"-- Drone reached flying altitude ({current_relative_altitude:.2f}m relative), ready for waypoint mission")
-                break # Telemetri akışından ve bu asenkron fonksiyondan çık
-        
-        await asyncio.sleep(2)  # Stabilize olması için ekstra bekleme
+            if not target_reached:
+                await asyncio.sleep(1)
 
     async def go_to_waypoints(self, waypoint_ids=None) -> None:
         if waypoint_ids is None:
@@ -184,34 +495,7 @@ class DroneController(DroneConnection):
             return
 
         for i in waypoint_ids:
-            waypoint_obj = self.waypoint.read(i)
-            if waypoint_obj is None:
-                print(f"Hata: Waypoint {i} bulunamadı. Sonraki waypointe geçiliyor.")
-                continue
-
-            print(f"-- Going to waypoint {i}: ({waypoint_obj.lat}, {waypoint_obj.lon}) at {waypoint_obj.alt}m, heading {waypoint_obj.hed}deg")
-            await self.drone.action.goto_location(waypoint_obj.lat, waypoint_obj.lon, waypoint_obj.alt, waypoint_obj.hed)
-
-            await asyncio.sleep(2)
-
-            print(f"-- Waypointe uçuluyor {i}...")
-            target_reached = False
-            while not target_reached:
-                async for position in self.drone.telemetry.position():
-                    lat_diff = abs(position.latitude_deg - waypoint_obj.lat)
-                    lon_diff = abs(position.longitude_deg - waypoint_obj.lon)
-                    # Çok daha küçük bir eşik kullanarak daha hassas kontrol
-                    if lat_diff < 0.00001 and lon_diff < 0.00001: 
-                        print(f"-- Reached waypoint {i}")
-                        target_reached = True
-                        break 
-                
-                if not target_reached:
-                    await asyncio.sleep(1)
-            print(f"-- Entering hold mode at waypoint {i} for 10 seconds...")
-            await self.drone.action.hold()
-            await asyncio.sleep(10)
-            print(f"-- Finished loitering at waypoint {i}")
+            await self.go_to_waypoint(i)
         
         print("-- All waypoints completed!")
 
@@ -223,66 +507,327 @@ class DroneController(DroneConnection):
         async for armed in self.drone.telemetry.armed():
             if not armed:
                 print("-- Drone indi ve disarm edildi")
+                self.is_airborne = False
                 break
 
+    async def ensure_preflight(self) -> None:
+        """Uçuş öncesi kontroller daha önce yapılmadıysa yapar (görevler arasında tekrarlanmaz)."""
+        if not self.is_preflight_done:
+            await self.preflight()
+            self.is_preflight_done = True
+
+    async def _in_air(self) -> bool:
+        async for in_air in self.drone.telemetry.in_air():
+            return in_air
+
+    async def ensure_airborne(self) -> None:
+        """Drone havada değilse uçuş öncesi kontrolleri yapar, arm eder ve kalkış yapar."""
+        await self.ensure_preflight()
+        if self._airborne_stale:
+            self._airborne_stale = False
+            self.is_airborne = await self._in_air()
+        if not self.is_airborne and await self._in_air():
+            # Uçuş sırasında yeniden başlatıldıysa kalkış atlanır, görev kaldığı waypointten sürer
+            print("-- Drone zaten havada, kalkış atlanıyor.")
+            self.is_airborne = True
+        if not self.is_airborne:
+            await self.arm_and_takeoff()
+            self.is_airborne = True
+            print("-- Aşama süreleri: " + ", ".join(f"{name}={duration:.2f}s" for name, duration in self.phase_times.items()))
+
+    async def follow_waypoints_offboard(self, waypoint_ids, reached: set) -> None:
+        """
+        Waypointleri offboard modda tek bir kesintisiz yol olarak takip eder.
+        reached'teki waypointler atlanır; görev kesilip devam ettiğinde yol kalan noktalardan sürer.
+        """
+        await self._resume_airborne()
+        waypoint_list = []
+        for i in waypoint_ids:
+            if i in reached:
+                continue
+            waypoint_obj = self.waypoint.read(i)
+            if waypoint_obj is None:
+                print(f"Hata: Waypoint {i} bulunamadı. Sonraki waypointe geçiliyor.")
+                continue
+            waypoint_list.append((i, waypoint_obj))
+        if not waypoint_list:
+            return
+        follower = OffboardFollower(self.drone, rate_hz=self.offboard_rate_hz, cruise_speed=self.offboard_cruise_speed)
+        self.offboard_stats = follower.stats
+        print(f"-- Offboard yol takibi: {len(waypoint_list)} waypoint, {self.offboard_rate_hz:.0f} Hz")
+        await follower.follow(waypoint_list, on_reached=reached.add)
+        await self.drone.action.hold()
+        print("-- All waypoints completed!")
+
+    async def follow_coverage(self, coverage: dict, on_progress=None, chunk_size: int = 50) -> None:
+        """
+        Kapsama yolunu waypoint deposuna yazmadan, üretildikçe takip eder (bellek ve görev grafiği nokta sayısıyla
+        büyümez). Ulaşılan nokta sayısı coverage["done"]'da tutulur ve on_progress ile bildirilir; görev kesilip
+        devam ettiğinde veya yeniden başlatmada yol kaldığı noktadan sürer.
+        """
+        await self._resume_airborne()
+        alt = coverage.get("alt", self.target_alt)
+        path = coverage_path(coverage["polygon"], coverage["footprint_width"], coverage.get("overlap", 0.2),
+                             coverage.get("angle", 0.0), coverage.get("point_spacing"))
+        start = coverage.get("done", 0)
+        points = ((f"c{start + k}", Waypoint(lat, lon, alt, heading))
+                  for k, (lat, lon, heading) in enumerate(itertools.islice(path, start, None)))
+
+        def reached(_):
+            coverage["done"] = coverage.get("done", 0) + 1
+            if on_progress is not None:
+                on_progress()
+
+        if self.use_offboard:
+            for chunk in chunked(points, chunk_size): # Pure pursuit yolu parça parça kurulur
+                follower = OffboardFollower(self.drone, rate_hz=self.offboard_rate_hz, cruise_speed=self.offboard_cruise_speed)
+                self.offboard_stats = follower.stats
+                await follower.follow(chunk, on_reached=reached)
+            await self.drone.action.hold()
+        else:
+            for label, waypoint_obj in points:
+                await self._fly_to(label, waypoint_obj)
+                reached(label)
+        print(f"-- Alan taraması tamamlandı ({coverage.get('done', 0)} nokta)")
+
+    def _waypoint_steps(self, waypoint_ids, after: str) -> list:
+        """Her waypoint için bir öncekine bağlı bir görev adımı oluşturur (kontrol noktası waypoint başınadır)."""
+        if self.use_offboard:
+            # Offboard yol tek adımdır; ilerleme reached kümesinde tutulur
+            action = functools.partial(self.follow_waypoints_offboard, tuple(waypoint_ids), set())
+            return [MissionStep("offboard_path", action, (after,))]
+        steps = []
+        for i in waypoint_ids:
+            name = f"wp_{i}"
+            steps.append(MissionStep(name, functools.partial(self.go_to_waypoint, i), (after,)))
+            after = name
+        return steps
+
+    def build_default_mission(self, waypoint_ids=None, coverage: dict = None) -> Mission:
+        """Varsayılan görev: uçuş öncesi -> kalkış -> waypointler -> (alan taraması) -> iniş."""
+        waypoint_ids = self.default_waypoint_ids if waypoint_ids is None else waypoint_ids
+        coverage = self.coverage if coverage is None else coverage
+        steps = [MissionStep("preflight", self.ensure_preflight),
+                 MissionStep("takeoff", self.ensure_airborne, ("preflight",))]
+        steps += self._waypoint_steps(waypoint_ids, "takeoff")
+        params = {"wp": list(waypoint_ids)}
+        if coverage is not None:
+            params["coverage"] = coverage = dict(coverage)
+
+            async def follow_coverage():
+                # Her ulaşılan nokta kontrol noktasına yazılır (tek adım, ilerleme params içinde)
+                await self.follow_coverage(coverage, on_progress=lambda: self._persist_mission(mission))
+            steps.append(MissionStep("coverage", follow_coverage, (steps[-1].name,)))
+        steps.append(MissionStep("land", self.land, (steps[-1].name,)))
+        mission = Mission("default", steps, params=params)
+        return mission
+
+    def build_order_mission(self, mission_id: str, params) -> Mission:
+        """Yer istasyonundan gelen 'O' emrinden görev oluşturur; params["wp"] gidilecek waypointlerdir."""
+        waypoint_ids = [str(i) for i in params.get("wp", ())]
+        steps = [MissionStep("takeoff", self.ensure_airborne)]
+        steps += self._waypoint_steps(waypoint_ids, "takeoff")
+        return Mission(f"order-{mission_id}", steps, priority=self.order_priority,
+                       params={"id": mission_id, "f": params.get("f"), "wp": waypoint_ids})
+
+    def submit_mission(self, mission: Mission) -> Mission:
+        """Görevi motora verir ve bekleyen görev olarak kalıcı depoya yazar."""
+        self.mission_engine.submit(mission)
+        self._persist_mission(mission)
+        return mission
+
+    def _persist_mission(self, mission: Mission) -> None:
+        if self.state_store is not None:
+            self.state_store.put(STATE_MISSION, mission.name, mission.checkpoint())
+
+    def _persist_waypoint(self, waypoint_id, wp) -> None:
+        if wp is None:
+            self.state_store.delete(STATE_WAYPOINT, waypoint_id)
+        else:
+            self.state_store.put(STATE_WAYPOINT, waypoint_id, [wp.lat, wp.lon, wp.alt, wp.hed])
+
+    def _rebuild_mission(self, checkpoint: dict):
+        """Kontrol noktasındaki görevi yeniden oluşturur (adımlar kod olduğu için saklanmaz, params'tan kurulur)."""
+        name, params = checkpoint.get("name"), checkpoint.get("params", {})
+        if name == "default":
+            return self.build_default_mission(params.get("wp", self.default_waypoint_ids), params.get("coverage"))
+        if name is not None and name.startswith("order-"):
+            return self.build_order_mission(params.get("id", name[len("order-"):]), params)
+        return None
+
+    def restore_state(self, state_store: StateStore) -> bool:
+        """
+        Kalıcı durum deposunu bağlar: kayıtlı waypointleri ve yarım kalan görevleri (bekleyen emirler dahil) yükler.
+        Bundan sonraki değişiklikler depoya toplu ve asenkron yazılır. Uçuş öncesi ve kalkış adımları her
+        süreçte yeniden çalışır (bağlantı süreçle birlikte gider); drone havadaysa kalkış atlanır.
+        :return: Kayıtlı waypoint bulunduysa True (yapılandırmadaki waypointler tekrar eklenmemeli).
+        """
+        started = time.perf_counter()
+        self.state_store = state_store
+        saved_waypoints = state_store.load(STATE_WAYPOINT)
+        if saved_waypoints:
+            self.waypoint.add_many([(waypoint_id, *values) for waypoint_id, values in saved_waypoints.items()])
+        self.waypoint.on_change = self._persist_waypoint
+        resumed = 0
+        for name, checkpoint in state_store.load(STATE_MISSION).items():
+            mission = self._rebuild_mission(checkpoint)
+            if mission is None:
+                state_store.delete(STATE_MISSION, name)
+                continue
+            mission.restore(checkpoint)
+            mission.completed -= {"preflight", "takeoff"}
+            resumed += 1
+            if mission.name == "default":
+                self._resumed_default = mission # run_mission tarafından verilir
+            else:
+                self.mission_engine.submit(mission)
+        print(f"Durum deposu yüklendi: {len(saved_waypoints)} waypoint, {resumed} yarım kalan görev "
+              f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+        return bool(saved_waypoints)
+
+    def _report_mission_status(self, mission: Mission, status: str) -> None:
+        """Görev durumu değişince yer istasyonuna 'MS' paketi gönderir."""
+        print(f"Görev '{mission.name}' durumu: {status}")
+        if status == MISSION_PREEMPTED:
+            self._preempted_missions.add(mission.name)
+        elif status == MISSION_RUNNING and mission.name in self._preempted_missions:
+            self._preempted_missions.discard(mission.name)
+            self._airborne_stale = True
+        if self.telemetry_bus is not None:
+            self.telemetry_bus.publish_state(mission=mission.name, mission_status=status)
+        if self.state_store is not None:
+            if status in (MISSION_SUCCESSFUL, MISSION_FAILED):
+                self.state_store.delete(STATE_MISSION, mission.name)
+            else:
+                self._persist_mission(mission)
+        if self.is_xbee_connected:
+            status_package = XBeePackage(package_type="MS", sender=self.drone_id, params={"status": status})
+            self.xbee.send_data(status_package, drone_id=self.ground_station_id)
+
     async def run_mission(self) -> None:
-        """Run complete mission: connect, takeoff, waypoints, land"""
-        await super().connect() # DroneConnection'ın connect metodunu çağırıyoruz
-        await self.get_flying_altitude()
-        await self.arm_and_takeoff()
-        await self.go_to_waypoints(waypoint_ids=("1","2","3"))
-        await self.land()
+        """
+        Run complete mission: preflight, takeoff, waypoints, land.
+        Görev, görev motoruna verilir ve bitmesi beklenir; arada gelen emirler görevi keser.
+        """
+        if self._resumed_default is not None:
+            print(f"-- Yarım kalan görev sürdürülüyor, tamamlanmış adımlar: {sorted(self._resumed_default.completed)}")
+            mission, self._resumed_default = self.submit_mission(self._resumed_default), None
+        else:
+            mission = self.submit_mission(self.build_default_mission())
+        status = await mission.wait()
+        print("-- Adım süreleri: " + ", ".join(f"{name}={duration:.2f}s" for name, duration in mission.step_times.items()))
+        if status == MISSION_FAILED:
+            raise mission.error
+
+    def _close_local_state(self) -> None:
+        """Durum deposunu (bekleyen son değişiklikler yazılır) ve paylaşılan bellek telemetri yolunu kapatır."""
+        if self.state_store is not None:
+            self.state_store.close()
+        if self.telemetry_bus is not None:
+            self.telemetry_bus.close()
+
+    async def run(self, keep_alive: bool = True) -> None:
+        """
+        Dronun tüm yaşam döngüsü: XBee bağlantısı, telemetri/mesaj görevleri, görev ve kapanış.
+        Tek drone için main() tarafından, sürü simülasyonunda swarm_runner tarafından çağrılır.
+        """
+        # XBee bağlantısını kur; kurulamazsa LinkSupervisor görevi yeniden dener
+        try:
+            await self.xbee_connect()
+        except Exception:
+            self._close_local_state() # Örn. digi-xbee yüklü değil; paylaşılan bellek ve depo açık kalmasın
+            raise
+
+        # Asenkron görevleri başlat
+        telemetry_task = asyncio.create_task(self.send_telemetry_loop())
+        message_processing_task = asyncio.create_task(self.process_messages_loop())
+        link_supervisor_task = asyncio.create_task(self.link_supervisor.run())
+        mission_engine_task = asyncio.create_task(self.mission_engine.run())
+        state_store_task = asyncio.create_task(self.state_store.run()) if self.state_store is not None else None
+
+        try:
+            # Ana drone görevini başlat
+            await self.run_mission()
+            
+            # Görev tamamlandıktan sonra programı canlı tutmak için
+            print("Görev tamamlandı. Program aktif kalmaya devam ediyor...")
+            while keep_alive:
+                await asyncio.sleep(1) 
+
+        except asyncio.CancelledError:
+            print("\nAsenkron görevler iptal edildi.")
+        except KeyboardInterrupt:
+            print("\nProgram sonlandırılıyor...")
+        except Exception as e:
+            print(f"Ana döngüde beklenmedik bir hata oluştu: {e}")
+            # import traceback
+            # traceback.print_exc() # Hata izini görmek için
+        finally:
+            telemetry_task.cancel()
+            message_processing_task.cancel()
+            link_supervisor_task.cancel()
+            mission_engine_task.cancel()
+            extra_tasks = [task for task in (state_store_task, self._hold_task) if task is not None]
+            for task in extra_tasks:
+                task.cancel()
+            # Görevlerin iptal edilmesini bekleyin ve olası istisnaları yoksayın
+            await asyncio.gather(telemetry_task, message_processing_task, link_supervisor_task, mission_engine_task,
+                                 *extra_tasks, return_exceptions=True)
+            self._hold_task = None
+            self._close_local_state()
+            self.xbee_disconnect()
+            close_radio = getattr(self.xbee, "close", None) # XBeeProcessModule: radyo süreci durdurulur
+            if close_radio is not None:
+                close_radio()
+            print("Program başarıyla sonlandırıldı.")
 
 # --- ANA PROGRAM AKIŞI ---
-async def main(sys_address="udpin://0.0.0.0:14540"): 
-    print('XBee bağlantısı için port girin')
-    if platform.system() == 'nt':
-        input_port = "COM"+str(input('COM? :'))
-    elif platform.system() == 'Linux':
-        input_port = "/dev/"+str(input('/dev/? :'))
-    else:
-        input_port = str(input(' :'))
+async def main(argv=None, profile: str = None, process_start: float = None): 
+    """
+    Yapılandırmayı (dosya, ortam, komut satırı, profil) okuyup tek bir drone çalıştırır.
+    :param profile: Komut satırında profil verilmezse kullanılacak profil (örn. "rpi").
+    :param process_start: Giriş betiğinin içe aktarmalardan önce aldığı time.perf_counter() değeri;
+                          verilmezse bu modülün yüklenme anı kullanılır.
+    """
+    config = load_config(argv, profile=profile)
+    port = resolve_port(config) # Otomatik bulunursa config["baudrate"] da güncellenir
     
-    my_drone = DroneController(sys_address=sys_address, port=input_port, drone_id="1")
-
-    # Waypoint'leri tanımla
-    my_drone.waypoint.add("1",47.397606, 8.543060, 20.0, 0)
-    my_drone.waypoint.add("2",47.398106, 8.543560, 20.0, 90)
-    my_drone.waypoint.add("3",47.397106, 8.544060, 20.0, 180)
+    my_drone = DroneController(sys_address=config["sys_address"], port=port, drone_id=config["drone_id"],
+                               mavsdk_server_address=config["mavsdk_server_address"],
+                               mavsdk_server_port=config["mavsdk_server_port"],
+                               baudrate=config["baudrate"], relay_types=config["relay_types"],
+                               tdma=config["tdma"], tdma_frame_period=config["tdma_frame_period"],
+                               radio_process=config["radio_process"], radio_send_interval=config["radio_send_interval"],
+                               link_timeout=config["link_timeout"])
+    my_drone.target_alt = config["target_alt"]
+    my_drone.telemetry_send_interval = config["telemetry_send_interval"]
+    if config["adaptive_telemetry"]:
+        my_drone.enable_adaptive_telemetry(config["telemetry_min_interval"], config["telemetry_max_interval"])
+    my_drone.startup_budget = config["startup_budget"]
+    if process_start is not None:
+        my_drone.startup_t0 = process_start
+    my_drone.use_offboard = config["offboard"]
+    my_drone.offboard_rate_hz = config["offboard_rate_hz"]
+    if config["telemetry_bus"]:
+        my_drone.enable_telemetry_bus()
+    if config["geofence"]:
+        my_drone.set_geofence(Geofence.from_config(config["geofence"])) # Waypointlerden önce, dışarıdakiler reddedilsin
 
-    # XBee bağlantısını kur
-    if not await my_drone.xbee_connect(): 
-        print("XBee bağlantısı kurulamadı. Program sonlandırılıyor.")
-        return 
+    restored = False
+    if config["state_db"]:
+        # Yeniden başlatmada waypointler ve yarım kalan görevler depodan yüklenir
+        restored = my_drone.restore_state(StateStore(config["state_db"]).open())
 
-    # Asenkron görevleri başlat
-    telemetry_task = asyncio.create_task(my_drone.send_telemetry_loop())
-    message_processing_task = asyncio.create_task(my_drone.process_messages_loop())
+    # Waypoint'leri tanımla (depodan yüklendiyse kayıtlı olanlar kullanılır; yarım kalan görev kendi listesini taşır)
+    if not restored:
+        for waypoint_id, lat, lon, alt, hed in config["waypoints"]:
+            my_drone.waypoint.add(str(waypoint_id), lat, lon, alt, hed)
+    my_drone.default_waypoint_ids = tuple(str(entry[0]) for entry in config["waypoints"])
+    if config["coverage"] and not restored:
+        # Alan taraması: noktalar depoya yazılmaz, görevin "coverage" adımı yolu üretildikçe takip eder
+        my_drone.coverage = dict(config["coverage"])
 
-    try:
-        # Ana drone görevini başlat
-        await my_drone.run_mission()
-        
-        # Görev tamamlandıktan sonra programı canlı tutmak için
-        print("Görev tamamlandı. Program aktif kalmaya devam ediyor...")
-        while True:
-            await asyncio.sleep(1) 
-
-    except asyncio.CancelledError:
-        print("\nAsenkron görevler iptal edildi.")
-    except KeyboardInterrupt:
-        print("\nProgram sonlandırılıyor...")
-    except Exception as e:
-        print(f"Ana döngüde beklenmedik bir hata oluştu: {e}")
-        # import traceback
-        # traceback.print_exc() # Hata izini görmek için
-    finally:
-        telemetry_task.cancel()
-        message_processing_task.cancel()
-        # Her iki görevin de iptal edilmesini bekleyin ve olası istisnaları yoksayın
-        await asyncio.gather(telemetry_task, message_processing_task, return_exceptions=True) 
-        my_drone.xbee_disconnect()
-        print("Program başarıyla sonlandırıldı.")
+    await my_drone.run()
 
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+import math
+
+EARTH_RADIUS_M = 6371000.0
+
+# Geofence olay tipleri
+GEOFENCE_BREACH = "breach"   # Drone izin verilen alanın dışına çıktı
+GEOFENCE_CLEARED = "cleared" # Drone izin verilen alana geri döndü
+
+class FenceZone:
+    '''
+    Çokgen bölge. inclusion=True ise izin verilen alan, False ise yasak alan.
+    Köşeler (lat, lon) derece olarak verilir; içeride ortak referansa göre metre cinsinden tutulur.
+    '''
+    def __init__(self, points, inclusion: bool = True, name: str = None):
+        if len(points) < 3:
+            raise ValueError("Geofence çokgeni en az 3 köşe içermeli.")
+        self.points = [(float(lat), float(lon)) for lat, lon in points]
+        self.inclusion = inclusion
+        self.name = name
+        self.xy = None
+        self.edges = None
+        self.bbox = None
+
+    def project(self, projection):
+        self.xy = [projection(lat, lon) for lat, lon in self.points]
+        self.edges = [(self.xy[i], self.xy[(i + 1) % len(self.xy)]) for i in range(len(self.xy))]
+        xs = [x for x, _ in self.xy]
+        ys = [y for _, y in self.xy]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+
+    def contains_xy(self, x: float, y: float) -> bool:
+        """Işın atma (ray casting) ile tam nokta-çokgen testi."""
+        min_x, min_y, max_x, max_y = self.bbox
+        if x < min_x or x > max_x or y < min_y or y > max_y:
+            return False
+        inside = False
+        for (x1, y1), (x2, y2) in self.edges:
+            if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                inside = not inside
+        return inside
+
+    def distance_xy(self, x: float, y: float) -> float:
+        """Noktanın çokgen sınırına olan en kısa mesafesi (metre)."""
+        return min(_segment_distance(x, y, x1, y1, x2, y2) for (x1, y1), (x2, y2) in self.edges)
+
+def _segment_distance(px, py, x1, y1, x2, y2) -> float:
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length_sq))
+    return math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+def _segments_cross(ax, ay, bx, by, cx, cy, dx, dy) -> bool:
+    """AB ve CD doğru parçaları kesişiyor mu (ortak uç noktalar hariç)."""
+    d1 = (dx - cx) * (ay - cy) - (dy - cy) * (ax - cx)
+    d2 = (dx - cx) * (by - cy) - (dy - cy) * (bx - cx)
+    d3 = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    d4 = (bx - ax) * (dy - ay) - (by - ay) * (dx - ax)
+    return (d1 > 0) != (d2 > 0) and (d3 > 0) != (d4 > 0)
+
+class GeofenceEvent:
+    '''Geofence ihlali/dönüşü olayı. distance: sınıra olan mesafe (metre).'''
+    __slots__ = ("kind", "lat", "lon", "distance", "zone")
+
+    def __init__(self, kind: str, lat: float, lon: float, distance: float, zone: str = None):
+        self.kind = kind
+        self.lat = lat
+        self.lon = lon
+        self.distance = distance
+        self.zone = zone
+
+    def __repr__(self):
+        return f"GeofenceEvent({self.kind}, lat={self.lat:.6f}, lon={self.lon:.6f}, distance={self.distance:.1f}m, zone={self.zone})"
+
+class Geofence:
+    '''
+    İzin verilen (inclusion) ve yasak (exclusion) çokgenlerden oluşan sınır.
+    Nokta, izin verilen bölgelerden en az birinin içinde (izin bölgesi yoksa her yer) ve hiçbir yasak
+    bölgenin içinde değilse geçerlidir.
+    Çokgenler başlangıçta bir ızgaraya indekslenir: kenar geçmeyen hücrelerin durumu önceden bilinir,
+    kenar geçen hücrelerde sadece o hücredeki kenarlar test edilir (her konum örneğinde tüm kenarlar yerine).
+    '''
+    def __init__(self, zones, grid_size: int = 64):
+        """
+        :param zones: FenceZone listesi.
+        :param grid_size: Izgaranın her eksendeki hücre sayısı.
+        """
+        self.zones = list(zones)
+        if not self.zones:
+            raise ValueError("Geofence en az bir bölge içermeli.")
+        self.ref_lat, self.ref_lon = self.zones[0].points[0]
+        self._cos_ref = math.cos(math.radians(self.ref_lat))
+        for zone in self.zones:
+            zone.project(self.to_xy)
+        self.has_inclusion = any(zone.inclusion for zone in self.zones)
+        self._build_index(grid_size)
+
+    @classmethod
+    def from_config(cls, config: dict, grid_size: int = 64):
+        """{"include": [[[lat, lon], ...], ...], "exclude": [...]} biçimindeki yapılandırmadan oluşturur."""
+        zones = [FenceZone(points, True, f"include-{i}") for i, points in enumerate(config.get("include", ()))]
+        zones += [FenceZone(points, False, f"exclude-{i}") for i, points in enumerate(config.get("exclude", ()))]
+        return cls(zones, grid_size)
+
+    def to_xy(self, lat: float, lon: float):
+        """(lat, lon) -> referans noktasına göre (x, y) metre (eşdikdörtgen izdüşüm)."""
+        return (math.radians(lon - self.ref_lon) * self._cos_ref * EARTH_RADIUS_M,
+                math.radians(lat - self.ref_lat) * EARTH_RADIUS_M)
+
+    def _build_index(self, grid_size: int):
+        min_x = min(zone.bbox[0] for zone in self.zones)
+        min_y = min(zone.bbox[1] for zone in self.zones)
+        max_x = max(zone.bbox[2] for zone in self.zones)
+        max_y = max(zone.bbox[3] for zone in self.zones)
+        self.grid_size = grid_size
+        self.origin = (min_x, min_y)
+        self.cell_w = max(max_x - min_x, 1e-6) / grid_size
+        self.cell_h = max(max_y - min_y, 1e-6) / grid_size
+
+        # Hücre -> [(bölge indeksi, hücredeki kenarlar), ...]; kenarsız hücreler için merkez durumu yeterli
+        edge_cells = {}
+        for zone_index, zone in enumerate(self.zones):
+            for edge in zone.edges:
+                (x1, y1), (x2, y2) = edge
+                i0, j0 = self._cell_of(min(x1, x2), min(y1, y2))
+                i1, j1 = self._cell_of(max(x1, x2), max(y1, y2))
+                for i in range(i0, i1 + 1):
+                    for j in range(j0, j1 + 1):
+                        edge_cells.setdefault((i, j), {}).setdefault(zone_index, []).append(edge)
+
+        # Her hücre için merkezin bölge durumları; kenar geçen hücrelerde nokta merkezden parite ile bulunur
+        self._cells = {}
+        for i in range(grid_size):
+            for j in range(grid_size):
+                cx, cy = self._cell_center(i, j)
+                states = tuple(zone.contains_xy(cx, cy) for zone in self.zones)
+                self._cells[(i, j)] = (cx, cy, states, edge_cells.get((i, j), {}))
+
+    def _cell_of(self, x: float, y: float):
+        i = int((x - self.origin[0]) / self.cell_w)
+        j = int((y - self.origin[1]) / self.cell_h)
+        return min(max(i, 0), self.grid_size - 1), min(max(j, 0), self.grid_size - 1)
+
+    def _cell_center(self, i: int, j: int):
+        return self.origin[0] + (i + 0.5) * self.cell_w, self.origin[1] + (j + 0.5) * self.cell_h
+
+    def _in_grid(self, x: float, y: float) -> bool:
+        return (self.origin[0] <= x <= self.origin[0] + self.grid_size * self.cell_w and
+                self.origin[1] <= y <= self.origin[1] + self.grid_size * self.cell_h)
+
+    def zone_states_xy(self, x: float, y: float) -> tuple:
+        """Noktanın her bölgenin içinde olup olmadığı (ızgara indeksi ile)."""
+        if not self._in_grid(x, y):
+            return (False,) * len(self.zones) # Tüm çokgenlerin dışında
+        cx, cy, states, cell_edges = self._cells[self._cell_of(x, y)]
+        if not cell_edges:
+            return states
+        states = list(states)
+        for zone_index, edges in cell_edges.items():
+            # Merkezden noktaya olan parça hücre içinde kalır; sadece bu hücredeki kenarları kesebilir
+            crossings = sum(1 for (x1, y1), (x2, y2) in edges if _segments_cross(cx, cy, x, y, x1, y1, x2, y2))
+            if crossings % 2:
+                states[zone_index] = not states[zone_index]
+        return tuple(states)
+
+    def _allowed(self, states) -> bool:
+        included = not self.has_inclusion
+        for zone, inside in zip(self.zones, states):
+            if inside:
+                if not zone.inclusion:
+                    return False
+                included = True
+        return included
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Konum geofence içinde (izin verilen alanda) mı?"""
+        return self._allowed(self.zone_states_xy(*self.to_xy(lat, lon)))
+
+    def boundary_distance(self, lat: float, lon: float):
+        """En yakın sınıra olan mesafe (metre) ve o bölgenin adı."""
+        x, y = self.to_xy(lat, lon)
+        distance, zone = min((zone.distance_xy(x, y), zone.name) for zone in self.zones)
+        return distance, zone
+
+    def contains_many(self, lats, lons):
+        """
+        Birçok konumu (örn. tüm sürü) tek seferde numpy ile test eder (yer istasyonu için).
+        :return: numpy bool dizisi.
+        """
+        import numpy as np
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        xs = np.radians(lons - self.ref_lon) * self._cos_ref * EARTH_RADIUS_M
+        ys = np.radians(lats - self.ref_lat) * EARTH_RADIUS_M
+        included = np.full(xs.shape, not self.has_inclusion)
+        excluded = np.zeros(xs.shape, dtype=bool)
+        for zone in self.zones:
+            inside = np.zeros(xs.shape, dtype=bool)
+            for (x1, y1), (x2, y2) in zone.edges:
+                if y1 == y2:
+                    continue
+                crosses = ((y1 > ys) != (y2 > ys)) & (xs < (x2 - x1) * (ys - y1) / (y2 - y1) + x1)
+                inside ^= crosses
+            if zone.inclusion:
+                included |= inside
+            else:
+                excluded |= inside
+        return included & ~excluded
+
+class GeofenceMonitor:
+    '''
+    Konum akışını artımlı olarak izler.
+    Son kontrolde sınıra olan mesafe bilinir; drone o mesafeden az hareket ettiyse durum değişemez
+    ve yeniden test yapılmaz. İhlal ve geri dönüşte on_event çağrılır.
+    '''
+    def __init__(self, geofence: Geofence, on_event=None):
+        self.geofence = geofence
+        self.on_event = on_event
+        self.inside = None
+        self.last_event = None
+        self._anchor = None # Son tam kontrolün (x, y) konumu
+        self._margin = 0.0  # O konumda sınıra olan mesafe
+        self.checks = 0
+        self.skipped = 0
+
+    def update(self, lat: float, lon: float) -> bool:
+        """Yeni konum örneğini işler; konum izin verilen alanda mı döndürür."""
+        x, y = self.geofence.to_xy(lat, lon)
+        if self._anchor is not None and math.hypot(x - self._anchor[0], y - self._anchor[1]) < self._margin:
+            self.skipped += 1
+            return self.inside
+        self.checks += 1
+        inside = self.geofence._allowed(self.geofence.zone_states_xy(x, y))
+        distance, zone = self.geofence.boundary_distance(lat, lon)
+        self._anchor = (x, y)
+        self._margin = distance
+        if inside != self.inside:
+            if self.inside is not None or not inside:
+                self.last_event = GeofenceEvent(GEOFENCE_CLEARED if inside else GEOFENCE_BREACH, lat, lon, distance, zone)
+                if self.on_event is not None:
+                    self.on_event(self.last_event)
+            self.inside = inside
+        return inside
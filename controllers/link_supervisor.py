@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import time
+import random
+import asyncio
+
+# Bağlantı durumları
+LINK_DOWN = "down"
+LINK_UP = "up"
+LINK_RECONNECTING = "reconnecting"
+
+class LinkSupervisor:
+    '''
+    XBeeModule bağlantısını izleyen ve gerektiğinde yeniden kuran asenkron denetçi.
+    Bloklayan connect/disconnect çağrıları executor'da çalışır, event loop (ve MAVSDK akışları) bekletilmez.
+    Port kapanması, art arda gönderim hataları veya gelen trafiğin ('H' kalp atışları dahil) kesilmesi
+    bağlantıyı sağlıksız sayar;
+    yeniden bağlanma jitter'lı üstel geri çekilme ile denenir. Gönderim kuyruğu yeniden bağlanma
+    boyunca korunur, bekleyen komutlar bağlantı gelince gönderilir. İlk connect başarısız olsa da run()
+    başlatılmalıdır; kapalı port ilk kontrolde yeniden bağlanmayı tetikler.
+    '''
+    def __init__(self, xbee, check_interval: float = 1.0, error_threshold: int = 5,
+                 heartbeat_timeout: float = None, heartbeat_package=None, heartbeat_interval: float = 5.0,
+                 backoff_initial: float = 0.5, backoff_max: float = 30.0, on_state_change=None,
+                 time_sync_package=None, time_sync_interval: float = 30.0):
+        """
+        :param xbee: İzlenecek XBeeModule.
+        :param check_interval: Sağlık kontrolü aralığı (saniye).
+        :param error_threshold: Bir kontrol aralığında bu kadar yeni hata olursa bağlantı yenilenir.
+        :param heartbeat_timeout: Daha önce paket alınmışsa, bu süre boyunca hiç paket ('H' veya başka)
+                                  gelmezse bağlantı yenilenir. None ise izlenmez.
+        :param heartbeat_package: Verilirse gönderim kuyruğu boşken heartbeat_interval aralıkla gönderilen
+                                  kendi 'H' paketimiz (diğer trafik zaten canlılık bildirir).
+        :param backoff_initial: İlk yeniden bağlanma beklemesinin üst sınırı (saniye).
+        :param backoff_max: Yeniden bağlanma beklemesinin en büyük değeri (saniye).
+        :param on_state_change: Durum değişince çağrılan fonksiyon (yeni_durum).
+        :param time_sync_package: Verilirse time_sync_interval aralıkla gönderilen damgalı 'H' isteği.
+                                  p={"d": hedef} ile sadece hedef (yer istasyonu) cevap verir; paket o hedefe gönderilir.
+        :param time_sync_interval: Saat senkronizasyonu isteği aralığı (saniye).
+        """
+        self.xbee = xbee
+        self.check_interval = check_interval
+        self.error_threshold = error_threshold
+        self.heartbeat_timeout = heartbeat_timeout
+        self.heartbeat_package = heartbeat_package
+        self.heartbeat_interval = heartbeat_interval
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.on_state_change = on_state_change
+        self.time_sync_package = time_sync_package
+        self.time_sync_interval = time_sync_interval
+
+        self.state = LINK_DOWN
+        self.reconnect_count = 0
+        self._error_baseline = 0
+        self._last_heartbeat_sent = 0.0
+        self._last_time_sync_sent = 0.0
+        self._stopped = False
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            self.state = state
+            print(f"XBee bağlantı durumu: {state}")
+            if self.on_state_change is not None:
+                self.on_state_change(state)
+
+    async def connect(self) -> bool:
+        """XBeeModule.connect'i executor'da çalıştırır."""
+        connected = await asyncio.get_running_loop().run_in_executor(None, self.xbee.connect)
+        self._error_baseline = self.xbee.error_count
+        self._set_state(LINK_UP if connected else LINK_DOWN)
+        return connected
+
+    def stop(self):
+        """Denetimi durdurur; devam eden yeniden bağlanma döngüsü de sonlanır."""
+        self._stopped = True
+
+    async def disconnect(self):
+        """Denetimi durdurur ve XBeeModule.disconnect'i executor'da çalıştırır."""
+        self.stop()
+        await asyncio.get_running_loop().run_in_executor(None, self.xbee.disconnect)
+        self._set_state(LINK_DOWN)
+
+    def health_problem(self, now: float = None):
+        """Bağlantı sağlıksızsa sebebini, sağlıklıysa None döndürür."""
+        if now is None:
+            now = time.time()
+        if not self.xbee.is_connected():
+            return "port kapalı"
+        new_errors = self.xbee.error_count - self._error_baseline
+        self._error_baseline = self.xbee.error_count
+        if new_errors >= self.error_threshold:
+            return f"{new_errors} seri port/gönderim hatası"
+        last_receive = self.xbee.last_receive_time
+        if self.heartbeat_timeout is not None and last_receive and now - last_receive > self.heartbeat_timeout:
+            last_heartbeat = self.xbee.last_heartbeat_time
+            heartbeat_age = f"{now - last_heartbeat:.1f} s önce" if last_heartbeat else "hiç alınmadı"
+            return f"{now - last_receive:.1f} s boyunca paket yok, son kalp atışı {heartbeat_age}"
+        return None
+
+    def backoff_delay(self, attempt: int) -> float:
+        """'Full jitter' üstel geri çekilme: [0, min(max, initial * 2^attempt)] aralığında rastgele."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_initial * (2 ** attempt)))
+
+    async def _reconnect(self, reason: str):
+        self._set_state(LINK_RECONNECTING)
+        print(f"XBee bağlantısı yenileniyor ({reason}). Bekleyen paket: {self.xbee.pending_count()}")
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while not self._stopped:
+            await loop.run_in_executor(None, self.xbee.disconnect)
+            if await loop.run_in_executor(None, self.xbee.connect):
+                self.reconnect_count += 1
+                self._error_baseline = self.xbee.error_count
+                self.xbee.last_receive_time = 0.0 # Yeni bağlantıda trafik yeniden beklenir
+                self._set_state(LINK_UP)
+                return
+            delay = self.backoff_delay(attempt)
+            attempt += 1
+            print(f"XBee yeniden bağlanamadı (deneme {attempt}), {delay:.1f} s sonra tekrar denenecek.")
+            await asyncio.sleep(delay)
+
+    def _send_heartbeat(self, now: float):
+        if self.heartbeat_package is None or now - self._last_heartbeat_sent < self.heartbeat_interval:
+            return
+        if self.xbee.pending_count():
+            return # Kuyrukta trafik var; gönderim kapasitesini kalp atışıyla doldurmayalım
+        self.xbee.send_data(self.heartbeat_package)
+        self._last_heartbeat_sent = now
+
+    def _send_time_sync(self, now: float):
+        if self.time_sync_package is None or now - self._last_time_sync_sent < self.time_sync_interval:
+            return
+        self.xbee.send_data(self.time_sync_package, drone_id=self.time_sync_package.params.get("d"))
+        self._last_time_sync_sent = now
+
+    async def run(self):
+        """Bağlantıyı sürekli izler; asenkron bir görev olarak çalıştırılır."""
+        self._stopped = False
+        try:
+            while not self._stopped:
+                now = time.time()
+                problem = self.health_problem(now)
+                if problem is not None:
+                    await self._reconnect(problem)
+                else:
+                    self._send_time_sync(now)
+                    self._send_heartbeat(now)
+                await asyncio.sleep(self.check_interval)
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import random
+import threading
+
+try:
+    from xbee_controller import XBeeModule, BROADCAST_ADDR_HEX
+except ImportError: # Proje kökünden (controllers paketi olarak) içe aktarıldığında
+    from controllers.xbee_controller import XBeeModule, BROADCAST_ADDR_HEX
+
+# Sürü simülasyonu için bellek içi radyo: seri port ve digi-xbee olmadan XBeeModule'ün tüm katmanları (kuyruk, röle,
+# saat senkronizasyonu, TDMA, alma tamponu) çalışır. Gönderilen çerçeve LoopbackAir üzerinden diğer modüllerin alma
+# callback'ine verilir; gecikme verilirse teslim ortak TimerWheel'den zamanlanır (ek thread açılmaz).
+LOOPBACK_ADDRESS_PREFIX = bytes.fromhex("0013A2FF")
+
+class LoopbackAddress:
+    '''digi XBee64BitAddress yerine: sadece .address baytları kullanılır.'''
+    __slots__ = ("address",)
+
+    def __init__(self, address: bytes):
+        self.address = address
+
+class LoopbackMessage:
+    '''digi XBeeMessage yerine: veri ve gönderen cihaz.'''
+    __slots__ = ("data", "remote_device")
+
+    def __init__(self, data: bytes, remote_device):
+        self.data = data
+        self.remote_device = remote_device
+
+class LoopbackDevice:
+    '''LoopbackAir'e bağlı sanal XBee cihazı; XBeeModule'ün kullandığı digi XBeeDevice arayüzünün alt kümesi.'''
+    def __init__(self, air, module, address: bytes):
+        self.air = air
+        self.module = module
+        self.address = LoopbackAddress(address)
+        self.address_hex = address.hex().upper()
+        self._open = True
+
+    def is_open(self) -> bool:
+        return self._open
+
+    def close(self):
+        self._open = False
+        self.air.detach(self)
+
+    def get_64bit_addr(self) -> LoopbackAddress:
+        return self.address
+
+class LoopbackAir:
+    '''
+    Bellek içi ortak radyo kanalı. Her yayın (veya adresli gönderim) bağlı diğer cihazlara iletilir.
+    :param scheduler: Ortak zamanlayıcı (call_later sunan, örn. TimerWheel); latency > 0 ise teslim bununla yapılır.
+    :param latency: Saniye, çerçevenin havada geçirdiği süre.
+    :param loss: Alıcı başına çerçeve kaybı olasılığı (0-1).
+    :param transparent: True ise adresli gönderimler de herkese iletilir (AT/transparent modundaki radyolar gibi).
+    '''
+    def __init__(self, scheduler=None, latency: float = 0.0, loss: float = 0.0, transparent: bool = False):
+        self.scheduler = scheduler
+        self.latency = latency
+        self.loss = loss
+        self.transparent = transparent
+        self._devices = {} # adres hex -> LoopbackDevice
+        self._next_index = 1
+        self._lock = threading.Lock()
+        self.stats = {"sent": 0, "delivered": 0, "lost": 0}
+
+    def attach(self, module) -> LoopbackDevice:
+        """Modül için yeni bir adresle sanal cihaz oluşturur."""
+        with self._lock:
+            address = LOOPBACK_ADDRESS_PREFIX + self._next_index.to_bytes(4, "big")
+            self._next_index += 1
+            device = LoopbackDevice(self, module, address)
+            self._devices[device.address_hex] = device
+        return device
+
+    def detach(self, device: LoopbackDevice):
+        with self._lock:
+            self._devices.pop(device.address_hex, None)
+
+    def transmit(self, sender: LoopbackDevice, data: bytes, remote_xbee_addr_hex: str = None):
+        """Çerçeveyi hedefe (adres yoksa veya broadcast ise gönderen hariç herkese) iletir."""
+        with self._lock:
+            if self.transparent or remote_xbee_addr_hex is None or remote_xbee_addr_hex.upper() == BROADCAST_ADDR_HEX:
+                targets = [device for device in self._devices.values() if device is not sender]
+            else:
+                target = self._devices.get(remote_xbee_addr_hex.upper())
+                targets = [target] if target is not None else []
+            self.stats["sent"] += 1
+        message = LoopbackMessage(bytes(data), sender)
+        for target in targets:
+            if self.loss and random.random() < self.loss:
+                self.stats["lost"] += 1
+                continue
+            if self.scheduler is not None and self.latency > 0:
+                self.scheduler.call_later(self.latency, lambda target=target: self._deliver(target, message))
+            else:
+                self._deliver(target, message)
+
+    def _deliver(self, target: LoopbackDevice, message: LoopbackMessage):
+        if target.is_open():
+            self.stats["delivered"] += 1
+            target.module._receive_data_callback(message)
+
+class LoopbackXBeeModule(XBeeModule):
+    '''
+    Seri port yerine LoopbackAir'e bağlanan XBeeModule; API modunda bir radyo gibi davranır.
+    air verilmezse modül kendine ait boş bir kanal kullanır (örn. XBeeProcessModule(module_cls=...) ile ayrı süreçte).
+    '''
+    def __init__(self, air: LoopbackAir = None, port: str = None, **module_kwargs):
+        super().__init__(port=port or f"loopback:{module_kwargs.get('node_id')}", **module_kwargs)
+        self.air = air if air is not None else LoopbackAir()
+
+    def connect(self):
+        """Ortak kanala bağlanır (port açma veya kütüphane yükleme yok)."""
+        if self.is_connected():
+            return True
+        self.xbee_device = self.air.attach(self)
+        self.is_api_mode = True
+        self.local_xbee_address = self.xbee_device.get_64bit_addr()
+        self._start_internal_threads()
+        return True
+
+    def _do_send(self, package, remote_xbee_addr_hex: str = None) -> bool:
+        if not self.is_connected():
+            return False
+        self.air.transmit(self.xbee_device, self._encode_for_send(package), remote_xbee_addr_hex)
+        return True
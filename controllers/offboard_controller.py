@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+import math
+import asyncio
+
+EARTH_RADIUS_M = 6371000.0
+JITTER_BUCKETS_MS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0) # Histogram üst sınırları; sonuncusu "daha büyük"
+
+class LoopStats:
+    '''Kontrol döngüsünün periyot ve jitter (planlanan zamandan sapma) istatistikleri.'''
+    def __init__(self, period: float, buckets_ms=JITTER_BUCKETS_MS):
+        self.period = period
+        self.buckets_ms = tuple(buckets_ms)
+        self.jitter_histogram = [0] * (len(self.buckets_ms) + 1)
+        self.period_histogram = [0] * (len(self.buckets_ms) + 1) # |gerçek periyot - hedef| için
+        self.samples = 0
+        self.overruns = 0 # Kaçırılan (atlanan) tick sayısı
+        self.max_jitter = 0.0
+        self.jitter_sum = 0.0
+        self.compute_max = 0.0 # Tek tick'te harcanan en uzun hesaplama süresi
+
+    def _bucket(self, value_ms: float) -> int:
+        for index, limit in enumerate(self.buckets_ms):
+            if value_ms <= limit:
+                return index
+        return len(self.buckets_ms)
+
+    def record(self, jitter: float, actual_period: float = None, compute_time: float = 0.0):
+        self.samples += 1
+        self.jitter_sum += jitter
+        self.max_jitter = max(self.max_jitter, jitter)
+        self.compute_max = max(self.compute_max, compute_time)
+        self.jitter_histogram[self._bucket(jitter * 1000)] += 1
+        if actual_period is not None:
+            self.period_histogram[self._bucket(abs(actual_period - self.period) * 1000)] += 1
+
+    def summary(self) -> str:
+        if not self.samples:
+            return "Döngü istatistiği yok."
+        labels = [f"<={limit:g}ms" for limit in self.buckets_ms] + [f">{self.buckets_ms[-1]:g}ms"]
+        histogram = ", ".join(f"{label}:{count}" for label, count in zip(labels, self.jitter_histogram) if count)
+        return (f"{self.samples} tick @ {1 / self.period:.0f} Hz, jitter ort={self.jitter_sum / self.samples * 1000:.2f}ms "
+                f"max={self.max_jitter * 1000:.2f}ms, atlanan={self.overruns}, "
+                f"en uzun hesaplama={self.compute_max * 1000:.2f}ms | {histogram}")
+
+async def deadline_ticks(period: float, stats: LoopStats = None):
+    """
+    Mutlak zaman hedefleriyle periyodik tick üretir (sleep zincirlemesi gibi kayma biriktirmez).
+    Tick k'nın hedefi başlangıç + k * period'dur; gecikilirse kaçırılan tick'ler atlanır.
+    :return: Her tick'te (tick_no, planlanan_zaman) üreten async generator.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tick = 0
+    last_wake = None
+    while True:
+        deadline = start + tick * period
+        delay = deadline - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        wake = loop.time()
+        if stats is not None:
+            stats.record(wake - deadline, None if last_wake is None else wake - last_wake)
+        last_wake = wake
+        yield tick, deadline
+        next_tick = tick + 1
+        behind = int((loop.time() - start) / period) # Şu ana kadar geçmesi gereken tick
+        if behind > next_tick:
+            if stats is not None:
+                stats.overruns += behind - next_tick
+            next_tick = behind
+        tick = next_tick
+
+class PurePursuit:
+    '''
+    Pure pursuit yol takipçisi. Yol yerel kuzey/doğu (metre) noktalarıdır; her adımda araca en yakın
+    yol noktasından lookahead kadar ilerideki hedefe doğru hız vektörü üretir.
+    '''
+    def __init__(self, path, lookahead: float = 8.0, cruise_speed: float = 5.0,
+                 accept_radius: float = 1.0, slow_down_gain: float = 0.5):
+        self.path = list(path)
+        self.lookahead = lookahead
+        self.cruise_speed = cruise_speed
+        self.accept_radius = accept_radius
+        self.slow_down_gain = slow_down_gain # Son noktaya yaklaşırken hız = kazanç * mesafe
+        self.segment = 0 # Üzerinde bulunulan yol parçası (path[segment] -> path[segment + 1])
+
+    def _closest_on_segment(self, index: int, x: float, y: float):
+        (x1, y1), (x2, y2) = self.path[index], self.path[index + 1]
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+        t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length_sq))
+        return t, math.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
+
+    def _advance(self, x: float, y: float) -> float:
+        """Aracın yol üzerindeki parçasını ilerletir; parça üzerindeki konum oranını (t) döndürür."""
+        t, distance = self._closest_on_segment(self.segment, x, y)
+        while self.segment + 2 < len(self.path):
+            next_t, next_distance = self._closest_on_segment(self.segment + 1, x, y)
+            if t < 1.0 and next_distance >= distance:
+                break
+            self.segment += 1
+            t, distance = next_t, next_distance
+        return t
+
+    def _lookahead_point(self, x: float, y: float, t: float):
+        (x1, y1), (x2, y2) = self.path[self.segment], self.path[self.segment + 1]
+        px, py = x1 + t * (x2 - x1), y1 + t * (y2 - y1)
+        remaining = self.lookahead
+        index = self.segment
+        while True:
+            nx, ny = self.path[index + 1]
+            step = math.hypot(nx - px, ny - py)
+            if step >= remaining or index + 2 >= len(self.path):
+                if step <= remaining:
+                    return nx, ny
+                ratio = remaining / step
+                return px + ratio * (nx - px), py + ratio * (ny - py)
+            remaining -= step
+            px, py = nx, ny
+            index += 1
+
+    def reached_index(self) -> int:
+        """Geçilmiş son yol noktasının indeksi."""
+        return self.segment
+
+    def update(self, x: float, y: float):
+        """
+        Konuma göre hız komutu hesaplar.
+        :return: (v_kuzey, v_doğu, bitti_mi)
+        """
+        if len(self.path) < 2:
+            return 0.0, 0.0, True
+        t = self._advance(x, y)
+        goal_x, goal_y = self.path[-1]
+        to_goal = math.hypot(goal_x - x, goal_y - y)
+        if self.segment + 2 >= len(self.path) and to_goal <= self.accept_radius:
+            self.segment = len(self.path) - 1
+            return 0.0, 0.0, True
+        target_x, target_y = self._lookahead_point(x, y, t)
+        dx, dy = target_x - x, target_y - y
+        distance = math.hypot(dx, dy)
+        if distance < 1e-6:
+            return 0.0, 0.0, False
+        speed = min(self.cruise_speed, self.slow_down_gain * to_goal + 0.5)
+        return speed * dx / distance, speed * dy / distance, False
+
+class OffboardFollower:
+    '''
+    MAVSDK offboard eklentisiyle waypoint yolunu sabit frekanslı hız komutlarıyla takip eder.
+    goto_location + derece eşiğiyle yoklama yerine 20-50 Hz kontrol döngüsü; döngü periyodu ve jitter kaydedilir.
+    Waypoint irtifaları home'a göre bağıl irtifa (relative_altitude_m) olarak yorumlanır.
+    '''
+    def __init__(self, drone, rate_hz: float = 20.0, lookahead: float = 8.0, cruise_speed: float = 5.0,
+                 accept_radius: float = 1.0, altitude_gain: float = 0.8, max_vertical_speed: float = 2.0):
+        if not 1.0 <= rate_hz <= 100.0:
+            raise ValueError("Offboard kontrol frekansı 1-100 Hz aralığında olmalı.")
+        self.drone = drone
+        self.rate_hz = rate_hz
+        self.lookahead = lookahead
+        self.cruise_speed = cruise_speed
+        self.accept_radius = accept_radius
+        self.altitude_gain = altitude_gain
+        self.max_vertical_speed = max_vertical_speed
+        self.stats = LoopStats(1.0 / rate_hz)
+        self.reached = [] # Bu yolda ulaşılan waypoint id'leri (kesilip devam edilirse atlanır)
+        self._position = None # (lat, lon, bağıl irtifa)
+
+    async def _track_position(self):
+        async for position in self.drone.telemetry.position():
+            self._position = (position.latitude_deg, position.longitude_deg, position.relative_altitude_m)
+
+    async def follow(self, waypoint_list, on_reached=None) -> None:
+        """
+        Waypoint yolunu takip eder.
+        :param waypoint_list: [(waypoint_id, Waypoint), ...]
+        :param on_reached: Her waypointe ulaşıldığında waypoint_id ile çağrılır.
+        """
+        from mavsdk.offboard import VelocityNedYaw, OffboardError # Ağır import; sadece offboard kullanılınca
+
+        position_task = asyncio.create_task(self._track_position())
+        try:
+            while self._position is None:
+                await asyncio.sleep(0.05)
+            ref_lat, ref_lon, _ = self._position
+            cos_ref = math.cos(math.radians(ref_lat))
+
+            def to_local(lat, lon):
+                return (math.radians(lat - ref_lat) * EARTH_RADIUS_M,
+                        math.radians(lon - ref_lon) * cos_ref * EARTH_RADIUS_M)
+
+            path = [(0.0, 0.0)] + [to_local(wp.lat, wp.lon) for _, wp in waypoint_list]
+            tracker = PurePursuit(path, self.lookahead, self.cruise_speed, self.accept_radius)
+            reported = 0
+            yaw = 0.0
+
+            def report_reached(upto: int):
+                nonlocal reported
+                while reported < min(upto, len(waypoint_list)):
+                    waypoint_id = waypoint_list[reported][0]
+                    self.reached.append(waypoint_id)
+                    reported += 1
+                    if on_reached is not None:
+                        on_reached(waypoint_id)
+
+            # PX4 offboard'a geçmeden önce bir setpoint bekler
+            await self.drone.offboard.set_velocity_ned(VelocityNedYaw(0.0, 0.0, 0.0, yaw))
+            try:
+                await self.drone.offboard.start()
+            except OffboardError as e:
+                print(f"Offboard başlatılamadı: {e._result.result}")
+                raise
+
+            loop = asyncio.get_running_loop()
+            async for _, _ in deadline_ticks(1.0 / self.rate_hz, self.stats):
+                started = loop.time()
+                lat, lon, rel_alt = self._position
+                x, y = to_local(lat, lon)
+                v_north, v_east, finished = tracker.update(x, y)
+
+                report_reached(tracker.reached_index())
+                if finished:
+                    break
+
+                target_alt = waypoint_list[min(tracker.segment, len(waypoint_list) - 1)][1].alt
+                v_down = max(-self.max_vertical_speed, min(self.max_vertical_speed,
+                                                           self.altitude_gain * (rel_alt - target_alt)))
+                if abs(v_north) + abs(v_east) > 0.1:
+                    yaw = math.degrees(math.atan2(v_east, v_north))
+                await self.drone.offboard.set_velocity_ned(VelocityNedYaw(v_north, v_east, v_down, yaw))
+                self.stats.compute_max = max(self.stats.compute_max, loop.time() - started)
+        finally:
+            position_task.cancel()
+            await asyncio.gather(position_task, return_exceptions=True)
+            try:
+                await self.drone.offboard.set_velocity_ned(VelocityNedYaw(0.0, 0.0, 0.0, 0.0))
+                await self.drone.offboard.stop()
+            except Exception as e:
+                print(f"Offboard durdurulurken hata: {e}")
+            print(f"-- Offboard döngüsü: {self.stats.summary()}")
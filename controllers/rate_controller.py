@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import time
+
+TELEMETRY_COUNTER_MODULO = 256 # 'G' paketlerindeki "n" sayacı; kayıp ölçümü için
+# Her TELEMETRY_STAMP_EVERY'inci 'G' "n" yerine "m" gönderim damgası taşır (gecikme ölçümü için).
+# İkisi birden 72 bayta sığmaz (iki haneli id, negatif koordinat); damgalı paketler sayacı artırmaz.
+TELEMETRY_STAMP_EVERY = 4
+DEFAULT_CAPACITY_SHARE = 0.8 # Telemetri, radyonun gönderim kapasitesinin en fazla bu kadarını kullanır
+
+class AimdRateController:
+    '''
+    Telemetri hızı için AIMD (toplamsal artış / çarpımsal azalış) denetleyicisi.
+    Kanal boşken hız her saniye additive_step kadar artar; yerel gönderim kuyruğu birikirse
+    veya yer istasyonu kayıp/gecikme bildirirse hız decrease_factor ile çarpılır.
+    Art arda azalışlar arasında en az decrease_hold saniye beklenir (aynı tıkanıklığa birden fazla tepki verilmez).
+    '''
+    def __init__(self, initial_interval: float = 1.0, min_interval: float = 0.2, max_interval: float = 5.0,
+                 additive_step: float = 0.1, decrease_factor: float = 0.5, queue_threshold: int = 3,
+                 loss_threshold: float = 0.1, delay_threshold: float = 1.0, decrease_hold: float = 2.0,
+                 feedback_timeout: float = 10.0, capacity_share: float = DEFAULT_CAPACITY_SHARE):
+        """
+        :param additive_step: Saniye başına hız artışı (Hz).
+        :param queue_threshold: Gönderim kuyruğunda bu kadar paket birikirse tıkanıklık sayılır.
+        :param loss_threshold: Yer istasyonunun bildirdiği kayıp oranı eşiği (0-1).
+        :param delay_threshold: Yer istasyonunun bildirdiği tek yönlü gecikme eşiği (saniye).
+        :param feedback_timeout: Bu süreden eski geri bildirim dikkate alınmaz (saniye).
+        :param capacity_share: update'e radyonun gönderim kapasitesi verilirse hız bu oranla sınırlanır
+                               (kalan kapasite kalp atışı, durum ve cevap paketlerine kalır).
+        """
+        self.min_rate = 1.0 / max_interval
+        self.max_rate = 1.0 / min_interval
+        self.rate = min(self.max_rate, max(self.min_rate, 1.0 / initial_interval))
+        self.additive_step = additive_step
+        self.decrease_factor = decrease_factor
+        self.queue_threshold = queue_threshold
+        self.loss_threshold = loss_threshold
+        self.delay_threshold = delay_threshold
+        self.decrease_hold = decrease_hold
+        self.feedback_timeout = feedback_timeout
+        self.capacity_share = capacity_share
+
+        self.loss = 0.0
+        self.delay = 0.0
+        self._feedback_time = 0.0
+        self._feedback_pending = False # Yeni geri bildirim henüz değerlendirilmedi
+        self._last_update = None
+        self._last_decrease = float("-inf")
+        self.decreases = 0
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.rate
+
+    def on_feedback(self, loss: float, delay: float = None, now: float = None):
+        """Yer istasyonundan gelen kayıp oranı (0-1) ve gecikme (saniye) bildirimini işler."""
+        self.loss = loss
+        if delay is not None:
+            self.delay = delay
+        self._feedback_time = time.time() if now is None else now
+        self._feedback_pending = True
+
+    def congestion(self, queue_depth: int, now: float):
+        """Tıkanıklık varsa sebebini, yoksa None döndürür."""
+        if queue_depth >= self.queue_threshold:
+            return f"kuyruk {queue_depth}"
+        if self._feedback_pending and now - self._feedback_time <= self.feedback_timeout:
+            if self.loss > self.loss_threshold:
+                return f"kayıp %{self.loss * 100:.0f}"
+            if self.delay > self.delay_threshold:
+                return f"gecikme {self.delay * 1000:.0f} ms"
+        return None
+
+    def update(self, queue_depth: int, now: float = None, send_capacity: float = None) -> float:
+        """
+        Durumu değerlendirir ve yeni gönderim aralığını (saniye) döndürür.
+        :param send_capacity: Radyonun saniyede gönderebildiği paket sayısı. Verilirse hız bunun
+                              capacity_share kadarını aşmaz; kuyruk boşaltma hızının üstüne çıkıp salınmaz.
+        """
+        now = time.time() if now is None else now
+        max_rate = self.max_rate
+        if send_capacity is not None:
+            max_rate = max(self.min_rate, min(max_rate, send_capacity * self.capacity_share))
+        elapsed = 0.0 if self._last_update is None else now - self._last_update
+        self._last_update = now
+        reason = self.congestion(queue_depth, now)
+        if reason is not None:
+            if now - self._last_decrease >= self.decrease_hold:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self._last_decrease = now
+                self.decreases += 1
+                print(f"Telemetri hızı düşürüldü ({reason}): {self.rate:.2f} Hz")
+            self._feedback_pending = False
+        else:
+            self.rate = self.rate + self.additive_step * elapsed
+        self.rate = min(self.rate, max_rate)
+        return self.interval
+
+class LinkQualityMonitor:
+    '''
+    Yer istasyonunda her dronun 'G' sayaçlarından kayıp oranını, damgalarından gecikmeyi ölçer ve
+    dronlara gönderilecek 'F' (geri bildirim) parametrelerini üretir.
+    '''
+    def __init__(self, counter_modulo: int = TELEMETRY_COUNTER_MODULO):
+        self.counter_modulo = counter_modulo
+        self._links = {} # drone_id -> [son sayaç, alınan, kayıp, gecikme toplamı, gecikme örneği]
+
+    def observe(self, drone_id: str, counter: int = None, delay: float = None):
+        """counter: "n" sayacı (damgalı paketlerde yok), delay: tek yönlü gecikme (saniye, biliniyorsa)."""
+        link = self._links.get(drone_id)
+        if link is None:
+            link = self._links[drone_id] = [None, 0, 0, 0.0, 0]
+        if counter is not None:
+            if link[0] is not None:
+                gap = (counter - link[0]) % self.counter_modulo
+                if gap == 0:
+                    return # Kopya paket
+                if gap < self.counter_modulo // 2:
+                    link[2] += gap - 1
+                    link[0] = counter
+                else: # Sırası karışmış paket; daha önce kayıp sayılmıştı
+                    link[2] = max(0, link[2] - 1)
+            else:
+                link[0] = counter
+            link[1] += 1
+        if delay is not None:
+            link[3] += delay
+            link[4] += 1
+
+    def feedback(self, drone_id: str):
+        """Son geri bildirimden bu yana ölçülen değerler: {"l": kayıp yüzdesi, "d": gecikme ms} veya None."""
+        link = self._links.get(drone_id)
+        if link is None or (link[1] + link[2] == 0 and not link[4]):
+            return None
+        params = {}
+        if link[1] + link[2]:
+            params["l"] = round(100 * link[2] / (link[1] + link[2]))
+        if link[4]:
+            params["d"] = round(1000 * link[3] / link[4])
+        link[1:] = [0, 0, 0.0, 0] # Sonraki pencere
+        return params
+
+    def drones(self) -> list:
+        return list(self._links)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import json
+import asyncio
+import sqlite3
+import threading
+
+# Kayıt türleri
+STATE_WAYPOINT = "waypoint" # id -> [lat, lon, alt, hed]
+STATE_MISSION = "mission"   # görev adı -> Mission.checkpoint() (bekleyen emirler dahil)
+
+DEFAULT_FLUSH_INTERVAL = 0.2 # Saniye; biriken değişiklikler bu aralıkla tek işlemde yazılır
+
+class StateStore:
+    '''
+    Waypointler ve görev ilerlemesi için çökmeye dayanıklı kalıcı depo (SQLite, WAL kipi).
+    put/delete sadece bellekteki bekleyen değişiklikleri günceller (aynı anahtara art arda yazımlar birleşir);
+    run() görevi bunları flush_interval aralığıyla, ayrı bir thread'de tek bir işlem (transaction) olarak yazar.
+    Böylece kontrol döngüsü disk G/Ç'si beklemez; çökmede en fazla son flush_interval kadar değişiklik kaybolur.
+    '''
+    def __init__(self, path: str, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._conn = None
+        self._pending = {} # (tür, anahtar) -> JSON metni veya None (silme)
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock() # Aynı anda tek flush
+        self.flush_count = 0
+
+    def open(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL") # WAL'da tutarlılık korunur, her commit'te fsync yapılmaz
+        self._conn.execute("CREATE TABLE IF NOT EXISTS state (kind TEXT NOT NULL, key TEXT NOT NULL, "
+                           "value TEXT NOT NULL, PRIMARY KEY (kind, key)) WITHOUT ROWID")
+        return self
+
+    def close(self):
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.close()
+        self._conn = None
+
+    def load(self, kind: str) -> dict:
+        """Bir türdeki tüm kayıtları (henüz yazılmamış değişiklikler dahil) döndürür."""
+        with self._write_lock:
+            rows = self._conn.execute("SELECT key, value FROM state WHERE kind = ?", (kind,)).fetchall()
+        records = {key: json.loads(value) for key, value in rows}
+        with self._pending_lock:
+            for (pending_kind, key), value in self._pending.items():
+                if pending_kind != kind:
+                    continue
+                if value is None:
+                    records.pop(key, None)
+                else:
+                    records[key] = json.loads(value)
+        return records
+
+    def put(self, kind: str, key, value):
+        text = json.dumps(value, separators=(",", ":"))
+        with self._pending_lock:
+            self._pending[(kind, str(key))] = text
+
+    def delete(self, kind: str, key):
+        with self._pending_lock:
+            self._pending[(kind, str(key))] = None
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending)
+
+    def flush(self) -> int:
+        """Bekleyen değişiklikleri tek işlemde yazar; yazılan kayıt sayısını döndürür."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending or self._conn is None:
+            return 0
+        upserts = [(kind, key, value) for (kind, key), value in pending.items() if value is not None]
+        deletes = [(kind, key) for (kind, key), value in pending.items() if value is None]
+        with self._write_lock:
+            try:
+                self._conn.execute("BEGIN")
+                if upserts:
+                    self._conn.executemany("INSERT OR REPLACE INTO state (kind, key, value) VALUES (?, ?, ?)", upserts)
+                if deletes:
+                    self._conn.executemany("DELETE FROM state WHERE kind = ? AND key = ?", deletes)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                with self._pending_lock: # Yazılamayanlar kaybolmasın; sonraki değişiklikler öncelikli
+                    self._pending = {**pending, **self._pending}
+                raise
+        self.flush_count += 1
+        return len(pending)
+
+    async def run(self):
+        """Periyodik yazıcı; asenkron bir görev olarak çalıştırılır."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._pending:
+                try:
+                    await loop.run_in_executor(None, self.flush)
+                except sqlite3.Error as e:
+                    print(f"Durum deposuna yazılamadı: {e}")
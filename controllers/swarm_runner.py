@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from drone_controller import DroneController
+from timer_wheel import TimerWheel
+from geofence import Geofence
+from state_store import StateStore
+from loopback_radio import LoopbackAir
+
+# Sürü simülasyonunda her drone için varsayılan ayarlar (dosyadaki "defaults" ile ezilebilir)
+SWARM_DEFAULTS = {
+    "sys_address": "udpin://0.0.0.0:14540",
+    "baudrate": 57600,
+    "target_alt": 20.0,
+    "telemetry_send_interval": 1.0,
+    "telemetry_poll_interval": 0.2,
+    "message_poll_interval": 0.05,
+}
+
+def load_swarm_config(path: str) -> dict:
+    """
+    Sürü yapılandırma dosyasını (JSON) okur. Örnek:
+    {
+        "workers": 8,
+        "tick": 0.01,
+        "loopback": {"latency": 0.005, "loss": 0.0},
+        "defaults": {"mavsdk_server_address": "localhost"},
+        "drones": [
+            {"drone_id": "1", "sys_address": "udpin://0.0.0.0:14541", "port": "/dev/ttyUSB0",
+             "mavsdk_server_port": 50051, "waypoints": [["1", 47.3976, 8.5430, 20.0, 0]]}
+        ]
+    }
+    "port" verilmeyen dronlar seri port yerine ortak bellek içi kanalı (LoopbackAir) kullanır; "loopback"
+    bu kanalın gecikme/kayıp ayarlarıdır.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    if not config.get("drones"):
+        raise ValueError(f"Sürü yapılandırmasında drone tanımı yok: {path}")
+    return config
+
+def build_drone(entry: dict, defaults: dict, scheduler, loopback_air: LoopbackAir = None) -> DroneController:
+    """
+    Yapılandırma kaydından ortak zamanlayıcıyı kullanan bir DroneController oluşturur.
+    Kayıtta "port" yoksa radyo olarak loopback_air kullanılır (radyo donanımı gerekmez).
+    """
+    settings = {**SWARM_DEFAULTS, **defaults, **entry}
+    port = settings.get("port")
+    if port is None and loopback_air is None:
+        raise ValueError(f"Drone {settings['drone_id']} için port veya loopback kanalı gerekli.")
+    drone = DroneController(
+        sys_address=settings["sys_address"],
+        port=port,
+        drone_id=str(settings["drone_id"]),
+        baudrate=settings["baudrate"],
+        relay_types=settings.get("relay_types"),
+        scheduler=scheduler,
+        mavsdk_server_address=settings.get("mavsdk_server_address"),
+        mavsdk_server_port=settings.get("mavsdk_server_port", 50051),
+        tdma=settings.get("tdma", False),
+        tdma_frame_period=settings.get("tdma_frame_period", 1.0),
+        radio_send_interval=settings.get("radio_send_interval", 1.0),
+        loopback_air=loopback_air if port is None else None,
+        link_timeout=settings.get("link_timeout", 15.0),
+    )
+    drone.target_alt = settings["target_alt"]
+    drone.telemetry_send_interval = settings["telemetry_send_interval"]
+    drone.telemetry_poll_interval = settings["telemetry_poll_interval"]
+    drone.message_poll_interval = settings["message_poll_interval"]
+    if settings.get("adaptive_telemetry"):
+        drone.enable_adaptive_telemetry(settings.get("telemetry_min_interval", 0.2), settings.get("telemetry_max_interval", 5.0))
+    drone.use_offboard = settings.get("offboard", False)
+    drone.offboard_rate_hz = settings.get("offboard_rate_hz", drone.offboard_rate_hz)
+    if settings.get("telemetry_bus"):
+        drone.enable_telemetry_bus()
+    if settings.get("geofence"):
+        drone.set_geofence(Geofence.from_config(settings["geofence"]))
+    restored = False
+    if settings.get("state_db"):
+        restored = drone.restore_state(StateStore(settings["state_db"]).open())
+    if not restored:
+        for waypoint_id, lat, lon, alt, hed in settings.get("waypoints", ()):
+            drone.waypoint.add(str(waypoint_id), lat, lon, alt, hed)
+    if settings.get("waypoints"):
+        drone.default_waypoint_ids = tuple(str(entry[0]) for entry in settings["waypoints"])
+    return drone
+
+async def run_swarm(config: dict, keep_alive: bool = True) -> None:
+    """
+    Tüm droneları tek bir asyncio döngüsünde çalıştırır.
+    Drone başına thread yerine ortak bir thread havuzu ve tek bir TimerWheel kullanılır.
+    """
+    executor = ThreadPoolExecutor(max_workers=config.get("workers", 8), thread_name_prefix="SwarmWorker")
+    asyncio.get_running_loop().set_default_executor(executor)
+    wheel = TimerWheel(tick=config.get("tick", 0.01), executor=executor)
+    wheel.start()
+
+    defaults = config.get("defaults", {})
+    loopback = config.get("loopback", {})
+    air = LoopbackAir(wheel, latency=loopback.get("latency", 0.0), loss=loopback.get("loss", 0.0))
+    drones = [build_drone(entry, defaults, wheel, air) for entry in config["drones"]]
+    print(f"Sürü başlatılıyor: {len(drones)} drone, {config.get('workers', 8)} işçi thread.")
+
+    try:
+        results = await asyncio.gather(*(drone.run(keep_alive=keep_alive) for drone in drones), return_exceptions=True)
+        for drone, result in zip(drones, results):
+            if isinstance(result, Exception):
+                print(f"Drone {drone.drone_id} hata ile sonlandı: {result}")
+    finally:
+        wheel.stop()
+        executor.shutdown(wait=False)
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Kullanım: python swarm_runner.py <swarm.json>")
+        sys.exit(1)
+    asyncio.run(run_swarm(load_swarm_config(sys.argv[1])))
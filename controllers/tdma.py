@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import math
+import time
+import zlib
+
+DEFAULT_FRAME_PERIOD = 1.0     # Saniye; her düğüm bu aralıkta bir gönderim penceresi alır
+DEFAULT_MIN_SLOT_LENGTH = 0.03 # Saniye; en az bir 72 baytlık paket + koruma süresi
+DEFAULT_GUARD_TIME = 0.005     # Saniye; saat hatası için pencere sonunda boş bırakılan süre
+DEFAULT_NODE_EXPIRY = 30.0     # Saniye; bu süre duyulmayan düğüm sürü boyutundan düşer
+GROUND_STATION_SLOT = 0        # Yer istasyonuna ayrılmış komut penceresi
+
+class TdmaSchedule:
+    '''
+    Ortak yayın kanalı için zaman bölmeli (TDMA) gönderim çizelgesi.
+    Çerçeve, 2'nin kuvveti sayıda pencereye bölünür; 0. pencere yer istasyonuna ayrılmıştır,
+    dronların penceresi drone id'sinden türetilir. Herkes aynı saate (yer istasyonuna göre
+    senkronize) ve aynı sürü boyutuna baktığı için koordinasyon paketi gerekmez.
+    Sürü büyüdükçe pencere sayısı artar, pencere uzunluğu frame_period / pencere sayısına iner;
+    en küçük pencere uzunluğuna inince çerçeve uzar.
+    '''
+    def __init__(self, node_id: str, frame_period: float = DEFAULT_FRAME_PERIOD,
+                 min_slot_length: float = DEFAULT_MIN_SLOT_LENGTH, guard_time: float = DEFAULT_GUARD_TIME,
+                 ground_station_id: str = "0", min_slots: int = 4, expected_nodes: int = None,
+                 packet_time: float = 0.016, node_expiry: float = DEFAULT_NODE_EXPIRY):
+        """
+        :param node_id: Bu düğümün drone id'si (yer istasyonu için ground_station_id).
+        :param frame_period: Hedef çerçeve süresi (saniye).
+        :param min_slot_length: En küçük pencere uzunluğu (saniye).
+        :param guard_time: Pencere sonundaki koruma süresi (saniye).
+        :param min_slots: En az pencere sayısı (yer istasyonu dahil).
+        :param expected_nodes: Verilirse sürü boyutu duyulan düğümlerden hesaplanmaz, sabit kalır.
+        :param packet_time: Bir paketin seri port/radyo üzerinden gönderim süresi tahmini (saniye).
+        """
+        self.node_id = str(node_id)
+        self.frame_period = frame_period
+        self.min_slot_length = min_slot_length
+        self.guard_time = guard_time
+        self.ground_station_id = str(ground_station_id)
+        self.min_slots = min_slots
+        self.expected_nodes = expected_nodes
+        self.packet_time = packet_time
+        self.node_expiry = node_expiry
+        self._nodes = {} # drone id -> son duyulma zamanı
+        self.slot_count = 0
+        self.slot_length = 0.0
+        self._resize(expected_nodes or 1)
+
+    def _resize(self, drone_count: int):
+        slots = max(self.min_slots, drone_count + 1) # +1: yer istasyonu penceresi
+        slot_count = 1 << (slots - 1).bit_length()    # 2'nin kuvvetine yuvarla: küçük sayım farkları çerçeveyi değiştirmez
+        if slot_count != self.slot_count:
+            self.slot_count = slot_count
+            self.slot_length = max(self.min_slot_length, self.frame_period / slot_count)
+            print(f"TDMA: {slot_count} pencere x {self.slot_length * 1000:.0f} ms "
+                  f"(çerçeve {self.frame_length:.2f} s), pencerem: {self.slot_index}")
+
+    @property
+    def frame_length(self) -> float:
+        return self.slot_count * self.slot_length
+
+    @property
+    def slot_index(self) -> int:
+        """Bu düğümün penceresi: yer istasyonu 0, dronlar 1..slot_count-1."""
+        if self.node_id == self.ground_station_id:
+            return GROUND_STATION_SLOT
+        drone_slots = self.slot_count - 1
+        if self.node_id.isdigit() and int(self.node_id) > 0:
+            return 1 + (int(self.node_id) - 1) % drone_slots
+        return 1 + zlib.crc32(self.node_id.encode("utf-8")) % drone_slots
+
+    @property
+    def packets_per_slot(self) -> int:
+        return max(1, int((self.slot_length - self.guard_time) / self.packet_time))
+
+    def observe_node(self, node_id, now: float = None):
+        """Duyulan bir düğümü kaydeder (sürü boyutu uyarlaması için)."""
+        if node_id is None or self.expected_nodes is not None:
+            return
+        node_id = str(node_id)
+        if node_id == self.ground_station_id or node_id == self.node_id:
+            return
+        self._nodes[node_id] = time.time() if now is None else now
+
+    def update_swarm_size(self, now: float = None):
+        """Süresi geçen düğümleri atar ve pencere düzenini sürü boyutuna göre günceller."""
+        if self.expected_nodes is not None:
+            return
+        now = time.time() if now is None else now
+        for node_id in [node_id for node_id, seen in self._nodes.items() if now - seen > self.node_expiry]:
+            del self._nodes[node_id]
+        own = 0 if self.node_id == self.ground_station_id else 1
+        # Duyulan en büyük sayısal id de hesaba katılır; id'ler 1..N ise herkes aynı boyutta uzlaşır
+        highest = max((int(node_id) for node_id in self._nodes if node_id.isdigit()), default=0)
+        if self.node_id.isdigit():
+            highest = max(highest, int(self.node_id))
+        self._resize(max(len(self._nodes) + own, highest))
+
+    def slot_window(self, frame_time: float):
+        """
+        Verilen (senkronize) zamanda içinde bulunulan ya da sıradaki kendi penceremizin
+        (başlangıç, gönderim_bitişi) zamanları. Bitiş koruma süresi kadar erkendir.
+        """
+        frame_length = self.frame_length
+        frame_start = math.floor(frame_time / frame_length) * frame_length
+        start = frame_start + self.slot_index * self.slot_length
+        end = start + self.slot_length - self.guard_time
+        if frame_time >= end:
+            start += frame_length
+            end += frame_length
+        return start, end
+
+    def in_slot(self, frame_time: float) -> bool:
+        start, end = self.slot_window(frame_time)
+        return start <= frame_time < end
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+import time
+import zlib
+import struct
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+# Aynı bilgisayardaki süreçler (görüntü işleme, kayıt, faydalı yük) için paylaşılan bellek telemetri yolu.
+# Yazıcı DroneController'dır; okuyucular TelemetryBusReader ile MAVSDK bağlantısı açmadan durumu okur.
+#
+# Bellek düzeni (little-endian, sabit):
+#   başlık:  magic(4s) sürüm(H) max_eş(H) eş_sayısı(I) yazıcı_başlangıcı(d)
+#   drone:   seq(I) crc(I) + DRONE_RECORD
+#   eşler:   max_eş x [seq(I) crc(I) + PEER_RECORD]
+# Her kayıt kendi seqlock'uyla korunur: yazıcı seq'i tek sayıya çıkarır, kaydı yazar, tekrar çift sayıya çıkarır.
+# Okuyucu seq tekse veya okuma öncesi/sonrası seq değiştiyse tekrar dener; kilit yoktur, yazıcı hiç beklemez.
+# Python bellek bariyeri koyamaz: x86'da yazma sırası korunur, ama ARM (Raspberry Pi) gibi zayıf sıralı
+# işlemcilerde okuyucu seq'i yeni, kaydın bir kısmını eski görebilir. Bu yüzden seq ile birlikte kaydın CRC32'si
+# yazılır; okuyucu sadece CRC'si tutan kopyayı kabul eder, tutmazsa yırtık okuma sayıp tekrar dener.
+BUS_MAGIC = b"DRTB"
+BUS_LAYOUT_VERSION = 2
+DEFAULT_MAX_PEERS = 32
+SPIN_LIMIT = 16 # Bu kadar başarısız denemeden sonra okuyucu işlemciyi bırakır
+
+HEADER = struct.Struct("<4sHHId4x") # 24 bayt; kayıtlar 8 bayt hizalı başlar
+SEQ = struct.Struct("<II") # seq, kaydın CRC32'si
+DRONE_RECORD = struct.Struct("<dddfff?3x24s12sI") # 80 bayt; eş yuvaları da 8 bayt hizalı kalır
+PEER_RECORD = struct.Struct("<8sddddd")
+
+DroneState = namedtuple("DroneState", ("timestamp", "lat", "lon", "abs_alt", "rel_alt", "telemetry_interval",
+                                       "airborne", "mission", "mission_status", "waypoint_version"))
+PeerState = namedtuple("PeerState", ("drone_id", "fix_time", "lat", "lon", "lat_rate", "lon_rate"))
+
+_DRONE_OFFSET = HEADER.size
+_PEER_OFFSET = _DRONE_OFFSET + SEQ.size + DRONE_RECORD.size
+_PEER_SLOT_SIZE = SEQ.size + PEER_RECORD.size
+_local_writers = set() # Bu süreçte yazıcısı açık segmentler (resource_tracker kaydı yazıcıya aittir)
+
+def bus_name(drone_id: str) -> str:
+    return f"dronecore_{drone_id}"
+
+def bus_size(max_peers: int) -> int:
+    return _PEER_OFFSET + max_peers * _PEER_SLOT_SIZE
+
+def _encode(text, size: int) -> bytes:
+    return str(text or "").encode("utf-8")[:size]
+
+def _decode(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode("utf-8", "replace")
+
+class TelemetryBusWriter:
+    '''
+    Paylaşılan bellek segmentini oluşturur ve kayıtları seqlock ile yazar.
+    Tek yazıcı vardır (event loop thread'i); okuyucu sayısı sınırsızdır.
+    '''
+    def __init__(self, name: str, max_peers: int = DEFAULT_MAX_PEERS):
+        self.name = name
+        self.max_peers = max_peers
+        size = bus_size(max_peers)
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError: # Önceki süreç çöktüyse segment kalmış olabilir; yeniden kullanılır
+            self._shm = shared_memory.SharedMemory(name=name)
+            if self._shm.size < size:
+                self._shm.close()
+                raise ValueError(f"'{name}' paylaşılan belleği beklenenden küçük ({self._shm.size} < {size}).")
+        _local_writers.add(name)
+        self._buf = self._shm.buf
+        self._buf[:size] = bytes(size)
+        HEADER.pack_into(self._buf, 0, BUS_MAGIC, BUS_LAYOUT_VERSION, max_peers, 0, time.time())
+        self._peer_slots = {} # drone_id -> slot
+        self._state = {"timestamp": 0.0, "lat": 0.0, "lon": 0.0, "abs_alt": 0.0, "rel_alt": 0.0, "airborne": False,
+                       "telemetry_interval": 0.0, "mission": "", "mission_status": "", "waypoint_version": 0}
+
+    def _write(self, offset: int, record: struct.Struct, *values):
+        data = record.pack(*values)
+        seq = SEQ.unpack_from(self._buf, offset)[0]
+        SEQ.pack_into(self._buf, offset, (seq + 1) & 0xFFFFFFFF, 0) # Tek: yazım sürüyor
+        start = offset + SEQ.size
+        self._buf[start:start + len(data)] = data
+        SEQ.pack_into(self._buf, offset, (seq + 2) & 0xFFFFFFFF, zlib.crc32(data))
+
+    def publish_state(self, **fields):
+        """Verilen alanları günceller ve dronun kaydını yazar (verilmeyen alanlar son değerini korur)."""
+        state = self._state
+        state.update(fields)
+        if "timestamp" not in fields:
+            state["timestamp"] = time.time()
+        self._write(_DRONE_OFFSET, DRONE_RECORD, state["timestamp"], state["lat"], state["lon"],
+                    state["abs_alt"], state["rel_alt"], state["telemetry_interval"], bool(state["airborne"]),
+                    _encode(state["mission"], 24), _encode(state["mission_status"], 12),
+                    state["waypoint_version"] & 0xFFFFFFFF)
+
+    def publish_peer(self, drone_id: str, fix_time: float, lat: float, lon: float,
+                     lat_rate: float = 0.0, lon_rate: float = 0.0) -> bool:
+        """Bir eşin son konumunu yazar. Eş yuvaları dolduysa False döndürür."""
+        slot = self._peer_slots.get(drone_id)
+        if slot is None:
+            if len(self._peer_slots) >= self.max_peers:
+                return False
+            slot = self._peer_slots[drone_id] = len(self._peer_slots)
+            self._write(_PEER_OFFSET + slot * _PEER_SLOT_SIZE, PEER_RECORD, _encode(drone_id, 8),
+                        fix_time, lat, lon, lat_rate, lon_rate)
+            # Kayıt yazıldıktan sonra sayı artar; okuyucu yarım eklenmiş bir yuva görmez
+            struct.pack_into("<I", self._buf, 8, len(self._peer_slots))
+            return True
+        self._write(_PEER_OFFSET + slot * _PEER_SLOT_SIZE, PEER_RECORD, _encode(drone_id, 8),
+                    fix_time, lat, lon, lat_rate, lon_rate)
+        return True
+
+    def close(self):
+        """Segmenti kapatır ve siler (okuyucular açık eşlemelerini kullanmaya devam edebilir)."""
+        if self._shm is None:
+            return
+        self._buf = None
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        _local_writers.discard(self.name)
+        self._shm = None
+
+class TelemetryBusReader:
+    '''
+    Okuyucu kütüphanesi. Örnek:
+        bus = TelemetryBusReader("1")
+        state = bus.read_state()   # DroneState
+        peers = bus.read_peers()   # [PeerState, ...]
+    Okuma serileştirme yapmaz; struct.unpack_from ile doğrudan paylaşılan bellekten kopyalar.
+    '''
+    def __init__(self, drone_id: str = "1", name: str = None, max_retries: int = 10000):
+        self.name = name or bus_name(drone_id)
+        self.max_retries = max_retries
+        try:
+            self._shm = shared_memory.SharedMemory(name=self.name, track=False) # Python 3.13+
+        except TypeError:
+            self._shm = shared_memory.SharedMemory(name=self.name)
+            # Eski sürümlerde resource_tracker okuyucu çıkarken segmenti siler; okuyucu sahibi değildir.
+            # Yazıcı aynı süreçteyse kayıt onundur (unlink'te silinir), okuyucu dokunmaz
+            if self.name not in _local_writers:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._buf = self._shm.buf
+        magic, version, self.max_peers, _, self.writer_started = HEADER.unpack_from(self._buf, 0)
+        if magic != BUS_MAGIC or version != BUS_LAYOUT_VERSION:
+            self.close()
+            raise ValueError(f"'{self.name}' bir telemetri yolu değil veya bellek düzeni uyumsuz.")
+
+    def _read(self, offset: int, record: struct.Struct):
+        for attempt in range(self.max_retries):
+            if attempt >= SPIN_LIMIT:
+                time.sleep(0) # Yazıcı yazarken kesildiyse (örn. tek çekirdek) bitirebilmesi için
+            before = SEQ.unpack_from(self._buf, offset)
+            if before == (0, 0):
+                return None # Hiç yazılmamış
+            if before[0] & 1:
+                continue # Yazım sürüyor
+            start = offset + SEQ.size
+            data = bytes(self._buf[start:start + record.size])
+            if SEQ.unpack_from(self._buf, offset) == before and zlib.crc32(data) == before[1]:
+                return record.unpack(data)
+        raise TimeoutError(f"'{self.name}' kaydı tutarlı okunamadı (yazıcı çok sık yazıyor).")
+
+    def read_state(self):
+        """Dronun son durumu (DroneState) veya henüz yazılmadıysa None."""
+        values = self._read(_DRONE_OFFSET, DRONE_RECORD)
+        if values is None:
+            return None
+        values = list(values)
+        values[7], values[8] = _decode(values[7]), _decode(values[8])
+        return DroneState(*values)
+
+    def read_peers(self) -> list:
+        count = min(struct.unpack_from("<I", self._buf, 8)[0], self.max_peers)
+        peers = []
+        for slot in range(count):
+            values = self._read(_PEER_OFFSET + slot * _PEER_SLOT_SIZE, PEER_RECORD)
+            if values is not None:
+                peers.append(PeerState(_decode(values[0]), *values[1:]))
+        return peers
+
+    def close(self):
+        if self._shm is not None:
+            self._buf = None
+            self._shm.close()
+            self._shm = None
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import time
+import threading
+
+DEFAULT_TICK = 0.01 # Saniye, zamanlayıcı çözünürlüğü
+DEFAULT_SLOTS = 512
+
+class TimerHandle:
+    '''call_later/call_every tarafından döndürülen, iptal edilebilir zamanlayıcı kaydı.'''
+    __slots__ = ("callback", "interval", "ticks", "rounds", "cancelled", "running")
+
+    def __init__(self, callback, interval: float, ticks: int):
+        self.callback = callback
+        self.interval = interval # Tek seferlikse None
+        self.ticks = ticks
+        self.rounds = 0
+        self.cancelled = False
+        self.running = False # Önceki çalışma bitmeden aynı iş tekrar başlatılmaz
+
+    def cancel(self):
+        self.cancelled = True
+
+class TimerWheel:
+    '''
+    Hashed timer wheel: tek bir thread ile çok sayıda periyodik işi zamanlar.
+    Her XBeeModule için ayrı bir gönderici thread'i ve sleep döngüsü yerine
+    sürü simülasyonunda tüm modüller bu ortak tekerleği kullanır.
+    İşler verilen executor'a (ortak thread havuzu) gönderilir; verilmezse tekerlek thread'inde çalışır.
+    '''
+    def __init__(self, tick: float = DEFAULT_TICK, slots: int = DEFAULT_SLOTS, executor=None):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.executor = executor
+        self._cursor = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _schedule(self, handle: TimerHandle, delay: float):
+        ticks = max(1, int(round(delay / self.tick)))
+        with self._lock:
+            handle.rounds = (ticks - 1) // len(self.slots)
+            self.slots[(self._cursor + ticks) % len(self.slots)].append(handle)
+
+    def call_later(self, delay: float, callback) -> TimerHandle:
+        """callback'i delay saniye sonra bir kez çalıştırır."""
+        handle = TimerHandle(callback, None, 0)
+        self._schedule(handle, delay)
+        return handle
+
+    def call_every(self, interval: float, callback) -> TimerHandle:
+        """callback'i her interval saniyede bir çalıştırır."""
+        handle = TimerHandle(callback, interval, 0)
+        self._schedule(handle, interval)
+        return handle
+
+    def _run_handle(self, handle: TimerHandle):
+        try:
+            handle.callback()
+        except Exception as e:
+            print(f"TimerWheel: zamanlanmış iş hata verdi: {e}")
+        finally:
+            handle.running = False
+
+    def _advance(self):
+        with self._lock:
+            self._cursor = (self._cursor + 1) % len(self.slots)
+            bucket = self.slots[self._cursor]
+            due = []
+            waiting = []
+            for handle in bucket:
+                if handle.cancelled:
+                    continue
+                if handle.rounds > 0:
+                    handle.rounds -= 1
+                    waiting.append(handle)
+                else:
+                    due.append(handle)
+            self.slots[self._cursor] = waiting
+
+        for handle in due:
+            if handle.interval is not None:
+                self._schedule(handle, handle.interval)
+            if handle.running:
+                continue # Önceki çalışma hâlâ sürüyor, bu turu atla
+            handle.running = True
+            if self.executor is not None:
+                self.executor.submit(self._run_handle, handle)
+            else:
+                self._run_handle(handle)
+
+    def _run(self):
+        next_tick = time.monotonic() + self.tick
+        while not self._stop_event.is_set():
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            self._advance()
+            next_tick += self.tick # Mutlak zaman: kayma birikmez
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="TimerWheelThread", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
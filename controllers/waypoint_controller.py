@@ -1,11 +1,136 @@
 #!/usr/bin/env python3
 
+import zlib
+import hashlib
+from functools import reduce
+from operator import xor
+
+# Senkronizasyon hash ağacı: her düğümün 16 çocuğu var, 3 seviye -> 4096 yaprak.
+# Düğümler yığın (heap) sırasıyla numaralanır: kök 0, n'nin çocukları 16n+1 .. 16n+16.
+SYNC_FANOUT=16
+SYNC_DEPTH=3
+SYNC_LEAVES=SYNC_FANOUT**SYNC_DEPTH
+
+def wire_values(lat,lon,hed):
+    """Waypointin 'W' paketindeki tamsayı değerleri (x, y, h); hash bu değerlerden hesaplanır."""
+    return round(lat*1000000), round(lon*1000000), int(hed)
+
+def waypoint_digest(id,lat,lon,hed):
+    # CRC32 XOR'a göre doğrusal olduğundan düzenli (ızgara) waypointlerin CRC'leri XOR'da birbirini götürebilir
+    # ve farklı düğüm boş görünür; yaprak hash'leri XOR ile birleştiği için doğrusal olmayan bir özet kullanılır.
+    x,y,h=wire_values(lat,lon,hed)
+    return int.from_bytes(hashlib.blake2b(f"{id}:{x}:{y}:{h}".encode("utf-8"),digest_size=4).digest(),"big")
+
+def leaf_of(id):
+    return zlib.crc32(str(id).encode("utf-8"))%SYNC_LEAVES
+
+def node_level(node):
+    level=0
+    first=0 # Bu seviyedeki ilk düğümün numarası
+    while node>=first+SYNC_FANOUT**level:
+        first+=SYNC_FANOUT**level
+        level+=1
+    return level,node-first
+
+def node_leaves(node):
+    """Düğümün kapsadığı yaprak aralığı [başlangıç, bitiş)."""
+    level,index=node_level(node)
+    span=SYNC_FANOUT**(SYNC_DEPTH-level)
+    return index*span,(index+1)*span
+
+def node_children(node):
+    first=node*SYNC_FANOUT+1
+    return range(first,first+SYNC_FANOUT)
+
 class waypoints:
-    def __init__(self):
+    def __init__(self, geofence=None):
         self.list={}
+        self.geofence=geofence # Verilirse sınır dışındaki waypointler reddedilir
+        # Merkle benzeri özet: yaprak, içindeki waypoint hash'lerinin XOR'u; iç düğüm, çocuklarının XOR'u.
+        # XOR sayesinde ekleme/silme O(1) güncellenir, sıra önemsizdir. İrtifa hash'e girmez (drone kendi irtifasını kullanır).
+        self.leaf_hashes=[0]*SYNC_LEAVES
+        self._digests={}
+        self.version=0 # Her değişiklikte artar; senkronizasyondan sonra karşı tarafın sürümüne eşitlenir
+        self.on_change=None # Verilirse her değişiklikte (id, Waypoint veya silindiyse None) ile çağrılır; kalıcı depo için
+
+    def _set(self,id,wp):
+        old=self._digests.get(id)
+        digest=waypoint_digest(id,wp.lat,wp.lon,wp.hed)
+        leaf=leaf_of(id)
+        if old is not None:
+            self.leaf_hashes[leaf]^=old
+        self.leaf_hashes[leaf]^=digest
+        self._digests[id]=digest
+        self.list[id]=wp
+        if self.on_change is not None:
+            self.on_change(id,wp)
+
+    def _discard(self,id):
+        wp=self.list.pop(id)
+        self.leaf_hashes[leaf_of(id)]^=self._digests.pop(id)
+        if self.on_change is not None:
+            self.on_change(id,None)
+        return wp
+
+    def node_hash(self,node):
+        start,end=node_leaves(node)
+        return reduce(xor,self.leaf_hashes[start:end],0)
+
+    def short_hash(self,node):
+        """Paketlere sığması için düğüm hash'inin 16 bitlik hali."""
+        return self.node_hash(node)&0xFFFF
+
+    def root_hash(self):
+        return zlib.crc32(b"".join(self.node_hash(node).to_bytes(4,"big") for node in node_children(0)))
+
+    def node_ids(self,node):
+        start,end=node_leaves(node)
+        return [id for id in self.list if start<=leaf_of(id)<end]
+
     def add(self,id,lat,lon,alt,hed):
-        self.list[id]=Waypoint(lat,lon,alt,hed)
+        if self.geofence is not None and not self.geofence.contains(lat,lon):
+            print(f"    Waypoint reddedildi (geofence dışında): id={id}, latitude={lat}, longitude={lon}")
+            return False
+        self._set(id,Waypoint(lat,lon,alt,hed))
+        self.version+=1
         print(f"    Waypoint eklendi/güncellendi: id={id}, latitude={lat}, longitude={lon}, altitude={alt}, heading={hed}")
+        return True
+
+    def add_many(self,items):
+        """(id, lat, lon, alt, hed) kayıtlarını toplu ekler; eklenen id listesini döndürür."""
+        added=[]
+        rejected=0
+        for id,lat,lon,alt,hed in items:
+            if self.geofence is not None and not self.geofence.contains(lat,lon):
+                rejected+=1
+                continue
+            self._set(id,Waypoint(lat,lon,alt,hed))
+            added.append(id)
+        if added:
+            self.version+=1
+            print(f"    {len(added)} waypoint eklendi/güncellendi: id={added[0]}..{added[-1]}" + (f", {rejected} waypoint geofence dışında reddedildi" if rejected else ""))
+        elif rejected:
+            print(f"    {rejected} waypoint geofence dışında reddedildi")
+        return added
+
+    def apply_batch(self,upserts=(),removals=(),version=None):
+        """
+        Senkronizasyonla gelen değişiklikleri tek seferde uygular.
+        :param upserts: (id, lat, lon, alt, hed) kayıtları.
+        :param removals: Silinecek id'ler.
+        :param version: Verilirse depo sürümü buna eşitlenir (karşı tarafın sürümü).
+        :return: (eklenen/güncellenen, silinen) sayıları.
+        """
+        removed=0
+        for id in removals:
+            if id in self.list:
+                self._discard(id)
+                removed+=1
+        added=len(self.add_many(upserts)) if upserts else 0
+        if added or removed:
+            print(f"    Waypoint senkronizasyonu: {added} eklendi/güncellendi, {removed} silindi")
+        self.version=self.version+1 if version is None else version
+        return added,removed
 
     def read(self,id):
         try:
@@ -19,7 +144,8 @@ class waypoints:
 
     def remove(self,id):
         try:
-            self.list.pop(id)
+            self._discard(id)
+            self.version+=1
             print(f"    Waypoint silindi: id={id}")
         except KeyError:
             print(f"    Waypoint silme başarısız: id={id} bulunamadı.")
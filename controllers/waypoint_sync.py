@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+import time
+
+try:
+    from xbee_controller import XBeePackage, MAX_PAYLOAD_SIZE
+    from waypoint_controller import wire_values, leaf_of, node_leaves, node_level, node_children, SYNC_DEPTH
+except ImportError: # Proje kökünden (controllers paketi olarak) içe aktarıldığında
+    from controllers.xbee_controller import XBeePackage, MAX_PAYLOAD_SIZE
+    from controllers.waypoint_controller import wire_values, leaf_of, node_leaves, node_level, node_children, SYNC_DEPTH
+
+# 'S' (senkronizasyon) paketinin "f" alanı; düğüm numaraları waypoint_controller'daki hash ağacına göredir
+SYNC_SUMMARY = "R"  # Yer istasyonu -> drone: {"v": sürüm, "h": kök hash}
+SYNC_HASHES = "B"   # Drone -> yer istasyonu: {"n": ilk düğüm, "b": [ardışık düğümlerin 16 bitlik hash'leri]}
+SYNC_DESCEND = "D"  # Yer istasyonu -> drone: {"n": [çocuklarının hash'i istenen düğümler]}
+SYNC_NODE_END = "E" # Yer istasyonu -> drone: {"n": düğüm, "w": [düğümdeki id'ler], "e": 1 (son parça)}
+SYNC_ACK = "A"      # Drone -> yer istasyonu: {"v": eşitlenen sürüm}
+DEFAULT_LEAF_SIZE = 4 # Bu kadar veya daha az waypoint içeren farklı düğüm inilmeden doğrudan gönderilir
+
+def _wire_id(id):
+    return int(id) if str(id).isdigit() else id
+
+def _packed(sender: str, params_for, items: list):
+    """items'ı 72 bayt sınırına sığan parçalara böler; params_for(parça) en uzun haliyle paket parametrelerini üretir."""
+    chunk = []
+    for item in items:
+        candidate = chunk + [item]
+        if chunk and len(bytes(XBeePackage(package_type="S", sender=sender, params=params_for(candidate)))) > MAX_PAYLOAD_SIZE:
+            yield chunk
+            chunk = [item]
+        else:
+            chunk = candidate
+    yield chunk
+
+def _in_node(id, node) -> bool:
+    start, end = node_leaves(node)
+    return start <= leaf_of(id) < end
+
+class WaypointSyncServer:
+    '''
+    Yer istasyonu tarafı: waypoint deposunun özetini gönderir ve dronun bildirdiği hash'lerle ağaçta sadece
+    farklı dallara iner. Küçük (veya yaprak) farklı düğümlerin waypointleri ('W') ve id listesi ('S'/E) gönderilir.
+    '''
+    def __init__(self, store, sender: str = "0", leaf_size: int = DEFAULT_LEAF_SIZE):
+        self.store = store
+        self.sender = sender
+        self.leaf_size = leaf_size
+        self.acked = {} # drone_id -> dronun onayladığı sürüm
+
+    def needs_sync(self, drone_id: str) -> bool:
+        return self.acked.get(drone_id) != self.store.version
+
+    def summary_package(self) -> XBeePackage:
+        return XBeePackage(package_type="S", sender=self.sender,
+                           params={"f": SYNC_SUMMARY, "v": self.store.version, "h": self.store.root_hash()})
+
+    def _node_packages(self, node: int, ids: list) -> list:
+        packages = []
+        ids = sorted(ids, key=str)
+        for id in ids:
+            wp = self.store.list[id]
+            x, y, h = wire_values(wp.lat, wp.lon, wp.hed)
+            packages.append(XBeePackage(package_type="W", sender=str(id), params={"x": x, "y": y, "h": h}))
+        wire_ids = [_wire_id(id) for id in ids]
+        chunks = list(_packed(self.sender, lambda chunk: {"f": SYNC_NODE_END, "n": node, "w": chunk, "e": 1}, wire_ids))
+        for index, chunk in enumerate(chunks):
+            params = {"f": SYNC_NODE_END, "n": node, "w": chunk}
+            if index == len(chunks) - 1:
+                params["e"] = 1
+            packages.append(XBeePackage(package_type="S", sender=self.sender, params=params))
+        return packages
+
+    def handle(self, record) -> list:
+        """Dronun 'S' paketini işler; o drona gönderilecek paketleri döndürür."""
+        params = record.params
+        kind = params.get("f")
+        if kind == SYNC_ACK:
+            self.acked[record.sender] = params.get("v")
+            return []
+        if kind != SYNC_HASHES:
+            return []
+        packages = []
+        descend = []
+        for node, theirs in enumerate(params.get("b", []), start=params.get("n", 1)):
+            if self.store.short_hash(node) == theirs:
+                continue
+            ids = self.store.node_ids(node)
+            if node_level(node)[0] >= SYNC_DEPTH or len(ids) <= self.leaf_size:
+                packages.extend(self._node_packages(node, ids))
+            else:
+                descend.append(node)
+        if descend:
+            for chunk in _packed(self.sender, lambda chunk: {"f": SYNC_DESCEND, "n": chunk}, descend):
+                packages.append(XBeePackage(package_type="S", sender=self.sender, params={"f": SYNC_DESCEND, "n": chunk}))
+        return packages
+
+class WaypointSyncClient:
+    '''
+    Drone tarafı: özet farklıysa istenen düğümlerin çocuk hash'lerini gönderir; senkronizasyon sırasında gelen
+    'W' paketlerini biriktirir ve düğümün id listesi gelince o düğümü toplu (apply_batch) günceller.
+    '''
+    def __init__(self, store, sender: str, session_timeout: float = 10.0):
+        self.store = store
+        self.sender = sender
+        self.session_timeout = session_timeout
+        self._target = None # (sürüm, kök hash); oturum yoksa None
+        self._started = 0.0
+        self._staged = {} # id -> (id, lat, lon, alt, hed)
+        self._node_ids = {} # düğüm -> gelen id'ler (çok parçalı liste için)
+
+    @property
+    def active(self) -> bool:
+        return self._target is not None
+
+    def _expire(self, now: float):
+        if self._target is not None and now - self._started > self.session_timeout:
+            print(f"Waypoint senkronizasyonu zaman aşımı; {len(self._staged)} bekleyen waypoint uygulanıyor.")
+            self._finish()
+
+    def _finish(self):
+        if self._staged:
+            self.store.apply_batch(list(self._staged.values()))
+        self._target = None
+        self._staged = {}
+        self._node_ids = {}
+
+    def _ack(self, version) -> list:
+        return [XBeePackage(package_type="S", sender=self.sender, params={"f": SYNC_ACK, "v": version})]
+
+    def _hash_packages(self, parents) -> list:
+        packages = []
+        for parent in parents:
+            children = node_children(parent)
+            hashes = [self.store.short_hash(node) for node in children]
+            first = children[0]
+            for chunk in _packed(self.sender, lambda chunk: {"f": SYNC_HASHES, "n": children[-1], "b": chunk}, hashes):
+                packages.append(XBeePackage(package_type="S", sender=self.sender, params={"f": SYNC_HASHES, "n": first, "b": chunk}))
+                first += len(chunk)
+        return packages
+
+    def stage(self, id, lat, lon, alt, hed, now: float = None) -> bool:
+        """Oturum açıksa 'W' paketini biriktirir ve True döndürür; değilse paket normal işlenmelidir."""
+        self._expire(time.time() if now is None else now)
+        if self._target is None:
+            return False
+        self._staged[id] = (id, lat, lon, alt, hed)
+        return True
+
+    def handle(self, record, now: float = None) -> list:
+        """Yer istasyonunun 'S' paketini işler; cevap paketlerini döndürür."""
+        now = time.time() if now is None else now
+        self._expire(now)
+        params = record.params
+        kind = params.get("f")
+        if kind == SYNC_SUMMARY:
+            version, root = params.get("v"), params.get("h")
+            if root == self.store.root_hash():
+                self._finish()
+                self.store.version = version
+                return self._ack(version)
+            self._target = (version, root)
+            self._started = now
+            return self._hash_packages([0])
+        if self._target is None:
+            return []
+        if kind == SYNC_DESCEND:
+            return self._hash_packages(params.get("n", []))
+        if kind == SYNC_NODE_END:
+            node = params.get("n")
+            ids = self._node_ids.setdefault(node, set())
+            ids.update(str(id) for id in params.get("w", []))
+            if not params.get("e"):
+                return []
+            del self._node_ids[node]
+            upserts = [self._staged.pop(id) for id in list(self._staged) if _in_node(id, node)]
+            removals = [id for id in self.store.node_ids(node) if id not in ids]
+            self.store.apply_batch(upserts, removals)
+            version, root = self._target
+            if self.store.root_hash() == root:
+                self._finish()
+                self.store.version = version
+                return self._ack(version)
+        return []
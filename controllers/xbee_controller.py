@@ -1,27 +1,75 @@
 #!/usr/bin/env python3
 
-import serial
-from digi.xbee.devices import XBeeDevice, RemoteXBeeDevice, XBee64BitAddress
-from digi.xbee.exception import XBeeException, TimeoutException
 import time
+import sys
+import random
 import threading
 import json
-from collections import deque
+from collections import deque, OrderedDict
+
+try:
+    from clock_sync import ClockSync, wall_ms
+    from tdma import TdmaSchedule
+except ImportError: # Proje kökünden (controllers paketi olarak) içe aktarıldığında
+    from controllers.clock_sync import ClockSync, wall_ms
+    from controllers.tdma import TdmaSchedule
+
+# "from xbee_controller import *" ile dışa aktarılan adlar. Tembel yüklenen serial/XBeeDevice/... globalleri
+# bilerek yoktur: içe aktaran modül ilk bağlantıdan önceki None değerini kopyalar ve hiç güncellenmezdi.
+__all__ = [
+    "DEFAULT_BAUD_RATE", "BROADCAST_ADDR_HEX", "MAX_PAYLOAD_SIZE", "load_xbee_library",
+    "XBeePackage", "ReceivedPackage",
+    "DROP_OLDEST", "DROP_NEWEST", "LATEST_PER_SENDER", "DEFAULT_RECEIVE_CAPACITY", "DEFAULT_RECEIVE_POLICIES",
+    "MAX_RECEIVE_CHANNELS", "ReceiveBuffer",
+    "SENDER_ID_PACKAGE_TYPES", "DEFAULT_NEIGHBOUR_EXPIRY", "MAX_CACHED_DEVICES", "Neighbour", "NeighbourTable",
+    "DEFAULT_RELAY_HOPS", "DEFAULT_RELAY_CACHE_SIZE", "DEFAULT_AUXILIARY_QUEUE_LIMIT", "SEQ_MODULO", "SeenCache",
+    "XBeeModule",
+]
 
 # --- Global Yapılandırma Sabitleri ---
 DEFAULT_BAUD_RATE = 57600
+BROADCAST_ADDR_HEX = "000000000000FFFF"
+MAX_PAYLOAD_SIZE = 72 # Bayt, XBee'nin tek pakette taşıyabildiği yaklaşık en büyük veri
 # Not: SEND_INTERVAL ve QUEUE_RETENTION artık XBeeModule'ün kendi parametreleri veya dahili sabitleri olacak.
 
+# --- Tembel (lazy) içe aktarma ---
+# pyserial ve digi-xbee ağır kütüphaneler; başlangıcı hızlandırmak için ilk bağlantıda yüklenirler.
+serial = None
+XBeeDevice = RemoteXBeeDevice = XBee64BitAddress = None
+XBeeException = TimeoutException = None
+
+def load_xbee_library():
+    """pyserial ve digi-xbee modüllerini ilk ihtiyaç anında yükler."""
+    global serial, XBeeDevice, RemoteXBeeDevice, XBee64BitAddress, XBeeException, TimeoutException
+    if XBeeDevice is None:
+        import serial as serial_module
+        from digi.xbee.devices import XBeeDevice as device_cls, RemoteXBeeDevice as remote_cls, XBee64BitAddress as addr_cls
+        from digi.xbee.exception import XBeeException as xbee_exc, TimeoutException as timeout_exc
+        serial = serial_module
+        XBeeDevice, RemoteXBeeDevice, XBee64BitAddress = device_cls, remote_cls, addr_cls
+        XBeeException, TimeoutException = xbee_exc, timeout_exc
+
 # --- XBeePackage Sınıfı ---
 class XBeePackage:
     '''
     XBee üzerinden gönderilecek/alınacak paket tanımlaması.
     Paketin 't' (type), 's' (sender) ve 'p' (parameters) alanları vardır.
+    Röle katmanı kullanıldığında 'q' (sıra no), 'o' (kaynak düğüm), 'k' (atlanan hop)
+    ve 'r' (hop limiti) alanları da eklenir.
+    timestamped=True ise paket gönderim anında 'm' (ms mod 2^32) zaman damgası alır.
     '''
-    def __init__(self, package_type: str, sender: str, params: dict = None):    
+    def __init__(self, package_type: str, sender: str, params: dict = None,
+                 seq: int = None, origin: str = None, hops: int = 0, hop_limit: int = None,
+                 sent_at: int = None, timestamped: bool = False):    
         self.package_type = package_type
         self.sender = sender
         self.params = params if params is not None else {}
+        self.seq = seq
+        self.origin = origin
+        self.hops = hops
+        self.hop_limit = hop_limit
+        self.sent_at = sent_at
+        self.timestamped = timestamped
 
     def to_json(self):
         """Paketi JSON formatında bir Python sözlüğüne dönüştürür."""
@@ -31,11 +79,21 @@ class XBeePackage:
         }
         if self.params:
             data["p"] = self.params
+        if self.seq is not None:
+            data["q"] = self.seq
+            data["o"] = self.origin
+            if self.hops:
+                data["k"] = self.hops
+            if self.hop_limit is not None:
+                data["r"] = self.hop_limit
+        if self.sent_at is not None:
+            data["m"] = self.sent_at
         return data
 
     def __bytes__(self):
         """Paketi JSON string'ine ve ardından UTF-8 bayt dizisine dönüştürür."""
-        json_data = json.dumps(self.to_json())
+        # Boşluksuz ayraçlar: 72 baytlık payload içinde röle alanlarına yer açar
+        json_data = json.dumps(self.to_json(), separators=(',', ':'))
         encoded_data = json_data.encode('utf-8')
         # Paket boyutu uyarısı send_package metodunda daha detaylı ele alınacak.
         return encoded_data
@@ -53,38 +111,447 @@ class XBeePackage:
         sender = json_data.get("s")
         params = json_data.get("p", {})
         
-        return cls(package_type, sender, params)
+        return cls(package_type, sender, params, json_data.get("q"), json_data.get("o"),
+                   json_data.get("k", 0), json_data.get("r"), json_data.get("m"))
+
+# --- ReceivedPackage Sınıfı ---
+class ReceivedPackage:
+    '''
+    Alınan paketin kompakt kaydı (__slots__).
+    Gelen çerçeve tek seferde bu kayda çözülür; XBeePackage ve ara sözlük oluşturulmaz.
+    Eski sözlük tabanlı kod için get(), [] ve 'in' desteklenir ('t', 's', 'p', 'error',
+    'raw_data_hex', 'source_addr' anahtarları).
+    '''
+    __slots__ = ("package_type", "sender", "params", "source_addr", "timestamp", "error", "raw_data",
+                 "seq", "origin", "hops", "hop_limit", "sent_at")
+
+    # Parametresiz paketler için paylaşılan sözlük; hiçbir yerde değiştirilmez. Düz dict olduğu için kayıt
+    # pickle ile radyo sürecinden aktarılabilir (MappingProxyType pickle edilemez).
+    _EMPTY_PARAMS = {}
+
+    def __init__(self, package_type=None, sender=None, params=None, source_addr=None,
+                 timestamp=0.0, error=None, raw_data=None, seq=None, origin=None, hops=0, hop_limit=None,
+                 sent_at=None):
+        self.package_type = package_type
+        self.sender = sender
+        self.params = params if params is not None else self._EMPTY_PARAMS
+        self.source_addr = source_addr
+        self.timestamp = timestamp
+        self.error = error
+        self.raw_data = raw_data # Sadece hatalı paketlerde saklanır (memoryview)
+        self.seq = seq
+        self.origin = origin
+        self.hops = hops
+        self.hop_limit = hop_limit
+        self.sent_at = sent_at # Göndericinin saatine göre gönderim damgası (ms mod 2^32)
+
+    @classmethod
+    def from_frame(cls, data, source_addr=None, timestamp=0.0):
+        """
+        Çerçeve verisini (bytes/bytearray/memoryview) doğrudan kayda çözer.
+        json.loads bayt dizisini kendisi çözdüğü için ayrıca decode edilmez; memoryview önce bytes'a
+        kopyalanmadan doğrudan tampondan metne çözülür.
+        Geçersiz çerçevede ValueError (JSONDecodeError/UnicodeDecodeError dahil) yükselir.
+        """
+        if isinstance(data, memoryview):
+            data = str(data, "utf-8")
+        json_data = json.loads(data)
+        if not isinstance(json_data, dict):
+            raise ValueError("Paket bir JSON nesnesi değil.")
+        params = json_data.get("p")
+        if params is not None and not isinstance(params, dict):
+            raise ValueError(f"Paket parametreleri ('p') sözlük değil: {type(params).__name__}")
+        seq = json_data.get("q")
+        if seq is None:
+            return cls(json_data.get("t"), json_data.get("s"), params, source_addr, timestamp,
+                       sent_at=json_data.get("m"))
+        return cls(json_data.get("t"), json_data.get("s"), params, source_addr, timestamp,
+                   seq=seq, origin=json_data.get("o"), hops=json_data.get("k", 0), hop_limit=json_data.get("r"),
+                   sent_at=json_data.get("m"))
+
+    @property
+    def raw_data_hex(self):
+        """Ham veriyi sadece istendiğinde hex string'e çevirir."""
+        return bytes(self.raw_data).hex() if self.raw_data is not None else None
+
+    def to_package(self):
+        """Kaydı bir XBeePackage nesnesine dönüştürür."""
+        return XBeePackage(self.package_type, self.sender, dict(self.params),
+                           self.seq, self.origin, self.hops, self.hop_limit, self.sent_at)
+
+    def to_json(self):
+        """Eski formatla uyumlu sözlük döndürür."""
+        if self.error is not None:
+            data = {"error": self.error, "source_addr": self.source_addr}
+            if self.raw_data is not None:
+                data["raw_data_hex"] = self.raw_data_hex
+            return data
+        data = {"t": self.package_type, "s": self.sender}
+        if self.params:
+            data["p"] = self.params
+        return data
+
+    # Sözlük tarzı erişim (geriye dönük uyumluluk)
+    _KEYS = {"t": "package_type", "s": "sender", "p": "params", "error": "error",
+             "raw_data_hex": "raw_data_hex", "source_addr": "source_addr"}
+
+    def get(self, key, default=None):
+        attr = self._KEYS.get(key)
+        if attr is None:
+            return default
+        value = getattr(self, attr)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"ReceivedPackage(error={self.error!r}, source_addr={self.source_addr!r})"
+        return f"ReceivedPackage(t={self.package_type!r}, s={self.sender!r}, p={self.params!r}, source_addr={self.source_addr!r})"
+
+# --- Alma Tamponu ---
+# Taşma politikaları
+DROP_OLDEST = "drop_oldest"             # Tampon doluysa en eski paket atılır
+DROP_NEWEST = "drop_newest"             # Tampon doluysa yeni gelen paket atılır
+LATEST_PER_SENDER = "latest_per_sender" # Her göndericiden sadece son paket tutulur (telemetri için)
+
+DEFAULT_RECEIVE_CAPACITY = 256
+DEFAULT_RECEIVE_POLICIES = {"G": LATEST_PER_SENDER}
+MAX_RECEIVE_CHANNELS = 32 # Bilinmeyen tiplerle kanal sayısının şişmesini engeller
+
+class ReceiveBuffer:
+    '''
+    Paket tipine göre ayrılmış, sınırlı boyutlu alma tamponu.
+    Her tipin kendi kanalı ve taşma politikası vardır. Süresi geçmiş paketler
+    okuma sırasında atılır, bu yüzden ayrı bir temizleyici thread gerekmez.
+    '''
+    def __init__(self, capacity: int = DEFAULT_RECEIVE_CAPACITY, retention_seconds: float = 10,
+                 policies: dict = None, default_policy: str = DROP_OLDEST):
+        """
+        :param capacity: Her paket tipi için tutulacak en fazla paket (veya gönderici) sayısı.
+        :param retention_seconds: Paketin okunabilir kalacağı en uzun süre (saniye).
+        :param policies: Paket tipine göre taşma politikası, örn. {"G": LATEST_PER_SENDER}.
+        :param default_policy: Politikası belirtilmemiş tipler için kullanılacak politika.
+        """
+        self.capacity = capacity
+        self.retention = retention_seconds
+        self.policies = dict(DEFAULT_RECEIVE_POLICIES if policies is None else policies)
+        self.default_policy = default_policy
+
+        self._channels = {} # paket tipi -> deque veya {gönderici: kayıt}
+        self._lock = threading.Lock()
+        self.drop_counts = {} # paket tipi -> {"overflow": n, "expired": n, "replaced": n}
+
+    def _count_drop(self, package_type, reason: str, count: int = 1):
+        counters = self.drop_counts.get(package_type)
+        if counters is None:
+            counters = self.drop_counts[package_type] = {"overflow": 0, "expired": 0, "replaced": 0}
+        counters[reason] += count
+
+    def _channel(self, package_type):
+        channel = self._channels.get(package_type)
+        if channel is None:
+            if len(self._channels) >= MAX_RECEIVE_CHANNELS and package_type not in self.policies:
+                package_type = None # Fazla tip geldiyse ortak kanala düşür
+                channel = self._channels.get(None)
+                if channel is not None:
+                    return package_type, channel
+            if self.policies.get(package_type, self.default_policy) == LATEST_PER_SENDER:
+                channel = {}
+            else:
+                channel = deque()
+            self._channels[package_type] = channel
+        return package_type, channel
+
+    def put(self, record) -> bool:
+        """Kaydı ilgili kanala ekler. Kayıt atıldıysa False döner."""
+        with self._lock:
+            package_type, channel = self._channel(record.package_type)
+            if isinstance(channel, dict):
+                if channel.pop(record.sender, None) is not None:
+                    self._count_drop(package_type, "replaced")
+                elif len(channel) >= self.capacity:
+                    # En uzun süredir güncellenmeyen göndericiyi at
+                    del channel[next(iter(channel))]
+                    self._count_drop(package_type, "overflow")
+                channel[record.sender] = record # Sona taşınır, sıra korunur
+                return True
+
+            if len(channel) >= self.capacity:
+                self._count_drop(package_type, "overflow")
+                if self.policies.get(package_type, self.default_policy) == DROP_NEWEST:
+                    return False
+                channel.popleft()
+            channel.append(record)
+            return True
+
+    def pop(self, now: float = None):
+        """
+        Tüm kanallar içinden en eski geçerli kaydı çıkarıp döndürür.
+        Süresi geçmiş kayıtlar bu sırada atılır. Tampon boşsa None döner.
+        """
+        if now is None:
+            now = time.time()
+        deadline = now - self.retention
+        with self._lock:
+            oldest_type = None
+            oldest = None
+            for package_type, channel in self._channels.items():
+                if isinstance(channel, dict):
+                    while channel:
+                        sender = next(iter(channel))
+                        head = channel[sender]
+                        if head.timestamp >= deadline:
+                            break
+                        del channel[sender]
+                        self._count_drop(package_type, "expired")
+                    else:
+                        continue
+                else:
+                    while channel and channel[0].timestamp < deadline:
+                        channel.popleft()
+                        self._count_drop(package_type, "expired")
+                    if not channel:
+                        continue
+                    head = channel[0]
+                if oldest is None or head.timestamp < oldest.timestamp:
+                    oldest_type, oldest = package_type, head
+
+            if oldest is None:
+                return None
+            channel = self._channels[oldest_type]
+            if isinstance(channel, dict):
+                del channel[oldest.sender]
+            else:
+                channel.popleft()
+            return oldest
+
+    def clear(self):
+        with self._lock:
+            self._channels.clear()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(channel) for channel in self._channels.values())
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def stats(self) -> dict:
+        """Kanal doluluklarını ve atılan paket sayaçlarını döndürür."""
+        with self._lock:
+            return {
+                "depth": {package_type: len(channel) for package_type, channel in self._channels.items()},
+                "drops": {package_type: dict(counters) for package_type, counters in self.drop_counts.items()},
+            }
+
+# --- Komşu Tablosu ---
+# 's' alanı drone id'si taşıyan paket tipleri (W/w/O paketlerinde 's' waypoint/görev numarasıdır)
+SENDER_ID_PACKAGE_TYPES = frozenset({"H", "G", "MC", "MS"})
+DEFAULT_NEIGHBOUR_EXPIRY = 30.0 # Saniye, bu süre duyulmayan komşu adreslenmez
+MAX_CACHED_DEVICES = 256
+
+class Neighbour:
+    '''Komşu tablosundaki tek bir kayıt.'''
+    __slots__ = ("address", "drone_id", "last_seen", "rssi")
+
+    def __init__(self, address: str, drone_id: str = None, last_seen: float = 0.0, rssi: int = None):
+        self.address = address
+        self.drone_id = drone_id
+        self.last_seen = last_seen
+        self.rssi = rssi
+
+    def __repr__(self):
+        return f"Neighbour(address={self.address!r}, drone_id={self.drone_id!r}, last_seen={self.last_seen:.1f}, rssi={self.rssi})"
+
+class NeighbourTable:
+    '''
+    Alınan çerçevelerden oluşturulan komşu tablosu (64-bit adres, drone id, son görülme, RSSI).
+    Adres başına RemoteXBeeDevice nesnelerini önbelleğe alır, böylece her gönderimde
+    yeni adres/cihaz nesnesi oluşturulmaz.
+    '''
+    def __init__(self, expiry_seconds: float = DEFAULT_NEIGHBOUR_EXPIRY):
+        self.expiry = expiry_seconds
+        self._by_address = {} # adres hex -> Neighbour
+        self._by_drone_id = {} # drone id -> adres hex
+        self._devices = {} # adres hex -> RemoteXBeeDevice
+        self._lock = threading.Lock()
+
+    def update(self, address: str, drone_id: str = None, now: float = None, rssi: int = None):
+        """Adresten paket duyulduğunu kaydeder; drone id biliniyorsa eşleştirir."""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            neighbour = self._by_address.get(address)
+            if neighbour is None:
+                neighbour = self._by_address[address] = Neighbour(address)
+            neighbour.last_seen = now
+            if rssi is not None:
+                neighbour.rssi = rssi
+            if drone_id is not None and neighbour.drone_id != drone_id:
+                if neighbour.drone_id is not None and self._by_drone_id.get(neighbour.drone_id) == address:
+                    del self._by_drone_id[neighbour.drone_id]
+                neighbour.drone_id = drone_id
+                self._by_drone_id[drone_id] = address
+
+    def update_rssi(self, address: str, rssi: int):
+        """Bilinen bir komşunun RSSI değerini günceller."""
+        with self._lock:
+            neighbour = self._by_address.get(address)
+            if neighbour is not None:
+                neighbour.rssi = rssi
+
+    def address_of(self, drone_id: str, now: float = None):
+        """Drone id'sinin güncel 64-bit adresini döndürür. Bilinmiyorsa veya süresi geçtiyse None."""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            address = self._by_drone_id.get(drone_id)
+            if address is None or now - self._by_address[address].last_seen > self.expiry:
+                return None
+            return address
+
+    def remote_device(self, local_device, address: str):
+        """Adres için önbellekteki RemoteXBeeDevice nesnesini döndürür, yoksa oluşturur."""
+        device = self._devices.get(address)
+        if device is None:
+            if len(self._devices) >= MAX_CACHED_DEVICES:
+                self._devices.clear()
+            device = RemoteXBeeDevice(local_device, XBee64BitAddress(bytes.fromhex(address)))
+            self._devices[address] = device
+        return device
+
+    def clear_devices(self):
+        """Önbellekteki uzak cihaz nesnelerini siler (yerel cihaz değiştiğinde gerekir)."""
+        self._devices.clear()
+
+    def neighbours(self, now: float = None) -> list:
+        """Süresi geçmemiş komşuların listesini döndürür."""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            return [neighbour for neighbour in self._by_address.values() if now - neighbour.last_seen <= self.expiry]
+
+# --- Röle (Çok Atlamalı İletim) ---
+DEFAULT_RELAY_HOPS = 2
+DEFAULT_RELAY_CACHE_SIZE = 512
+DEFAULT_AUXILIARY_QUEUE_LIMIT = 8 # Modülün kendi ürettiği paketler ('H' cevabı, röle) bu kuyruk derinliğinde atılır
+SEQ_MODULO = 65536 # Sıra numarası 16 bitte döner
+
+class SeenCache:
+    '''
+    Son görülen (kaynak, sıra no) çiftlerinin LRU önbelleği.
+    Aynı paketin birden fazla yoldan gelmesini ve broadcast fırtınasını engeller.
+    '''
+    def __init__(self, capacity: int = DEFAULT_RELAY_CACHE_SIZE):
+        self.capacity = capacity
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key) -> bool:
+        """Anahtar yeni ise ekler ve True döner; daha önce görüldüyse False döner."""
+        with self._lock:
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                return False
+            self._seen[key] = None
+            if len(self._seen) > self.capacity:
+                self._seen.popitem(last=False)
+            return True
+
+    def __len__(self):
+        return len(self._seen)
 
 # --- XBeeModule Sınıfı ---
 class XBeeModule:
     def __init__(self, port: str, baudrate: int = DEFAULT_BAUD_RATE, 
-                 send_interval: float = 1.0, queue_retention_seconds: int = 10): 
+                 send_interval: float = 1.0, queue_retention_seconds: int = 10,
+                 receive_capacity: int = DEFAULT_RECEIVE_CAPACITY, receive_policies: dict = None,
+                 node_id: str = None, relay_types=None, relay_hops: int = DEFAULT_RELAY_HOPS,
+                 relay_probability: float = 1.0, relay_cache_size: int = DEFAULT_RELAY_CACHE_SIZE,
+                 scheduler=None, time_sync: bool = True, tdma: TdmaSchedule = None,
+                 ground_station_id: str = "0", auxiliary_queue_limit: int = DEFAULT_AUXILIARY_QUEUE_LIMIT): 
         """
         XBee modülünü başlatır ve seri port ayarlarını yapar.
         :param port: XBee modülünün bağlı olduğu seri port.
         :param baudrate: Seri portun baud hızı.
         :param send_interval: Periyodik gönderimlerin aralığı (saniye).
-        :param queue_retention_seconds: Gelen/giden paket kuyruğunda paketin saklanma süresi (saniye).
+        :param queue_retention_seconds: Gelen paketin okunabilir kalacağı süre (saniye).
+        :param receive_capacity: Alma tamponunda paket tipi başına en fazla paket sayısı.
+        :param receive_policies: Paket tipine göre taşma politikası (bkz. ReceiveBuffer).
+        :param node_id: Bu düğümün drone id'si; röle için paketlere kaynak olarak yazılır.
+        :param relay_types: Röle edilecek paket tipleri (örn. {"G", "O"}). Boşsa röle kapalıdır.
+        :param relay_hops: Kendi paketlerimize yazılan en fazla hop sayısı.
+        :param relay_probability: Yeni bir paketin tekrar yayınlanma olasılığı (0-1).
+        :param relay_cache_size: Tekrar bastırma için hatırlanan (kaynak, sıra no) sayısı.
+        :param scheduler: Ortak zamanlayıcı (call_every(interval, callback) sunan, örn. TimerWheel).
+                          Verilirse modül kendi gönderici thread'ini açmaz; sürü simülasyonu için.
+        :param time_sync: Damgalı 'H' isteklerine cevap verilir ve eşlerin saat farkı/gecikmesi ölçülür.
+                          Sadece yer istasyonunun isteklerine veya bize adreslenmiş ("d") isteklere cevap verilir.
+        :param tdma: Verilirse paketler sadece bu çizelgedeki kendi penceremizde gönderilir (TdmaSchedule).
+                     Çizelge saati yer istasyonuna göre senkronize edilir; send_interval yok sayılır.
+        :param ground_station_id: Yer istasyonunun drone id'si.
+        :param auxiliary_queue_limit: Gönderim kuyruğunda bu kadar paket varsa modülün kendi ürettiği
+                                      paketler ('H' cevabı, röle) kuyruğa eklenmez, atılır.
         """
         self.port = port
         self.baudrate = baudrate
         self.send_interval = send_interval
         self.queue_retention = queue_retention_seconds
 
-        self.xbee_device: XBeeDevice = None
-        self.local_xbee_address: XBee64BitAddress = None
+        self.xbee_device = None # digi XBeeDevice
+        self.local_xbee_address = None # digi XBee64BitAddress
         self.is_api_mode: bool = False 
 
-        # Gelen ve giden sinyalleri depolamak için thread-safe kuyruklar
-        self.received_queue = deque() # Sadece gelen paketler
+        # Gelen paketler için sınırlı, tip bazlı tampon (kendi kilidi var)
+        self.received_queue = ReceiveBuffer(capacity=receive_capacity, retention_seconds=queue_retention_seconds,
+                                            policies=receive_policies)
         self.send_queue = deque()     # Gönderilecek paketler
-        self.queue_lock = threading.Lock() # Kuyruklara erişim için tek kilit
+        self.queue_lock = threading.Lock() # Gönderim kuyruğuna erişim için kilit
         
         # İç thread'ler
-        self.cleaner_thread = None
         self.sender_thread = None
+        self.scheduler = scheduler
+        self._send_handle = None # Ortak zamanlayıcıdaki periyodik gönderim işi
+        self._stop_event = threading.Event() # Gönderici thread'e durma bayrağı
+
+        # Bağlantı sağlığı (LinkSupervisor tarafından izlenir)
+        self.error_count = 0 # Toplam gönderim/seri port hatası
+        self.last_error = None
+        self.last_error_time = 0.0
+        self.last_receive_time = 0.0 # Son paket alınma zamanı
+        self.last_heartbeat_time = 0.0 # Son 'H' paketi alınma zamanı
         self.receiver_callback_set = False # Callback'in ayarlanıp ayarlanmadığını kontrol et
 
+        # 64-bit adres baytlarından intern edilmiş hex string'e önbellek (her pakette yeni string üretmemek için)
+        self._addr_cache = {}
+        self.neighbours = NeighbourTable()
+
+        # Röle katmanı
+        self.node_id = node_id
+        self.relay_types = frozenset(relay_types or ())
+        self.relay_hops = relay_hops
+        self.relay_probability = relay_probability
+        self.seen_packets = SeenCache(relay_cache_size)
+        self._next_seq = 0
+        self.relay_stats = {"forwarded": 0, "duplicates": 0, "suppressed": 0}
+
+        # Saat senkronizasyonu ve tek yönlü gecikme ölçümü
+        self.clock_sync = ClockSync(node_id=node_id) if time_sync else None
+        self.ground_station_id = ground_station_id
+        self.auxiliary_queue_limit = auxiliary_queue_limit
+        self.auxiliary_drops = 0 # Kuyruk dolu olduğu için atılan cevap/röle paketi
+        self.size_stats = {"stamp_dropped": 0, "relay_dropped": 0, "oversize": 0} # 72 bayta sığdırma
+        self.tdma = tdma
+        self._last_slot_start = None # Zamanlayıcı modunda aynı pencerede iki kez gönderilmez
+
         print(f"XBeeModule başlatılıyor: Port={self.port}, Baudrate={self.baudrate}")
     
     def connect(self):
@@ -92,6 +559,7 @@ class XBeeModule:
         if self.xbee_device and self.xbee_device.is_open():
             print("XBee zaten bağlı.")
             return True
+        load_xbee_library()
         try:
             self.xbee_device = XBeeDevice(self.port, self.baudrate)
             self.xbee_device.open()
@@ -117,6 +585,9 @@ class XBeeModule:
             # Sadece bir kere callback ata
             if not self.receiver_callback_set:
                 self.xbee_device.add_data_received_callback(self._receive_data_callback)
+                if self.is_api_mode:
+                    # RSSI bilgisi sadece ham API paketlerinde var
+                    self.xbee_device.add_packet_received_callback(self._packet_received_callback)
                 self.receiver_callback_set = True
             
             # Bağlantı kurulunca iç thread'leri başlat
@@ -140,68 +611,193 @@ class XBeeModule:
         """XBee cihazını kapatır ve seri port bağlantısını keser."""
         self._stop_internal_threads() # Thread'leri durdur
         if self.xbee_device and self.xbee_device.is_open():
-            self.xbee_device.close()
-            print(f"XBee bağlantısı '{self.port}' portunda kesildi.")
+            try:
+                self.xbee_device.close()
+                print(f"XBee bağlantısı '{self.port}' portunda kesildi.")
+            except Exception as e:
+                # Port fiziksel olarak koptuysa kapatma da hata verebilir
+                print(f"Uyarı: XBee portu kapatılırken hata: {e}")
         else:
             print("XBee zaten bağlı değil.")
         
         self.xbee_device = None
+        self.neighbours.clear_devices()
         self.local_xbee_address = None
         self.is_api_mode = False
         self.receiver_callback_set = False
 
+    def is_connected(self) -> bool:
+        """Seri port açık mı?"""
+        return bool(self.xbee_device and self.xbee_device.is_open())
+
+    def _record_error(self, error):
+        self.error_count += 1
+        self.last_error = str(error)
+        self.last_error_time = time.time()
+
     def _start_internal_threads(self):
-        """Modülün iç thread'lerini (gönderici ve temizleyici) başlatır."""
-        if not self.cleaner_thread or not self.cleaner_thread.is_alive():
-            self.cleaner_thread = threading.Thread(target=self._clean_queues_loop, name="XBeeCleanerThread", daemon=True)
-            self.cleaner_thread.start()
-        
+        """Modülün iç thread'lerini (gönderici) başlatır."""
+        self._stop_event.clear()
+        if self.scheduler is not None:
+            if self._send_handle is None:
+                if self.tdma is not None:
+                    self._send_handle = self.scheduler.call_every(self.tdma.min_slot_length / 2, self._tdma_tick)
+                else:
+                    self._send_handle = self.scheduler.call_every(self.send_interval, self._send_tick)
+            return
         if not self.sender_thread or not self.sender_thread.is_alive():
             self.sender_thread = threading.Thread(target=self._send_loop, name="XBeeSenderThread", daemon=True)
             self.sender_thread.start()
 
     def _stop_internal_threads(self):
-        """Modülün iç thread'lerini durdurur (şu an için Daemon olduklarından doğrudan kontrol edilemiyorlar)."""
-        # Daemon thread'ler program sonlandığında otomatik ölür.
-        # Eğer manuel kontrol gerekiyorsa, thread'lere bir bayrak eklemek gerekir.
-        pass
+        """Modülün iç thread'lerini durdurma bayrağıyla durdurur ve bitmelerini bekler."""
+        self._stop_event.set()
+        if self._send_handle is not None:
+            self._send_handle.cancel()
+            self._send_handle = None
+        if self.sender_thread and self.sender_thread.is_alive() and self.sender_thread is not threading.current_thread():
+            self.sender_thread.join(timeout=self.send_interval + 1.0)
+        self.sender_thread = None
 
-    def send_data(self, package: XBeePackage, remote_xbee_addr_hex: str = None):
+    def send_data(self, package: XBeePackage, remote_xbee_addr_hex: str = None, drone_id: str = None):
         """
         Belirtilen XBeePackage nesnesini gönderim kuyruğuna ekler.
         Gönderim işlemi arka plandaki _send_loop tarafından yönetilir.
         :param package: Gönderilecek XBeePackage nesnesi.
         :param remote_xbee_addr_hex: Hedef XBee'nin 64-bit adresi (hex string olarak).
                                   Sadece API modunda kullanılır. Broadcast için "000000000000FFFF".
+        :param drone_id: Hedef drone id'si. Komşu tablosunda adresi biliniyorsa unicast,
+                         bilinmiyorsa broadcast gönderilir. remote_xbee_addr_hex verildiyse yok sayılır.
         """
+        if remote_xbee_addr_hex is None and drone_id is not None:
+            remote_xbee_addr_hex = self.neighbours.address_of(drone_id)
+        if package.package_type in self.relay_types and self.node_id is not None and package.seq is None:
+            package = self._stamp_for_relay(package)
         with self.queue_lock:
             self.send_queue.append((package, remote_xbee_addr_hex))
         # print(f"Paket gönderim kuyruğuna eklendi: {package.package_type}")
 
+    def pending_count(self) -> int:
+        """Gönderim kuyruğunda bekleyen paket sayısı (geri basınç için)."""
+        return len(self.send_queue)
+
+    def send_capacity(self) -> float:
+        """Gönderici döngüsünün saniyede boşaltabildiği en fazla paket (TDMA'da pencere başına paket / çerçeve)."""
+        if self.tdma is not None:
+            return self.tdma.packets_per_slot / self.tdma.frame_length
+        return 1.0 / self.send_interval
+
+    def _enqueue_auxiliary(self, package: XBeePackage, remote_xbee_addr_hex: str = None) -> bool:
+        """
+        Modülün kendi ürettiği paketleri ('H' cevabı, röle) sınırlı şekilde kuyruğa ekler.
+        Kuyrukta auxiliary_queue_limit kadar paket varsa paket atılır; uygulama trafiği bunlarla boğulmaz.
+        """
+        with self.queue_lock:
+            if len(self.send_queue) >= self.auxiliary_queue_limit:
+                self.auxiliary_drops += 1
+                return False
+            self.send_queue.append((package, remote_xbee_addr_hex))
+            return True
+
+    def _stamp_for_relay(self, package: XBeePackage) -> XBeePackage:
+        """Paketin röle edilebilir bir kopyasını sıra no, kaynak ve hop limitiyle oluşturur."""
+        seq = self._next_seq
+        self._next_seq = (seq + 1) % SEQ_MODULO
+        self.seen_packets.add((self.node_id, seq)) # Kendi paketimiz geri gelirse yok sayılır
+        return XBeePackage(package.package_type, package.sender, package.params,
+                           seq=seq, origin=self.node_id, hops=0, hop_limit=self.relay_hops,
+                           sent_at=package.sent_at, timestamped=package.timestamped)
+
+    def _relay(self, record) -> bool:
+        """
+        Sıra numaralı bir paketi tekrar bastırma ve röle kurallarından geçirir.
+        Paket daha önce görüldüyse False döner (uygulamaya iletilmez).
+        """
+        if record.origin == self.node_id or not self.seen_packets.add((record.origin, record.seq)):
+            self.relay_stats["duplicates"] += 1
+            return False
+        if (record.package_type in self.relay_types and record.hop_limit is not None
+                and record.hops < record.hop_limit):
+            if random.random() < self.relay_probability:
+                # Gönderim damgası korunur: alıcı bilgi yaşını kaynağın gönderiminden ölçer
+                forwarded = XBeePackage(record.package_type, record.sender, record.params,
+                                        seq=record.seq, origin=record.origin,
+                                        hops=record.hops + 1, hop_limit=record.hop_limit, sent_at=record.sent_at)
+                if self._enqueue_auxiliary(forwarded): # Röle her zaman broadcast
+                    self.relay_stats["forwarded"] += 1
+                else:
+                    self.relay_stats["suppressed"] += 1
+            else:
+                self.relay_stats["suppressed"] += 1
+        return True
+
+    def _send_tick(self) -> bool:
+        """
+        Gönderim kuyruğundan bir paket alıp gönderir. Seri port işlemi kilit dışında yapılır.
+        Paket gönderildiyse True döner.
+        """
+        with self.queue_lock:
+            if not self.send_queue:
+                return False
+            item = self.send_queue.popleft()
+        if not self._do_send(*item):
+            if not self.is_connected():
+                # Port düştü: paket kaybolmasın, yeniden bağlanınca ilk sırada gönderilsin
+                with self.queue_lock:
+                    self.send_queue.appendleft(item)
+            return False
+        return True
+
+    def _frame_time(self, now: float = None) -> float:
+        """TDMA çerçeve saati: yer istasyonuyla senkronsa onun saati, değilse yerel saat."""
+        now = time.time() if now is None else now
+        if self.clock_sync is not None and self.tdma.node_id != self.tdma.ground_station_id:
+            clock = self.clock_sync.peers.get(self.tdma.ground_station_id)
+            if clock is not None and clock.synced:
+                return now + clock.offset_at(now)
+        return now
+
+    def _send_slot(self, slot_end: float):
+        """Kendi penceremizde, pencere bitene kadar en fazla packets_per_slot paket gönderir."""
+        for _ in range(self.tdma.packets_per_slot):
+            if self._frame_time() >= slot_end or not self._send_tick():
+                break
+
+    def _tdma_tick(self):
+        """Ortak zamanlayıcı modunda TDMA: penceremizin içindeysek (pencere başına bir kez) gönderir."""
+        self.tdma.update_swarm_size()
+        start, end = self.tdma.slot_window(self._frame_time())
+        if start <= self._frame_time() < end and start != self._last_slot_start:
+            self._last_slot_start = start
+            self._send_slot(end)
+
     def _send_loop(self):
-        """Arka planda gönderim kuyruğundaki paketleri periyodik olarak gönderir."""
-        while self.xbee_device and self.xbee_device.is_open():
-            with self.queue_lock:
-                if self.send_queue:
-                    package, remote_xbee_addr_hex = self.send_queue.popleft()
-                    self._do_send(package, remote_xbee_addr_hex)
-            time.sleep(self.send_interval)
+        """Arka planda gönderim kuyruğundaki paketleri periyodik olarak (TDMA'da kendi penceremizde) gönderir."""
+        while not self._stop_event.is_set() and self.is_connected():
+            if self.tdma is None:
+                self._send_tick()
+                self._stop_event.wait(self.send_interval)
+                continue
+            self.tdma.update_swarm_size()
+            frame_now = self._frame_time()
+            start, end = self.tdma.slot_window(frame_now)
+            if frame_now < start:
+                self._stop_event.wait(start - frame_now)
+                continue # Uyanınca pencere yeniden hesaplanır (sürü boyutu/saat farkı değişmiş olabilir)
+            self._send_slot(end)
+            self._stop_event.wait(max(0.0, end - self._frame_time()))
         print("XBee Sender Thread durduruldu.")
 
-    def _do_send(self, package: XBeePackage, remote_xbee_addr_hex: str = None):
-        """Paket gönderme işlemini gerçekleştirir."""
-        data_to_send = bytes(package)
-        
-        # Maksimum payload genellikle 72 byte.
-        if len(data_to_send) > 72: 
-            print(f"UYARI: Gönderilmek istenen paket boyutu ({len(data_to_send)} bayt) XBee'nin yaklaşık 72 bayt limitini aşıyor!")
-            # Bu durumda paketi göndermeyebilir veya kırpabilirsiniz. Şimdilik devam ediyoruz.
+    def _do_send(self, package: XBeePackage, remote_xbee_addr_hex: str = None) -> bool:
+        """Paket gönderme işlemini gerçekleştirir. Başarılıysa True döner."""
+        if self.xbee_device is None:
+            return False
+        data_to_send = self._encode_for_send(package)
 
         try:
             if self.is_api_mode:
-                if remote_xbee_addr_hex:
-                    remote_addr_obj = XBee64BitAddress(bytes.fromhex(remote_xbee_addr_hex)) 
-                    remote_xbee = RemoteXBeeDevice(self.xbee_device, remote_addr_obj)
+                if remote_xbee_addr_hex and remote_xbee_addr_hex.upper() != BROADCAST_ADDR_HEX:
+                    remote_xbee = self.neighbours.remote_device(self.xbee_device, remote_xbee_addr_hex)
                     self.xbee_device.send_data(remote_xbee, data_to_send)
                     # print(f"Paket API modunda gönderildi: Tipi='{package.package_type}', Hedef='{remote_xbee_addr_hex}', Boyut={len(data_to_send)} bayt")
                 else:
@@ -210,73 +806,136 @@ class XBeeModule:
             else:
                 self.xbee_device.send_data_local(data_to_send)
                 # print(f"Paket AT modunda gönderildi (Transparent): Tipi='{package.package_type}', Boyut={len(data_to_send)} bayt")
+            return True
             
         except TimeoutException:
             print(f"Hata: Paket gönderilirken zaman aşımı oluştu. Hedef XBee ulaşılamıyor olabilir.")
         except XBeeException as e:
             print(f"Hata: XBee gönderme hatası: {e}")
+            self._record_error(e)
         except Exception as e:
             print(f"Beklenmedik bir hata oluştu paket gönderilirken: {e}")
+            self._record_error(e)
+        return False
+
+    def _encode_for_send(self, package: XBeePackage) -> bytes:
+        """
+        Paketi gönderim anında damgalar (kuyrukta beklenen süre damgaya dahil olmasın) ve 72 bayta sığdırır.
+        Sığmazsa önce 'm' damgası, hâlâ sığmazsa röle alanları (q/o/k/r) atılır; paketin kendisi değişmez.
+        """
+        sent_at = wall_ms() if package.timestamped else package.sent_at
+        wire = XBeePackage(package.package_type, package.sender, package.params, package.seq, package.origin,
+                           package.hops, package.hop_limit, sent_at)
+        data = bytes(wire)
+        if len(data) > MAX_PAYLOAD_SIZE and wire.sent_at is not None:
+            wire.sent_at = None
+            data = bytes(wire)
+            self.size_stats["stamp_dropped"] += 1
+        if len(data) > MAX_PAYLOAD_SIZE and wire.seq is not None:
+            wire.seq = None # Röle edilemez ama teslim edilebilir; damga sığıyorsa geri eklenir
+            wire.sent_at = sent_at
+            data = bytes(wire)
+            if len(data) > MAX_PAYLOAD_SIZE and sent_at is not None:
+                wire.sent_at = None
+                data = bytes(wire)
+            self.size_stats["relay_dropped"] += 1
+        if len(data) > MAX_PAYLOAD_SIZE:
+            self.size_stats["oversize"] += 1
+            print(f"UYARI: Gönderilmek istenen paket boyutu ({len(data)} bayt) XBee'nin yaklaşık {MAX_PAYLOAD_SIZE} bayt limitini aşıyor!")
+        if (self.clock_sync is not None and wire.sent_at is not None and package.package_type == "H"
+                and "b" not in package.params):
+            self.clock_sync.note_request(wire.sent_at) # Cevap bu gönderim zamanıyla eşleştirilir
+        return data
 
     def read_received_data(self):
         """
-        Kuyruktan gelen ilk paketi okur ve döndürür.
-        Eğer kuyruk boşsa None döner.
+        Tampondan en eski geçerli paketi okur ve döndürür (ReceivedPackage).
+        Süresi geçmiş paketler atlanır. Eğer tampon boşsa None döner.
         """
-        with self.queue_lock:
-            if self.received_queue:
-                # Kuyrukta saklanan format: (timestamp, package_json_dict)
-                timestamp, package_data = self.received_queue.popleft()
-                return package_data
-            else: 
-                return None
+        return self.received_queue.pop()
+
+    def receive_stats(self) -> dict:
+        """Alma tamponunun doluluk ve atılan paket sayaçlarını döndürür."""
+        return self.received_queue.stats()
+
+    def _intern_addr(self, xbee_64bit_addr):
+        """64-bit adres nesnesini intern edilmiş hex string olarak döndürür."""
+        key = bytes(xbee_64bit_addr.address)
+        addr_hex = self._addr_cache.get(key)
+        if addr_hex is None:
+            addr_hex = sys.intern(key.hex())
+            self._addr_cache[key] = addr_hex
+        return addr_hex
+
+    def _source_addr(self, remote_device):
+        """Uzak cihazın 64-bit adresini intern edilmiş hex string olarak döndürür."""
+        return self._intern_addr(remote_device.get_64bit_addr())
 
     def _receive_data_callback(self, xbee_message):
         """
         XBee'den veri geldiğinde otomatik olarak çağrılan geri çağırma fonksiyonu.
-        Gelen verinin formatını moda göre işler ve kuyruğa ekler.
+        Gelen veri doğrudan bir ReceivedPackage kaydına çözülür ve kuyruğa eklenir.
         """
         data = xbee_message.data
+        now = time.time()
         
         # Uzak adres bilgisi sadece loglama/hata ayıklama için kullanılabilir
         remote_address_64bit = None
-        if hasattr(xbee_message, 'remote_device') and xbee_message.remote_device:
+        remote_device = getattr(xbee_message, 'remote_device', None)
+        if remote_device:
             try:
-                remote_address_64bit = xbee_message.remote_device.get_64bit_addr().address.hex() 
+                remote_address_64bit = self._source_addr(remote_device)
             except Exception as e:
                 # print(f"Uyarı: Uzak cihaz adres bilgisi alınamadı (geri çağırma içinde): {e}")
                 pass
             
         try:
-            received_package = XBeePackage.from_bytes(data)
-            # print(f"\n<<< Paket Alındı (Kaynak: {remote_address_64bit or 'Bilinmiyor'}) >>>")
-            # print(f"  Tip: {received_package.package_type}, Gönderen: {received_package.sender}")
-            with self.queue_lock:
-                self.received_queue.append((time.time(), received_package.to_json()))
-
-        except (json.JSONDecodeError, UnicodeDecodeError) as e:
-            # print(f"\n<<< Ham Metin/Bayt Verisi Alındı (Hata) >>>")
+            record = ReceivedPackage.from_frame(data, remote_address_64bit, now)
+        except ValueError as e: # JSONDecodeError, UnicodeDecodeError ve biçim hataları
             # print(f"  Kaynak: {remote_address_64bit or 'Bilinmiyor'}, Hata: {e}")
-            with self.queue_lock:
-                self.received_queue.append((time.time(), {"error": str(e), "raw_data_hex": data.hex(), "source_addr": remote_address_64bit}))
+            record = ReceivedPackage(source_addr=remote_address_64bit, timestamp=now, error=str(e), raw_data=memoryview(data))
         except Exception as e:
             # print(f"Hata: Gelen paket işlenirken beklenmedik sorun oluştu: {e}")
-            with self.queue_lock:
-                self.received_queue.append((time.time(), {"error": "Genel İşleme Hatası: " + str(e), "source_addr": remote_address_64bit}))
+            record = ReceivedPackage(source_addr=remote_address_64bit, timestamp=now, error="Genel İşleme Hatası: " + str(e))
 
-    def _clean_queues_loop(self):
-        """Belirli bir süreden eski kuyruk öğelerini temizler."""
-        while True:
-            now = time.time()
-            with self.queue_lock:
-                # Gelen kutusunu temizle
-                while self.received_queue and now - self.received_queue[0][0] > self.queue_retention: 
-                    self.received_queue.popleft()
-                # Giden kutusunu temizle (şimdilik gidenler hemen işlenip siliniyor, bu kısım gerekmiyebilir)
-                # Ancak bir hata durumunda veya gecikmede birikirse faydalı olabilir.
-                # while self.send_queue and now - self.send_queue[0][0][0] > self.queue_retention: 
-                #     self.send_queue.popleft()
-            time.sleep(1)
+        if record.seq is not None and record.error is None and not self._relay(record):
+            return
+
+        self.last_receive_time = now
+        if record.package_type == "H":
+            self.last_heartbeat_time = now
+        if self.tdma is not None and record.error is None and record.package_type in SENDER_ID_PACKAGE_TYPES:
+            self.tdma.observe_node(record.sender, now)
+
+        if self.clock_sync is not None and record.error is None and record.sent_at is not None:
+            if record.package_type == "H":
+                reply = self.clock_sync.handle_handshake(record)
+                # Sadece yer istasyonunun isteğine veya bize adreslenmiş isteğe cevap verilir; her düğüm her
+                # yayına cevap verseydi sürü büyüdükçe cevaplar kuyruğu doldururdu
+                addressed = record.params.get("d") == self.node_id or (
+                    record.sender == self.ground_station_id and self.node_id != self.ground_station_id)
+                if reply is not None and addressed and self.node_id is not None and record.hops == 0:
+                    self._enqueue_auxiliary(XBeePackage("H", self.node_id, reply, timestamped=True),
+                                            remote_address_64bit)
+            self.clock_sync.observe(record)
+
+        if remote_address_64bit is not None and record.error is None:
+            # Röle edilmiş paketin adresi röleye aittir, drone id eşlemesi sadece doğrudan paketlerden
+            relayed = record.hops > 0
+            drone_id = record.sender if record.package_type in SENDER_ID_PACKAGE_TYPES and not relayed else None
+            self.neighbours.update(remote_address_64bit, drone_id, now)
+
+        self.received_queue.put(record)
+
+    def _packet_received_callback(self, packet):
+        """Ham API paketlerinden RSSI bilgisini komşu tablosuna işler."""
+        rssi = getattr(packet, "rssi", None)
+        if rssi is None:
+            return
+        source = getattr(packet, "x64bit_source_addr", None)
+        if source is None:
+            return
+        self.neighbours.update_rssi(self._intern_addr(source), -rssi) # XBee RSSI'yı -dBm olarak pozitif verir
 
 # Dosya doğrudan çalıştırıldığında bir mesaj gösterelim
 if __name__ == '__main__':
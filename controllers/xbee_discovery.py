@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+import os
+import glob
+import json
+import time
+import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Sahada en sık kullanılan baud hızları (xbee_controller 57600, xbee_serial 9600 kullanıyor)
+COMMON_BAUD_RATES = (57600, 9600, 115200, 38400, 19200, 230400)
+API_PROBE_TIMEOUT = 0.15 # Saniye, API çerçevesine cevap bekleme süresi
+AT_GUARD_TIME = 1.05     # Saniye, XBee varsayılan GT (1 s) + pay
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".dronecore", "xbee_link.json")
+
+# AP parametresini soran API çerçevesi: 7E | uzunluk 0004 | 08 (AT komutu) 01 (frame id) 'A' 'P' | checksum
+API_AP_QUERY = bytes([0x7E, 0x00, 0x04, 0x08, 0x01, 0x41, 0x50, 0x65])
+
+class XBeeLink:
+    '''Bulunan XBee bağlantısı: port, baud hızı ve çalışma modu ("api" veya "at").'''
+    __slots__ = ("port", "baudrate", "mode")
+
+    def __init__(self, port: str, baudrate: int, mode: str):
+        self.port = port
+        self.baudrate = baudrate
+        self.mode = mode
+
+    def to_json(self):
+        return {"port": self.port, "baudrate": self.baudrate, "mode": self.mode}
+
+    def __repr__(self):
+        return f"XBeeLink(port={self.port!r}, baudrate={self.baudrate}, mode={self.mode!r})"
+
+def serial_port_of(address: str):
+    """MAVSDK adresindeki seri portu döndürür ("serial:///dev/ttyACM0:115200" -> "/dev/ttyACM0"); seri değilse None."""
+    if not address or not address.startswith("serial://"):
+        return None
+    port = address[len("serial://"):]
+    return port.rsplit(":", 1)[0] if ":" in port else port
+
+def _same_port(a: str, b: str) -> bool:
+    return a == b or os.path.realpath(a) == os.path.realpath(b)
+
+def candidate_ports(exclude=(), prefer=()) -> list:
+    """
+    XBee bağlı olabilecek seri portları listeler. prefer'dekiler (önbellek/yapılandırma) önce, sonra USB adaptörleri,
+    sonra ttyACM (çoğunlukla uçuş kontrolcüsü), en son dahili UART'lar gelir. exclude'daki portlar (örn. MAVSDK'nın
+    kullandığı uçuş kontrolcüsü portu) hiç denenmez.
+    """
+    ports = []
+    try:
+        from serial.tools import list_ports
+        ports.extend(info.device for info in list_ports.comports())
+    except ImportError:
+        pass
+    if platform.system() == 'Linux':
+        for pattern in ("/dev/ttyUSB*", "/dev/ttyACM*", "/dev/serial0", "/dev/ttyAMA*", "/dev/ttyS0"):
+            ports.extend(sorted(glob.glob(pattern)))
+    # Sırayı koruyarak tekrarları at; USB adaptörleri dahili UART'lardan önce denenir
+    unique = [port for port in dict.fromkeys(list(prefer) + ports)
+              if not any(_same_port(port, excluded) for excluded in exclude if excluded)]
+
+    def rank(port):
+        if port in prefer:
+            return 0
+        if "USB" in port or port.startswith("COM"):
+            return 1
+        return 2 if "ACM" in port else 3
+    return sorted(unique, key=rank)
+
+def _valid_api_response(data: bytes) -> bool:
+    """Gelen baytlar içinde AP sorgusuna ait geçerli bir AT komut cevabı (0x88) arar."""
+    start = data.find(b'\x7e')
+    while start != -1 and len(data) - start >= 9:
+        length = (data[start + 1] << 8) | data[start + 2]
+        frame = data[start + 3:start + 3 + length]
+        checksum = data[start + 3 + length:start + 4 + length]
+        if (len(frame) == length and checksum and frame[:4] == b'\x88\x01AP'
+                and (sum(frame) + checksum[0]) & 0xFF == 0xFF):
+            return True
+        start = data.find(b'\x7e', start + 1)
+    return False
+
+def _probe_api(ser):
+    ser.reset_input_buffer()
+    ser.write(API_AP_QUERY)
+    ser.flush()
+    deadline = time.monotonic() + API_PROBE_TIMEOUT
+    data = b''
+    while time.monotonic() < deadline:
+        data += ser.read(ser.in_waiting or 1)
+        if _valid_api_response(data):
+            return "api"
+    return None
+
+def _read_line(ser, timeout: float) -> bytes:
+    deadline = time.monotonic() + timeout
+    data = b''
+    while time.monotonic() < deadline and b'\r' not in data:
+        data += ser.read(ser.in_waiting or 1)
+    return data.split(b'\r', 1)[0]
+
+def _probe_at(ser):
+    """+++ ile komut moduna girer ve ATAP ile gerçek çalışma modunu okur ("at": şeffaf, "api": API)."""
+    ser.reset_input_buffer()
+    time.sleep(AT_GUARD_TIME) # Komut moduna geçiş için sessizlik süresi
+    ser.write(b'+++')
+    ser.flush()
+    deadline = time.monotonic() + AT_GUARD_TIME + 0.5
+    data = b''
+    while time.monotonic() < deadline:
+        data += ser.read(ser.in_waiting or 1)
+        if b'OK\r' in data:
+            ser.write(b'ATAP\r')
+            ser.flush()
+            api_mode = _read_line(ser, 0.5).strip()
+            ser.write(b'ATCN\r') # Komut modundan çık
+            ser.flush()
+            return "api" if api_mode not in (b'', b'0') else "at"
+    return None
+
+def probe_port(port: str, baud_rates=COMMON_BAUD_RATES, try_at_mode: bool = True, stop_event=None,
+               try_api_mode: bool = True):
+    """
+    Tek bir portu baud hızları üzerinde dener. Önce AT (+++) el sıkışması yapılır: şeffaf moddaki bir radyoya
+    gönderilen API çerçevesi havaya veri olarak iletilir, +++ ise iletilmez. AT cevabı alınamazsa API el sıkışması
+    denenir. Bulunursa XBeeLink, yoksa None döner.
+    """
+    import serial
+    probes = ([_probe_at] if try_at_mode else []) + ([_probe_api] if try_api_mode else [])
+    for probe in probes:
+        for baudrate in baud_rates:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            try:
+                with serial.Serial(port, baudrate, timeout=0.05, write_timeout=0.5) as ser:
+                    mode = probe(ser)
+                    if mode is not None:
+                        return XBeeLink(port, baudrate, mode)
+            except (serial.SerialException, OSError):
+                return None # Port açılamıyorsa diğer hızları denemeye gerek yok
+    return None
+
+def load_cached_link(cache_path: str = DEFAULT_CACHE_PATH):
+    """Son çalışan port/baud/mod bilgisini okur. Yoksa None döner."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return XBeeLink(data["port"], int(data["baudrate"]), data.get("mode", "api"))
+    except (OSError, ValueError, KeyError):
+        return None
+
+def save_cached_link(link: XBeeLink, cache_path: str = DEFAULT_CACHE_PATH):
+    """Çalışan bağlantı bilgisini bir sonraki açılış için kaydeder."""
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(link.to_json(), f)
+    except OSError as e:
+        print(f"Uyarı: XBee bağlantı önbelleği yazılamadı: {e}")
+
+def discover_xbee(ports=None, baud_rates=COMMON_BAUD_RATES, cache_path: str = DEFAULT_CACHE_PATH,
+                  use_cache: bool = True, max_workers: int = 8, exclude=()):
+    """
+    XBee radyosunu otomatik bulur.
+    Önce önbellekteki port/baud kayıtlı modunun tek sorgusuyla doğrulanır (anında yeniden bağlanma).
+    Olmazsa aday portlar (önbellekteki port önce) paralel olarak denenir; ilk bulunan sonuç döner ve önbelleğe yazılır.
+    :param exclude: Hiç denenmeyecek portlar (örn. uçuş kontrolcüsünün bağlı olduğu port).
+    :return: XBeeLink veya bulunamazsa None.
+    """
+    exclude = [port for port in exclude if port]
+    prefer = []
+    if use_cache:
+        cached = load_cached_link(cache_path)
+        if cached is not None and not any(_same_port(cached.port, port) for port in exclude):
+            prefer.append(cached.port)
+            link = probe_port(cached.port, (cached.baudrate,), try_at_mode=(cached.mode == "at"),
+                              try_api_mode=(cached.mode == "api"))
+            if link is not None:
+                print(f"XBee önbellekten bulundu: {link}")
+                return link
+
+    if ports is None:
+        ports = candidate_ports(exclude, prefer)
+    else:
+        ports = [port for port in ports if not any(_same_port(port, excluded) for excluded in exclude)]
+    if not ports:
+        print("XBee için aday seri port bulunamadı.")
+        return None
+
+    started = time.monotonic()
+    stop_event = threading.Event()
+    found = None
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(ports)), thread_name_prefix="XBeeProbe")
+    try:
+        futures = {executor.submit(probe_port, port, baud_rates, True, stop_event, True): port for port in ports}
+        for future in as_completed(futures):
+            link = future.result()
+            if link is not None:
+                found = link
+                stop_event.set() # Diğer portlardaki denemeleri durdur
+                break
+    finally:
+        # Diğer portlardaki denemeler durdurma bayrağını görünce kendiliğinden biter; beklemeyiz
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if found is None:
+        print(f"XBee bulunamadı ({len(ports)} port, {time.monotonic() - started:.1f} s).")
+        return None
+    print(f"XBee bulundu: {found} ({time.monotonic() - started:.1f} s)")
+    save_cached_link(found, cache_path)
+    return found
+
+if __name__ == '__main__':
+    discover_xbee()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import threading
+from collections import OrderedDict
+
+try:
+    from xbee_controller import XBeeModule, XBeePackage, SeenCache, DEFAULT_BAUD_RATE
+except ImportError: # Proje kökünden (controllers paketi olarak) içe aktarıldığında
+    from controllers.xbee_controller import XBeeModule, XBeePackage, SeenCache, DEFAULT_BAUD_RATE
+
+DEFAULT_DEDUPE_WINDOW = 0.5 # Saniye, farklı radyolardan gelen aynı paketin kopyası bu sürede yok sayılır
+
+# --- XBeeMultiLink Sınıfı ---
+class XBeeMultiLink:
+    '''
+    Birden fazla XBeeModule'ü (farklı port/kanal) tek bir modül gibi yönetir.
+    Giden paketler paket tipine göre belirli bir radyoya ya da en az yüklü radyoya dağıtılır.
+    Gelen paketler tek bir okuma API'sinde birleştirilir ve kopyaları atılır.
+    Bir port düşerse bekleyen paketleri çalışan radyolara aktarılır.
+    XBeeModule ile aynı connect/disconnect/send_data/read_received_data arayüzünü sunar.
+    '''
+    def __init__(self, ports, baudrate: int = DEFAULT_BAUD_RATE, type_routes: dict = None,
+                 dedupe_window: float = DEFAULT_DEDUPE_WINDOW, module_cls=XBeeModule, **module_kwargs):
+        """
+        :param ports: Port listesi. Elemanlar "COM3" gibi string ya da ("COM3", 57600) çifti olabilir.
+        :param baudrate: Baud hızı belirtilmemiş portlar için kullanılacak hız.
+        :param type_routes: Paket tipini radyo indeksine eşler, örn. {"G": 0, "O": 1}.
+                            Eşleşmeyen tipler en az yüklü radyoya gider.
+        :param dedupe_window: Sıra numarası olmayan paketlerin kopya sayılacağı süre (saniye).
+        :param module_cls: Her radyo için oluşturulacak modül sınıfı (test/simülasyon için LoopbackXBeeModule).
+        :param module_kwargs: Her XBeeModule'e aynen aktarılan ek parametreler.
+        """
+        self.links = []
+        for port in ports:
+            if isinstance(port, (tuple, list)):
+                port, link_baudrate = port
+            else:
+                link_baudrate = baudrate
+            self.links.append(module_cls(port=port, baudrate=link_baudrate, **module_kwargs))
+
+        # Röle/sıra numaralı paketler için ortak önbellek: bir radyodan gelen paket diğerinden tekrar alınmaz
+        self.seen_packets = SeenCache(self.links[0].seen_packets.capacity) if self.links else SeenCache()
+        for link in self.links:
+            link.seen_packets = self.seen_packets
+
+        self.type_routes = dict(type_routes or {})
+        self.dedupe_window = dedupe_window
+        self._recent = OrderedDict() # (tip, gönderici, parametreler) -> alınma zamanı
+        self._read_index = 0
+        self._lock = threading.Lock()
+        self.duplicate_count = 0
+
+        print(f"XBeeMultiLink başlatılıyor: {len(self.links)} radyo ({', '.join(link.port for link in self.links)})")
+
+    @staticmethod
+    def is_link_up(link) -> bool:
+        return bool(link.xbee_device and link.xbee_device.is_open())
+
+    def active_links(self) -> list:
+        return [link for link in self.links if self.is_link_up(link)]
+
+    def connect(self) -> bool:
+        """Tüm radyolara bağlanır. En az biri bağlandıysa True döner."""
+        results = [link.connect() for link in self.links]
+        return any(results)
+
+    def disconnect(self):
+        for link in self.links:
+            link.disconnect()
+
+    def _failover(self, active: list):
+        """Düşen radyoların gönderim kuyruğundaki paketleri çalışan radyolara aktarır."""
+        if not active:
+            return
+        for link in self.links:
+            if link in active or not link.send_queue:
+                continue
+            with link.queue_lock:
+                pending = list(link.send_queue)
+                link.send_queue.clear()
+            target = min(active, key=lambda l: len(l.send_queue))
+            with target.queue_lock:
+                target.send_queue.extend(pending)
+            print(f"XBeeMultiLink: '{link.port}' düştü, {len(pending)} paket '{target.port}' portuna aktarıldı.")
+
+    def _pick_link(self, package: XBeePackage, active: list):
+        route = self.type_routes.get(package.package_type)
+        if route is not None and route < len(self.links) and self.links[route] in active:
+            return self.links[route]
+        return min(active, key=lambda l: len(l.send_queue))
+
+    def send_data(self, package: XBeePackage, remote_xbee_addr_hex: str = None, drone_id: str = None):
+        """
+        Paketi uygun radyonun gönderim kuyruğuna ekler.
+        drone_id verildiyse ve bir radyonun komşu tablosunda biliniyorsa paket o radyodan unicast gider.
+        """
+        active = self.active_links()
+        self._failover(active)
+        if not active:
+            # Hiçbir radyo açık değil; paket ilk radyoda bekler, bağlantı gelince gönderilir
+            self.links[0].send_data(package, remote_xbee_addr_hex, drone_id)
+            return
+
+        if remote_xbee_addr_hex is None and drone_id is not None:
+            for link in active:
+                address = link.neighbours.address_of(drone_id)
+                if address is not None:
+                    link.send_data(package, remote_xbee_addr_hex=address)
+                    return
+        self._pick_link(package, active).send_data(package, remote_xbee_addr_hex, drone_id)
+
+    def pending_count(self) -> int:
+        """Tüm radyoların gönderim kuyruklarında bekleyen paket sayısı."""
+        return sum(len(link.send_queue) for link in self.links)
+
+    def send_capacity(self) -> float:
+        """Açık radyoların toplam gönderim kapasitesi (paket/saniye)."""
+        return sum(link.send_capacity() for link in self.active_links())
+
+    def _is_duplicate(self, record) -> bool:
+        """Sıra numarası olmayan paketlerin farklı radyolardan gelen kopyalarını yakalar."""
+        if record.seq is not None or record.error is not None:
+            return False # Sıra numaralı paketler ortak SeenCache ile zaten ayıklanıyor
+        deadline = record.timestamp - self.dedupe_window
+        while self._recent and next(iter(self._recent.values())) < deadline:
+            self._recent.popitem(last=False)
+        key = (record.package_type, record.sender, repr(record.params))
+        seen_at = self._recent.get(key)
+        self._recent[key] = record.timestamp
+        self._recent.move_to_end(key)
+        return seen_at is not None and record.timestamp - seen_at <= self.dedupe_window
+
+    def read_received_data(self):
+        """Radyolardan sırayla okur, kopyaları atar. Okunacak paket yoksa None döner."""
+        with self._lock:
+            for _ in range(len(self.links)):
+                link = self.links[self._read_index]
+                self._read_index = (self._read_index + 1) % len(self.links)
+                while True:
+                    record = link.read_received_data()
+                    if record is None:
+                        break
+                    if self._is_duplicate(record):
+                        self.duplicate_count += 1
+                        continue
+                    return record
+            return None
+
+    def receive_stats(self) -> dict:
+        """Her radyonun alma tamponu istatistiklerini ve atılan kopya sayısını döndürür."""
+        return {
+            "links": {link.port: link.receive_stats() for link in self.links},
+            "duplicates": self.duplicate_count,
+            "up": [link.port for link in self.active_links()],
+        }
+
+if __name__ == '__main__':
+    print("xbee_multilink.py birden fazla XBee radyosunu tek modül gibi kullanmak için XBeeMultiLink sınıfını içerir.")
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+import time
+import pickle
+import asyncio
+import threading
+import multiprocessing
+from collections import deque
+
+try:
+    from xbee_controller import XBeeModule, ReceiveBuffer, DEFAULT_BAUD_RATE, DEFAULT_RECEIVE_CAPACITY
+    from clock_sync import ClockSync
+except ImportError: # Proje kökünden (controllers paketi olarak) içe aktarıldığında
+    from controllers.xbee_controller import XBeeModule, ReceiveBuffer, DEFAULT_BAUD_RATE, DEFAULT_RECEIVE_CAPACITY
+    from controllers.clock_sync import ClockSync
+
+DEFAULT_BATCH_INTERVAL = 0.005 # Saniye; radyo süreci gelen paketleri bu aralıkla toplu iletir
+STATUS_INTERVAL = 0.05 # Saniye; durum (kuyruk, hata sayısı, saat farkları) en fazla bu aralıkla iletilir
+
+def _module_status(module: XBeeModule, accepted: int) -> dict:
+    status = {"connected": module.is_connected(), "pending": module.pending_count(), "accepted": accepted,
+              "error_count": module.error_count, "last_error": module.last_error,
+              "last_receive_time": module.last_receive_time, "last_heartbeat_time": module.last_heartbeat_time,
+              "receive_stats": module.receive_stats()}
+    if module.clock_sync is not None:
+        status["clocks"] = {peer_id: (clock.offset, clock.drift, clock.reference_time, clock.delay)
+                            for peer_id, clock in module.clock_sync.peers.items() if clock.synced}
+    return status
+
+def _send_received(conn, batch: list):
+    """
+    Alınan paketleri ana sürece iletir. Grup pickle edilemezse paketler tek tek denenir ve sadece
+    taşınamayanlar atılır; tek bir bozuk paket radyo sürecini sonlandırmaz.
+    """
+    try:
+        conn.send(("received", batch))
+        return
+    except (TypeError, ValueError, AttributeError, pickle.PicklingError) as e:
+        print(f"Radyo süreci: alınan paket grubu iletilemedi ({e}); paketler tek tek gönderiliyor.")
+    for record in batch:
+        try:
+            conn.send(("received", [record]))
+        except (TypeError, ValueError, AttributeError, pickle.PicklingError) as e:
+            print(f"Radyo süreci: paket atıldı ({record!r}): {e}")
+
+def _radio_process_main(conn, module_kwargs: dict, batch_interval: float, module_cls=XBeeModule):
+    """
+    Radyo sürecinin ana döngüsü: seri port, çerçeveleme, kodlama, röle, TDMA ve 'H' cevapları burada çalışır.
+    Ana süreçten gelen komutlar toplu işlenir, alınan paketler toplu gönderilir.
+    :param module_cls: Süreçte oluşturulan modül sınıfı (simülasyon ve testler için LoopbackXBeeModule).
+    """
+    module = module_cls(**module_kwargs)
+    accepted = 0 # Gönderim kuyruğuna alınan toplam paket (ana süreç kuyruk derinliğini buradan hesaplar)
+    last_status = 0.0
+    running = True
+    while running:
+        changed = False
+        if conn.poll(batch_interval):
+            while running and conn.poll():
+                command, *args = conn.recv()
+                changed = True
+                try:
+                    if command == "send":
+                        for package, remote_xbee_addr_hex, drone_id in args[0]:
+                            module.send_data(package, remote_xbee_addr_hex, drone_id)
+                        accepted += len(args[0])
+                    elif command == "connect":
+                        conn.send(("connected", module.connect()))
+                    elif command == "disconnect":
+                        module.disconnect()
+                        conn.send(("disconnected",))
+                    elif command == "set":
+                        setattr(module, args[0], args[1])
+                    elif command == "stop":
+                        running = False
+                except Exception as e:
+                    # Süreç ayakta kalır; bekleyen ana süreç cevabı almalı, yoksa zaman aşımına kadar bloklanır
+                    print(f"Radyo süreci: '{command}' komutu başarısız: {e}")
+                    module._record_error(e)
+                    if command == "connect":
+                        conn.send(("connected", False))
+                    elif command == "disconnect":
+                        conn.send(("disconnected",))
+        batch = []
+        while True:
+            record = module.read_received_data()
+            if record is None:
+                break
+            if record.raw_data is not None:
+                record.raw_data = bytes(record.raw_data) # memoryview süreçler arası taşınamaz
+            batch.append(record)
+        if batch:
+            _send_received(conn, batch)
+        now = time.time()
+        if changed or batch or now - last_status >= STATUS_INTERVAL:
+            conn.send(("status", _module_status(module, accepted)))
+            last_status = now
+    module.disconnect()
+    conn.close()
+
+class XBeeProcessModule:
+    '''
+    XBeeModule'ü ayrı bir süreçte çalıştıran vekil (proxy).
+    digi-xbee okuyucu thread'i, gönderici thread'i, JSON kodlama/çözme ve röle işleri radyo sürecinde çalışır;
+    controller'ın event loop'u ve MAVSDK akışlarıyla GIL için yarışmaz. İki süreç bir Pipe üzerinden toplu
+    mesajlarla haberleşir: aynı event loop turunda yapılan send_data çağrıları tek mesajda gider, gelen
+    paketler radyo sürecinde biriktirilip batch_interval aralıkla gelir.
+    XBeeModule ile aynı connect/disconnect/send_data/read_received_data/pending_count arayüzünü sunar.
+    Ana süreçte thread açılmaz; gelen mesajlar API çağrıldıkça boru bloklanmadan okunur.
+    '''
+    def __init__(self, port: str, baudrate: int = DEFAULT_BAUD_RATE, batch_interval: float = DEFAULT_BATCH_INTERVAL,
+                 receive_capacity: int = DEFAULT_RECEIVE_CAPACITY, receive_policies: dict = None,
+                 queue_retention_seconds: int = 10, time_sync: bool = True, module_cls=XBeeModule, **module_kwargs):
+        """
+        :param batch_interval: Radyo sürecinin gelen paketleri toplayıp ilettiği aralık (saniye).
+        :param module_cls: Radyo sürecinde oluşturulan modül sınıfı (varsayılan XBeeModule).
+        :param module_kwargs: Radyo sürecindeki XBeeModule'e aktarılan diğer parametreler
+                              (node_id, relay_types, tdma, ...). scheduler desteklenmez.
+        """
+        if module_kwargs.get("scheduler") is not None:
+            raise ValueError("Ortak zamanlayıcı (scheduler) ayrı radyo süreciyle kullanılamaz.")
+        self.port = port
+        self.baudrate = baudrate
+        self.batch_interval = batch_interval
+        self.module_cls = module_cls
+        self.node_id = module_kwargs.get("node_id")
+        self.tdma = module_kwargs.get("tdma")
+        self._module_kwargs = dict(module_kwargs, port=port, baudrate=baudrate, receive_capacity=receive_capacity,
+                                   receive_policies=receive_policies, queue_retention_seconds=queue_retention_seconds,
+                                   time_sync=time_sync)
+        # Radyo sürecinin gönderdiği paketler burada aynı politikalarla tamponlanır
+        self.received_queue = ReceiveBuffer(capacity=receive_capacity, retention_seconds=queue_retention_seconds,
+                                            policies=receive_policies)
+        # Saat farkları radyo sürecinde ölçülür, buraya aynalanır; gecikme histogramı burada tutulur
+        self.clock_sync = ClockSync() if time_sync else None
+
+        self._process = None
+        self._conn = None
+        self._outbox = []
+        self._flush_scheduled = False
+        self._sent = 0 # Radyo sürecine iletilen toplam paket
+        self.lost_packages = 0 # Radyo süreci sonlandığında yolda veya sürecin kuyruğunda kalıp kaybolan paket
+        self._recv_lock = threading.Lock() # connect executor thread'inde beklerken ana thread de okuyabilir
+        self._send_lock = threading.Lock()
+        self._replies = deque()
+        self._reply_event = threading.Event()
+
+        # Radyo sürecinden aynalanan durum
+        self._connected = False
+        self._pending = 0
+        self._accepted = 0
+        self.error_count = 0
+        self.last_error = None
+        self._last_receive_time = 0.0
+        self.last_heartbeat_time = 0.0
+        self._receive_stats = {}
+
+        print(f"XBeeProcessModule başlatılıyor (ayrı radyo süreci): Port={self.port}, Baudrate={self.baudrate}")
+
+    # --- Süreç yönetimi ---
+    def _ensure_process(self):
+        if self._process is not None and self._process.is_alive() and self._conn is not None:
+            return
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate() # Boru kopmuş ama süreç ayakta; yenisi başlatılır
+        context = multiprocessing.get_context("spawn") # fork, asyncio/gRPC thread'leriyle güvenli değil
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_radio_process_main, name=f"XBeeRadio-{self.port}",
+                                        args=(child_conn, self._module_kwargs, self.batch_interval, self.module_cls),
+                                        daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._sent = 0
+        self._accepted = 0
+
+    def close(self):
+        """Radyo sürecini durdurur (bağlantı da kapanır)."""
+        if self._process is None:
+            return
+        try:
+            self._flush()
+            self._command("stop")
+        except (OSError, EOFError):
+            pass
+        self._process.join(timeout=2.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+        self._connected = False
+
+    def _command(self, *message):
+        with self._send_lock:
+            if self._conn is None:
+                raise EOFError("Radyo süreci bağlantısı yok")
+            try:
+                self._conn.send(message)
+            except (OSError, EOFError):
+                self._lost_process()
+                raise
+
+    def _wait_reply(self, kind: str, timeout: float):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self._drain(wait=min(0.05, max(0.0, deadline - time.monotonic())))
+            for reply in list(self._replies):
+                if reply[0] == kind:
+                    self._replies.remove(reply)
+                    return reply
+            if self._conn is None or not self._process.is_alive():
+                break
+        return None
+
+    # --- Radyo sürecinden gelen mesajlar ---
+    def _drain(self, wait: float = 0.0):
+        """Borudaki tüm mesajları bloklanmadan okur ve işler."""
+        if self._conn is None:
+            return
+        try:
+            # Bekleme kilit dışında yapılır; connect'i bekleyen executor thread'i event loop'u bloklamasın
+            if not self._conn.poll(wait):
+                return
+            with self._recv_lock:
+                while self._conn.poll():
+                    self._handle(self._conn.recv())
+        except (EOFError, OSError, AttributeError): # AttributeError: close() sırasında bağlantı kaldırıldı
+            self._lost_process()
+
+    def _lost_process(self):
+        """Boru kapandı: bağlantı bir kez bırakılır; sonraki connect yeni radyo süreci başlatır."""
+        conn, self._conn = self._conn, None
+        self._connected = False
+        if conn is None:
+            return
+        # Radyo sürecine iletilmiş ama gönderilmemiş paketler süreçle birlikte kaybolur; bekleyen grup (outbox) durur
+        lost = max(0, self._sent - self._accepted) + self._pending
+        self.lost_packages += lost
+        self._sent = self._accepted = self._pending = 0
+        print(f"XBeeProcessModule: Radyo süreci sonlandı ({lost} gönderilmemiş paket kayboldu, "
+              f"{len(self._outbox)} paket yeniden bağlanınca gönderilecek).")
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    def _handle(self, message):
+        kind = message[0]
+        if kind == "received":
+            for record in message[1]:
+                if self.clock_sync is not None and record.error is None and record.sent_at is not None:
+                    self.clock_sync.observe(record)
+                self.received_queue.put(record)
+        elif kind == "status":
+            status = message[1]
+            self._connected = status["connected"]
+            self._pending = status["pending"]
+            self._accepted = status["accepted"]
+            self.error_count = status["error_count"]
+            self.last_error = status["last_error"]
+            self._last_receive_time = status["last_receive_time"]
+            self.last_heartbeat_time = status["last_heartbeat_time"]
+            self._receive_stats = status["receive_stats"]
+            if self.clock_sync is not None:
+                for peer_id, estimate in status.get("clocks", {}).items():
+                    self.clock_sync.peer(peer_id).set_estimate(*estimate)
+        else:
+            self._replies.append(message)
+
+    # --- XBeeModule arayüzü ---
+    def connect(self) -> bool:
+        """Radyo sürecini (gerekirse) başlatır ve XBee'ye bağlanmasını bekler. Bloklar; executor'da çağrılmalı."""
+        self._ensure_process()
+        try:
+            self._command("connect")
+        except (OSError, EOFError):
+            self._connected = False
+            return False
+        reply = self._wait_reply("connected", timeout=30.0)
+        self._connected = bool(reply and reply[1])
+        if self._connected:
+            self._flush() # Süreç yokken biriken paketler
+        return self._connected
+
+    def disconnect(self):
+        """XBee bağlantısını kapatır; radyo süreci yeniden bağlanmak için açık kalır (bkz. close)."""
+        if self._process is None or not self._process.is_alive() or self._conn is None:
+            self._connected = False
+            return
+        try:
+            self._flush()
+            self._command("disconnect")
+        except (OSError, EOFError):
+            self._connected = False
+            return
+        self._wait_reply("disconnected", timeout=10.0)
+        self._connected = False
+
+    def is_connected(self) -> bool:
+        self._drain()
+        return self._connected and self._process is not None and self._process.is_alive()
+
+    def send_data(self, package, remote_xbee_addr_hex: str = None, drone_id: str = None):
+        """Paketi giden gruba ekler; aynı event loop turundaki tüm paketler radyo sürecine tek mesajla gider."""
+        self._outbox.append((package, remote_xbee_addr_hex, drone_id))
+        if self._flush_scheduled:
+            return
+        try:
+            asyncio.get_running_loop().call_soon(self._flush)
+            self._flush_scheduled = True
+        except RuntimeError: # Event loop dışından (örn. thread) çağrıldı
+            self._flush()
+
+    def _flush(self):
+        self._flush_scheduled = False
+        if not self._outbox or self._conn is None or self._process is None or not self._process.is_alive():
+            return # Süreç yoksa paketler bekler, bağlanınca gönderilir
+        batch, self._outbox = self._outbox, []
+        try:
+            self._command("send", batch)
+        except (OSError, EOFError):
+            self._outbox = batch + self._outbox # Yeni radyo süreciyle gönderilir
+            return
+        self._sent += len(batch)
+
+    def pending_count(self) -> int:
+        """Henüz gönderilmemiş paket sayısı: bekleyen grup + yoldaki + radyo sürecinin kuyruğu."""
+        self._drain()
+        return len(self._outbox) + max(0, self._sent - self._accepted) + self._pending
+
+    def send_capacity(self) -> float:
+        """Radyo sürecindeki gönderici döngüsünün saniyede boşaltabildiği en fazla paket."""
+        if self.tdma is not None:
+            return self.tdma.packets_per_slot / self.tdma.frame_length
+        return 1.0 / self._module_kwargs.get("send_interval", 1.0)
+
+    def read_received_data(self):
+        self._drain()
+        return self.received_queue.pop()
+
+    def receive_stats(self) -> dict:
+        self._drain()
+        stats = dict(self.received_queue.stats())
+        stats["radio_process"] = self._receive_stats
+        return stats
+
+    @property
+    def last_receive_time(self) -> float:
+        return self._last_receive_time
+
+    @last_receive_time.setter
+    def last_receive_time(self, value: float):
+        self._last_receive_time = value
+        if self._conn is not None:
+            try:
+                self._command("set", "last_receive_time", value)
+            except (OSError, EOFError):
+                pass
@@ -1,8 +1,5 @@
 import asyncio
 import pathlib
-import tkinter as tk
-import tkinter.ttk as ttk
-import pygubu
 import time
 import os
 import sys
@@ -11,6 +8,12 @@ PROJECT_UI = PROJECT_PATH / "ground_control.ui"
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from controllers.waypoint_controller import *
 from controllers.xbee_controller import *
+from controllers.xbee_multilink import XBeeMultiLink
+from missions.coverage_planner import coverage_path, stream_to_waypoints
+from controllers.tdma import TdmaSchedule
+from controllers.geofence import Geofence, GeofenceEvent, GEOFENCE_BREACH
+from controllers.rate_controller import LinkQualityMonitor
+from controllers.waypoint_sync import WaypointSyncServer
 
 
 class Drone:
@@ -18,10 +21,16 @@ class Drone:
         pass
 
 class GroundControlApp:
-    def __init__(self, master=None):
+    use_tdma = False # True ise komutlar yer istasyonuna ayrılmış TDMA penceresinde gönderilir
+    use_radio_process = False # True ise tek XBee ayrı bir süreçte çalışır; Tk arayüzü radyo işini beklemez
+    map_cache = None # Çevrimdışı karo önbelleği dosyası (uçuştan önce: python interface/tile_cache.py harita.cache --dir tiles/)
+    map_zoom = 16
+    message_poll_interval = 0.05 # Saniye, gelen paket kuyruğunun ve Tk olaylarının işlenme aralığı
+    message_batch_size = 32 # Her uyanışta en fazla işlenecek paket
 
+    def __init__(self, master=None):
+        import pygubu # Tk/pygubu sadece arayüz oluşturulurken yüklenir
 
-        
         self.waypoint = waypoints()
         self.drone_id = "0"
 
@@ -32,19 +41,37 @@ class GroundControlApp:
         self.mainwindow = builder.get_object('main_window', master)
         builder.connect_callbacks(self)
         self.port_dialog = builder.get_object('port_dialog', self.mainwindow)
+        from interface.tile_cache import TileCache # Harita modülleri sadece arayüz kurulurken yüklenir
+        from interface.map_view import MapPanel
+        tile_cache = TileCache(self.map_cache).open() if self.map_cache else None
+        self.map_panel = MapPanel(builder.get_object('map_frame'), tile_cache, zoom=self.map_zoom)
         self.port_dialog.run()
 
 
-        self.xbee = XBeeModule(port=self.port, baudrate=DEFAULT_BAUD_RATE) 
-        self.BROADCAST_ADDR = "000000000000FFFF"
+        # Birden fazla port virgülle girildiyse ("COM3,COM4") radyolar birlikte kullanılır
+        ports = [port.strip() for port in str(self.port).split(",") if port.strip()]
+        if len(ports) > 1:
+            self.xbee = XBeeMultiLink(ports, baudrate=DEFAULT_BAUD_RATE, node_id=self.drone_id)
+        else:
+            tdma = TdmaSchedule(self.drone_id) if self.use_tdma else None
+            module_class = XBeeModule
+            if self.use_radio_process:
+                from controllers.xbee_process import XBeeProcessModule # multiprocessing sadece gerektiğinde yüklenir
+                module_class = XBeeProcessModule
+            self.xbee = module_class(port=self.port, baudrate=DEFAULT_BAUD_RATE, node_id=self.drone_id, tdma=tdma) 
+        self.BROADCAST_ADDR = BROADCAST_ADDR_HEX
         self.is_xbee_connected = False
+        self.allocation = None # Son waypoint ataması (drone_id -> sıralı waypoint listesi)
+        self.mission_index = 0 # Gönderilen 'O' emirlerinin görev numarası
+        self.geofence = None
+        self.link_quality = LinkQualityMonitor() # Dronların 'G' sayaç/damgalarından kayıp ve gecikme
+        self.waypoint_sync = WaypointSyncServer(self.waypoint, self.drone_id)
 
     async def xbee_connect(self):
         """XBee bağlantısını kurar."""
-        # xbee.connect() senkron bir metot olduğundan, bunu doğrudan çağırıyoruz.
-        # Eğer bu işlem uzun sürerse, `loop.run_in_executor` ile ayrı bir thread'de çalıştırılabilir.
-        # Şimdilik, genellikle bağlantı hızlı olduğu için doğrudan çağrı yeterli.
-        self.is_xbee_connected = self.xbee.connect()
+        # xbee.connect() senkron ve port açılamazsa saniyelerce bloklayabilir; ayrı bir thread'de çalıştırılır.
+        loop = asyncio.get_running_loop()
+        self.is_xbee_connected = await loop.run_in_executor(None, self.xbee.connect)
         if self.is_xbee_connected:
             print(f"DroneController {self.drone_id}: XBee bağlantısı başarılı.")
         else:
@@ -54,9 +81,215 @@ class GroundControlApp:
     def xbee_disconnect(self):
         """XBee bağlantısını keser."""
         self.xbee.disconnect()
+        close_radio = getattr(self.xbee, "close", None)
+        if close_radio is not None:
+            close_radio() # Radyo süreci durdurulur; xbee_connect gerekirse yeniden başlatır
         self.is_xbee_connected = False
         print(f"DroneController {self.drone_id}: XBee bağlantısı kesildi.")
 
+    async def process_messages_loop(self) -> None:
+        """Gelen paketleri XBee kuyruğundan okur ve tipine göre işler (drone tarafındaki döngünün karşılığı)."""
+        while self.is_xbee_connected:
+            for _ in range(self.message_batch_size):
+                incoming_package = self.xbee.read_received_data()
+                if incoming_package is None:
+                    break
+                self.handle_package(incoming_package)
+            await asyncio.sleep(self.message_poll_interval)
+
+    def handle_package(self, incoming_package) -> None:
+        """Tek bir gelen paketi tipine göre ilgili işleyiciye yönlendirir."""
+        if incoming_package.error is not None:
+            print(f"Yer istasyonu: paket işleme hatası: {incoming_package.error}")
+            return
+        handler = {"G": self.handle_telemetry, "S": self.handle_sync}.get(incoming_package.package_type)
+        if handler is not None:
+            handler(incoming_package)
+
+    async def run(self):
+        """
+        XBee'ye bağlanır, paket işleme ve bağlantı geri bildirimi döngülerini başlatır; Tk olaylarını aynı
+        asyncio döngüsünde işler. Pencere kapanınca bağlantı kesilir.
+        """
+        import tkinter # Tk sadece arayüz çalışırken gerekir
+
+        running = True
+
+        def on_close():
+            nonlocal running
+            running = False
+
+        toplevel = self.mainwindow.winfo_toplevel()
+        toplevel.protocol("WM_DELETE_WINDOW", on_close)
+        tasks = []
+        if await self.xbee_connect():
+            tasks = [asyncio.create_task(self.process_messages_loop()),
+                     asyncio.create_task(self.link_feedback_loop())]
+        try:
+            while running:
+                toplevel.update()
+                await asyncio.sleep(self.message_poll_interval)
+        except tkinter.TclError:
+            pass # Pencere yok edildi
+        finally:
+            if self.is_xbee_connected:
+                self.xbee_disconnect()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                toplevel.destroy()
+            except tkinter.TclError:
+                pass
+
+    def request_time_sync(self):
+        """
+        Damgalı bir 'H' broadcast eder; tüm dronların cevaplarıyla her birine olan saat farkı ölçülür.
+        Sonuçlar self.xbee.clock_sync'tedir (XBeeMultiLink'te her radyonun kendi ClockSync'i).
+        """
+        self.xbee.send_data(XBeePackage(package_type="H", sender=self.drone_id, timestamped=True))
+
+    def handle_telemetry(self, record):
+        """
+        Gelen 'G' kaydını haritaya işler; sayacını (kayıp) veya gönderim damgasını (gecikme) bağlantı kalitesi
+        ölçümüne ekler. Dronlar her birkaç pakette bir "n" yerine "m" damgası gönderir.
+        """
+        x, y = record.params.get("x"), record.params.get("y")
+        if x is not None and y is not None:
+            if not self.map_panel.trails:
+                self.map_panel.set_view(x / 1000000.0, y / 1000000.0) # İlk dron haritayı ortalar
+            self.map_panel.update_drone(record.sender, x / 1000000.0, y / 1000000.0)
+        counter = record.params.get("n")
+        clock_sync = getattr(self.xbee, "clock_sync", None) # XBeeMultiLink'te yok
+        sent = clock_sync.send_time(record) if clock_sync is not None else None
+        if counter is None and sent is None:
+            return # Eski sürüm drone veya saat farkı henüz bilinmiyor
+        self.link_quality.observe(record.sender, counter, None if sent is None else max(record.timestamp - sent, 0.0))
+
+    def send_link_feedback(self):
+        """Her drona son pencerede ölçülen kayıp/gecikmeyi 'F' paketiyle bildirir (dron telemetri hızını buna göre ayarlar)."""
+        for drone_id in self.link_quality.drones():
+            params = self.link_quality.feedback(drone_id)
+            if params is not None:
+                self.xbee.send_data(XBeePackage(package_type="F", sender=self.drone_id, params=params), drone_id=drone_id)
+
+    async def link_feedback_loop(self, interval: float = 2.0):
+        while self.is_xbee_connected:
+            self.send_link_feedback()
+            await asyncio.sleep(interval)
+
+    def sync_waypoints(self, drone_ids=None):
+        """
+        Waypoint özetini (sürüm + kök hash) gönderir; drone farklı kovaları bildirir ve sadece onlar gönderilir.
+        drone_ids verilirse sadece son sürümü onaylamamış dronlara gönderilir, verilmezse broadcast edilir.
+        """
+        package = self.waypoint_sync.summary_package()
+        if drone_ids is None:
+            self.xbee.send_data(package)
+            return
+        for drone_id in drone_ids:
+            if self.waypoint_sync.needs_sync(drone_id):
+                self.xbee.send_data(package, drone_id=drone_id)
+
+    def handle_sync(self, record):
+        """Dronun 'S' paketine (kova hash'leri / onay) cevap verir."""
+        for package in self.waypoint_sync.handle(record):
+            self.xbee.send_data(package, drone_id=record.sender)
+
+    def set_geofence(self, geofence: Geofence):
+        """Sınırı etkinleştirir; sınır dışındaki waypointler artık eklenemez."""
+        self.geofence = geofence
+        self.waypoint.geofence = geofence
+
+    def check_swarm_geofence(self, drone_positions: dict) -> list:
+        """
+        Tüm sürünün konumlarını tek seferde (vektörel) denetler.
+        :param drone_positions: drone_id -> (lat, lon)
+        :return: Sınır dışındaki droneler için (drone_id, GeofenceEvent) listesi.
+        """
+        if self.geofence is None or not drone_positions:
+            return []
+        drone_ids = list(drone_positions)
+        lats = [drone_positions[drone_id][0] for drone_id in drone_ids]
+        lons = [drone_positions[drone_id][1] for drone_id in drone_ids]
+        inside = self.geofence.contains_many(lats, lons)
+        breaches = []
+        for drone_id, lat, lon, ok in zip(drone_ids, lats, lons, inside):
+            if not ok:
+                distance, zone = self.geofence.boundary_distance(lat, lon)
+                breaches.append((drone_id, GeofenceEvent(GEOFENCE_BREACH, lat, lon, distance, zone)))
+        return breaches
+
+    async def plan_coverage(self, polygon, footprint_width: float, overlap: float = 0.2, alt: float = 20.0,
+                            angle: float = 0.0, point_spacing: float = None, drone_id: str = None,
+                            chunk_size: int = 20, max_backlog: int = 40) -> int:
+        """
+        Alan taraması planlar: boustrophedon waypointleri parça parça depoya yazılır ve 'W' paketleriyle
+        gönderilir. Gönderim kuyruğu max_backlog'u aşarsa planlama bekler (geri basınç).
+        :return: Eklenen waypoint sayısı.
+        """
+        numeric_ids = [int(waypoint_id) for waypoint_id in self.waypoint.list if str(waypoint_id).isdigit()]
+        start_id = max(numeric_ids, default=0) + 1
+
+        async def send_chunk(waypoint_ids):
+            for waypoint_id in waypoint_ids:
+                wp = self.waypoint.list[waypoint_id]
+                x, y, h = wire_values(wp.lat, wp.lon, wp.hed) # Senkronizasyon hash'iyle aynı yuvarlama
+                package = XBeePackage(package_type="W", sender=waypoint_id, params={"x": x, "y": y, "h": h})
+                self.xbee.send_data(package, drone_id=drone_id)
+            while self.is_xbee_connected and self.xbee.pending_count() > max_backlog:
+                await asyncio.sleep(0.5)
+
+        path = coverage_path(polygon, footprint_width, overlap, angle, point_spacing)
+        return await stream_to_waypoints(path, self.waypoint, alt, start_id, chunk_size, send_chunk)
+
+    def allocate_waypoints(self, drone_positions: dict, objective: str = None, capacity: int = None):
+        """
+        Tanımlı waypointleri dronelara atar ve her drona emir ('O') olarak gönderir.
+        :param drone_positions: drone_id -> (lat, lon), örn. son 'G' paketlerinden.
+        :param objective: Verilmezse toplam mesafe (OBJECTIVE_TOTAL) küçültülür.
+        """
+        from missions.task_allocator import allocate, OBJECTIVE_TOTAL # numpy sadece atama yapılırken yüklenir
+        objective = objective or OBJECTIVE_TOTAL
+        waypoint_positions = {waypoint_id: (wp.lat, wp.lon) for waypoint_id, wp in self.waypoint.list.items()}
+        self.allocation = allocate(drone_positions, waypoint_positions, objective, capacity)
+        print(f"Waypoint ataması: {self.allocation}")
+        self.send_allocation(self.allocation.routes)
+        return self.allocation
+
+    def drone_lost(self, drone_id: str, completed=(), drone_positions: dict = None):
+        """Düşen dronun kalan waypointlerini diğer dronelara dağıtır; sadece yeni eklenen waypointler gönderilir."""
+        if self.allocation is None or drone_id not in self.allocation.routes:
+            return None
+        from missions.task_allocator import reallocate_dropped
+        self.allocation = reallocate_dropped(self.allocation, drone_id, completed, drone_positions)
+        print(f"Drone {drone_id} düştü, yeniden atama: {self.allocation}")
+        self.send_allocation(self.allocation.added)
+        return self.allocation
+
+    def _order_packages(self, route):
+        """Rotayı 72 bayt sınırına sığan 'O' paketlerine böler."""
+        chunk = []
+        for waypoint_id in route:
+            candidate = chunk + [int(waypoint_id) if str(waypoint_id).isdigit() else waypoint_id]
+            package = XBeePackage(package_type="O", sender=str(self.mission_index), params={"f": "V", "wp": candidate})
+            if chunk and len(bytes(package)) > MAX_PAYLOAD_SIZE:
+                yield XBeePackage(package_type="O", sender=str(self.mission_index), params={"f": "V", "wp": chunk})
+                self.mission_index += 1
+                chunk = candidate[-1:]
+            else:
+                chunk = candidate
+        if chunk:
+            yield XBeePackage(package_type="O", sender=str(self.mission_index), params={"f": "V", "wp": chunk})
+            self.mission_index += 1
+
+    def send_allocation(self, routes: dict):
+        """Her dronun rotasını sırayla 'O' emirleri olarak o drona gönderir (eşit öncelikli emirler sırayla çalışır)."""
+        for drone_id, route in routes.items():
+            for package in self._order_packages(route):
+                self.xbee.send_data(package, drone_id=drone_id)
+
 
 if __name__ == "__main__":
-    app = GroundControlApp()
\ No newline at end of file
+    app = GroundControlApp()
+    asyncio.run(app.run())
\ No newline at end of file
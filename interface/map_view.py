@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+
+import time
+from collections import OrderedDict, deque
+
+try:
+    from interface.tile_cache import TileCache, TILE_SIZE, MAX_ZOOM, lat_lon_to_world, world_to_lat_lon
+except ImportError: # interface dizininden doğrudan çalıştırıldığında
+    from tile_cache import TileCache, TILE_SIZE, MAX_ZOOM, lat_lon_to_world, world_to_lat_lon
+
+DEFAULT_TRAIL_POINTS = 3000 # Drone başına tutulan iz noktası (halka tampon)
+TRAIL_CHUNK_SIZE = 64 # İz bu büyüklükte parçalara bölünür; sadece ekrana düşen parçalar çizilir
+DEFAULT_TOLERANCE_PX = 1.0 # Douglas-Peucker toleransı (ekran pikseli)
+DEFAULT_REDRAW_INTERVAL = 100 # Milisaniye; bu aralıktaki tüm güncellemeler tek çizimde birleşir
+TRACK_COLORS = ("#e6194b", "#3cb44b", "#4363d8", "#f58231", "#911eb4", "#42d4f4", "#f032e6", "#9a6324")
+
+def douglas_peucker(points: list, tolerance: float) -> list:
+    """
+    Çoklu çizgiyi Douglas-Peucker ile sadeleştirir (özyinelemesiz).
+    :param points: [(x, y), ...]
+    :param tolerance: Aynı birimde en büyük sapma.
+    """
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        x1, y1 = points[first]
+        x2, y2 = points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+        farthest, farthest_sq = None, tolerance_sq
+        for index in range(first + 1, last):
+            px, py = points[index]
+            if length_sq == 0:
+                distance_sq = (px - x1) ** 2 + (py - y1) ** 2
+            else:
+                t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length_sq))
+                distance_sq = (px - x1 - t * dx) ** 2 + (py - y1 - t * dy) ** 2
+            if distance_sq > farthest_sq:
+                farthest, farthest_sq = index, distance_sq
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+def _world_tolerance(zoom: int, tolerance_px: float) -> float:
+    return tolerance_px / (TILE_SIZE * 2 ** zoom)
+
+class _TrailChunk:
+    __slots__ = ("points", "min_x", "min_y", "max_x", "max_y", "simplified")
+
+    def __init__(self, first_point=None):
+        self.points = []
+        self.min_x = self.min_y = float("inf")
+        self.max_x = self.max_y = float("-inf")
+        self.simplified = {} # zoom -> sadeleştirilmiş noktalar (sadece kapanmış parçalarda)
+        if first_point is not None:
+            self.add(first_point)
+
+    def add(self, point):
+        self.points.append(point)
+        x, y = point
+        self.min_x, self.max_x = min(self.min_x, x), max(self.max_x, x)
+        self.min_y, self.max_y = min(self.min_y, y), max(self.max_y, y)
+
+    def intersects(self, bounds) -> bool:
+        left, top, right, bottom = bounds
+        return self.max_x >= left and self.min_x <= right and self.max_y >= top and self.min_y <= bottom
+
+class TrackTrail:
+    '''
+    Bir dronun uçuş izi: dünya koordinatlarında (0..1) halka tampon.
+    İz TRAIL_CHUNK_SIZE noktalık parçalara bölünür; dolan parça kapanır ve her zoom için sadeleştirilmiş hali
+    bir kez hesaplanıp saklanır. En fazla max_points nokta tutulur (en eski parça atılır).
+    Böylece çizim maliyeti uçuş süresine değil, ekrandaki parça ve zoom'daki köşe sayısına bağlıdır.
+    '''
+    def __init__(self, max_points: int = DEFAULT_TRAIL_POINTS, chunk_size: int = TRAIL_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.chunks = deque(maxlen=max(2, max_points // chunk_size))
+        self.last = None
+        self.version = 0 # Her yeni noktada artar
+
+    def __len__(self) -> int:
+        return sum(len(chunk.points) for chunk in self.chunks)
+
+    def append(self, lat: float, lon: float):
+        point = lat_lon_to_world(lat, lon)
+        if point == self.last:
+            return
+        if not self.chunks or len(self.chunks[-1].points) >= self.chunk_size:
+            # Parçalar arası boşluk olmasın diye yeni parça öncekinin son noktasıyla başlar
+            self.chunks.append(_TrailChunk(self.last))
+        self.chunks[-1].add(point)
+        self.last = point
+        self.version += 1
+
+    def intersects(self, bounds) -> bool:
+        return any(chunk.intersects(bounds) for chunk in self.chunks)
+
+    def visible_runs(self, zoom: int, bounds, tolerance_px: float = DEFAULT_TOLERANCE_PX) -> list:
+        """
+        Ekrana (bounds: sol, üst, sağ, alt dünya koordinatı) düşen parçaların zoom'a göre sadeleştirilmiş
+        noktalarını döndürür. Ardışık görünür parçalar tek çizgide birleşir: [[(x, y), ...], ...]
+        """
+        tolerance = _world_tolerance(zoom, tolerance_px)
+        runs = []
+        run = None
+        last_index = len(self.chunks) - 1
+        for index, chunk in enumerate(self.chunks):
+            if not chunk.intersects(bounds):
+                run = None
+                continue
+            if index == last_index and len(chunk.points) < self.chunk_size:
+                points = douglas_peucker(chunk.points, tolerance) # Açık parça; en fazla chunk_size nokta
+            else:
+                points = chunk.simplified.get(zoom)
+                if points is None:
+                    points = chunk.simplified[zoom] = douglas_peucker(chunk.points, tolerance)
+            if run is None:
+                run = list(points)
+                runs.append(run)
+            else:
+                run.extend(points[1:]) # İlk nokta önceki parçanın son noktası
+        return runs
+
+class MapPanel:
+    '''
+    Yer istasyonu harita paneli (Tk Canvas).
+    Karolar TileCache'ten (çevrimdışı) okunur; sadece ekrandaki karolar için PhotoImage oluşturulur ve
+    son kullanılanlar bellekte tutulur. Dronların izleri TrackTrail'den zoom'a göre sadeleştirilmiş ve
+    ekrana kırpılmış olarak çizilir; Canvas öğeleri silinip yeniden oluşturulmaz, koordinatları güncellenir.
+    update_drone çağrıları biriktirilir ve en fazla redraw_interval aralıkla tek çizim yapılır.
+    '''
+    def __init__(self, parent, tile_cache: TileCache = None, center=(0.0, 0.0), zoom: int = 16,
+                 trail_points: int = DEFAULT_TRAIL_POINTS, tolerance_px: float = DEFAULT_TOLERANCE_PX,
+                 redraw_interval: int = DEFAULT_REDRAW_INTERVAL, photo_cache_size: int = 96,
+                 width: int = 640, height: int = 480):
+        import tkinter as tk # Tk sadece panel oluşturulurken yüklenir
+        self._tk = tk
+        self.tile_cache = tile_cache
+        self.zoom = zoom
+        self.center = lat_lon_to_world(*center)
+        self.trail_points = trail_points
+        self.tolerance_px = tolerance_px
+        self.redraw_interval = redraw_interval
+        self.photo_cache_size = photo_cache_size
+
+        self.canvas = tk.Canvas(parent, width=width, height=height, background="#d9d9d9", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+
+        self.trails = {} # drone_id -> TrackTrail
+        self.positions = {} # drone_id -> (x, y) dünya koordinatı
+        self._colors = {}
+        self._track_items = {} # drone_id -> [canvas çizgi öğeleri]
+        self._marker_items = {} # drone_id -> (daire, etiket)
+        self._tile_items = {} # (z, x, y) -> canvas resim öğesi
+        self._photos = OrderedDict() # (z, x, y) -> PhotoImage (LRU)
+        self._redraw_pending = None
+        self._drag_start = None
+        self.last_redraw_ms = 0.0
+        self.drawn_vertices = 0
+
+        self.canvas.bind("<Configure>", lambda event: self.request_redraw())
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<MouseWheel>", lambda event: self._on_zoom(event, 1 if event.delta > 0 else -1))
+        self.canvas.bind("<Button-4>", lambda event: self._on_zoom(event, 1)) # Linux
+        self.canvas.bind("<Button-5>", lambda event: self._on_zoom(event, -1))
+
+    # --- Görünüm ---
+    @property
+    def scale(self) -> float:
+        """Dünya koordinatından ekran pikseline çarpan."""
+        return TILE_SIZE * 2 ** self.zoom
+
+    def _size(self):
+        return max(self.canvas.winfo_width(), 1), max(self.canvas.winfo_height(), 1)
+
+    def view_bounds(self):
+        """Ekranın dünya koordinatlarındaki sınırları: (sol, üst, sağ, alt)."""
+        width, height = self._size()
+        half_w, half_h = width / 2 / self.scale, height / 2 / self.scale
+        cx, cy = self.center
+        return cx - half_w, cy - half_h, cx + half_w, cy + half_h
+
+    def to_screen(self, x: float, y: float):
+        left, top, _, _ = self.view_bounds()
+        return (x - left) * self.scale, (y - top) * self.scale
+
+    def set_view(self, lat: float, lon: float, zoom: int = None):
+        self.center = lat_lon_to_world(lat, lon)
+        if zoom is not None:
+            self.zoom = max(0, min(MAX_ZOOM, zoom))
+        self.request_redraw()
+
+    def view_center(self):
+        return world_to_lat_lon(*self.center)
+
+    def _on_press(self, event):
+        self._drag_start = (event.x, event.y)
+
+    def _on_drag(self, event):
+        if self._drag_start is None:
+            return
+        dx, dy = event.x - self._drag_start[0], event.y - self._drag_start[1]
+        self._drag_start = (event.x, event.y)
+        cx, cy = self.center
+        self.center = (cx - dx / self.scale, cy - dy / self.scale)
+        self.canvas.move("all", dx, dy) # Anında kaydır; yeni karolar bir sonraki çizimde gelir
+        self.request_redraw()
+
+    def _on_zoom(self, event, step: int):
+        zoom = max(0, min(MAX_ZOOM, self.zoom + step))
+        if zoom == self.zoom:
+            return
+        # İmlecin altındaki nokta yerinde kalır
+        width, height = self._size()
+        cx, cy = self.center
+        mx, my = cx + (event.x - width / 2) / self.scale, cy + (event.y - height / 2) / self.scale
+        factor = 2 ** (self.zoom - zoom)
+        self.center = (mx - (mx - cx) * factor, my - (my - cy) * factor)
+        self.zoom = zoom
+        self.request_redraw()
+
+    # --- Veri ---
+    def update_drone(self, drone_id: str, lat: float, lon: float):
+        """Dronun yeni konumunu ize ekler; dron ekrandaysa (veya az önce ekrandaysa) çizim istenir."""
+        trail = self.trails.get(drone_id)
+        if trail is None:
+            trail = self.trails[drone_id] = TrackTrail(self.trail_points)
+            self._colors[drone_id] = TRACK_COLORS[len(self._colors) % len(TRACK_COLORS)]
+        trail.append(lat, lon)
+        previous = self.positions.get(drone_id)
+        self.positions[drone_id] = trail.last
+        left, top, right, bottom = self.view_bounds()
+        for point in (trail.last, previous):
+            if point is not None and left <= point[0] <= right and top <= point[1] <= bottom:
+                self.request_redraw()
+                break
+
+    def remove_drone(self, drone_id: str):
+        self.trails.pop(drone_id, None)
+        self.positions.pop(drone_id, None)
+        for item in self._track_items.pop(drone_id, []):
+            self.canvas.delete(item)
+        for item in self._marker_items.pop(drone_id, ()):
+            self.canvas.delete(item)
+        self.request_redraw()
+
+    # --- Çizim ---
+    def request_redraw(self):
+        if self._redraw_pending is None:
+            self._redraw_pending = self.canvas.after(self.redraw_interval, self.redraw)
+
+    def redraw(self):
+        self._redraw_pending = None
+        start = time.perf_counter()
+        bounds = self.view_bounds()
+        self._draw_tiles(bounds)
+        vertices = 0
+        for drone_id, trail in self.trails.items():
+            vertices += self._draw_track(drone_id, trail, bounds)
+            self._draw_marker(drone_id, bounds)
+        self.canvas.tag_lower("tile")
+        self.canvas.tag_raise("marker")
+        self.drawn_vertices = vertices
+        self.last_redraw_ms = (time.perf_counter() - start) * 1000
+
+    def _photo(self, key):
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            return photo
+        data = self.tile_cache.get(*key) if self.tile_cache is not None else None
+        if data is None:
+            return None
+        try:
+            photo = self._tk.PhotoImage(data=data, master=self.canvas)
+        except self._tk.TclError: # Tk'nin çözemediği biçim (örn. Tk 8.5'te PNG)
+            return None
+        self._photos[key] = photo
+        return photo
+
+    def _draw_tiles(self, bounds):
+        left, top, right, bottom = bounds
+        n = 2 ** self.zoom
+        visible = set()
+        for x in range(max(int(left * n), 0), min(int(right * n), n - 1) + 1):
+            for y in range(max(int(top * n), 0), min(int(bottom * n), n - 1) + 1):
+                visible.add((self.zoom, x, y))
+        for key in list(self._tile_items):
+            if key not in visible:
+                self.canvas.delete(self._tile_items.pop(key))
+        for key in visible:
+            screen_x, screen_y = self.to_screen(key[1] / n, key[2] / n)
+            item = self._tile_items.get(key)
+            if item is not None:
+                self.canvas.coords(item, screen_x, screen_y)
+                continue
+            photo = self._photo(key)
+            if photo is not None:
+                self._tile_items[key] = self.canvas.create_image(screen_x, screen_y, image=photo, anchor="nw", tags="tile")
+        # Ekrandaki karolar her zaman bellekte kalır; fazlası ekranda olmayanlardan en eskiden atılır
+        excess = len(self._photos) - max(self.photo_cache_size, len(visible))
+        if excess > 0:
+            for key in [key for key in self._photos if key not in visible][:excess]:
+                del self._photos[key]
+
+    def _draw_track(self, drone_id: str, trail: TrackTrail, bounds) -> int:
+        items = self._track_items.setdefault(drone_id, [])
+        runs = trail.visible_runs(self.zoom, bounds, self.tolerance_px) if trail.intersects(bounds) else []
+        left, top = bounds[0], bounds[1]
+        scale = self.scale
+        vertices = 0
+        used = 0
+        for run in runs:
+            if len(run) < 2:
+                continue
+            flat = []
+            for x, y in run:
+                flat.append((x - left) * scale)
+                flat.append((y - top) * scale)
+            if used < len(items):
+                self.canvas.coords(items[used], *flat)
+            else:
+                items.append(self.canvas.create_line(*flat, fill=self._colors[drone_id], width=2, tags="track"))
+            used += 1
+            vertices += len(run)
+        for item in items[used:]:
+            self.canvas.delete(item)
+        del items[used:]
+        return vertices
+
+    def _draw_marker(self, drone_id: str, bounds):
+        position = self.positions.get(drone_id)
+        items = self._marker_items.get(drone_id)
+        left, top, right, bottom = bounds
+        if position is None or not (left <= position[0] <= right and top <= position[1] <= bottom):
+            if items is not None:
+                for item in items:
+                    self.canvas.itemconfigure(item, state="hidden")
+            return
+        x, y = self.to_screen(*position)
+        if items is None:
+            color = self._colors[drone_id]
+            items = self._marker_items[drone_id] = (
+                self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill=color, outline="black", tags="marker"),
+                self.canvas.create_text(x + 8, y - 8, text=str(drone_id), anchor="sw", tags="marker"))
+            return
+        self.canvas.coords(items[0], x - 5, y - 5, x + 5, y + 5)
+        self.canvas.coords(items[1], x + 8, y - 8)
+        for item in items:
+            self.canvas.itemconfigure(item, state="normal")
+
+    def stats(self) -> dict:
+        return {"zoom": self.zoom, "tiles": len(self._tile_items), "photos": len(self._photos),
+                "vertices": self.drawn_vertices, "redraw_ms": round(self.last_redraw_ms, 2),
+                "cache": self.tile_cache.stats() if self.tile_cache is not None else None}
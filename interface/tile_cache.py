@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+
+import os
+import math
+import mmap
+import struct
+import argparse
+from collections import OrderedDict
+
+# Yer istasyonu haritası için çevrimdışı karo (tile) önbelleği.
+# Sahada internet yoktur; karolar uçuştan önce (seed) bir dizinden veya karo sunucusundan tek dosyaya yüklenir.
+#
+# Dosya düzeni (little-endian, sabit):
+#   başlık:  magic(4s) sürüm(H) 2x yuva_boyutu(I) kapasite(I) saat(Q)
+#   dizin:   kapasite x [zoom(B) bayrak(B) 2x x(I) y(I) uzunluk(I) son_kullanım(Q)]
+#   veri:    kapasite x yuva_boyutu bayt
+# Dosya mmap ile açılır; okuma bir dilim kopyasıdır (karo başına dosya açma/okuma çağrısı yok, sayfaları işletim
+# sistemi önbellekte tutar). Yeni karo için boş yuva yoksa en uzun süredir kullanılmayan (LRU) yuva yeniden kullanılır;
+# seed ile yüklenen karolar varsayılan olarak sabitlenir (pinned) ve silinmez; --unpinned ile yüklenenler (örn. görev
+# alanının etrafındaki geniş bölge) LRU'ya girer ve sabit karolara yer açmak için silinebilir.
+CACHE_MAGIC = b"DRMC"
+CACHE_LAYOUT_VERSION = 1
+TILE_SIZE = 256 # Piksel; Web Mercator (OSM/XYZ) karo boyutu
+MAX_ZOOM = 19
+DEFAULT_SLOT_SIZE = 64 * 1024 # Bayt; daha büyük karolar önbelleğe alınmaz
+DEFAULT_CAPACITY = 2048 # Karo (64 KiB ile ~128 MiB, seyrek dosya)
+
+HEADER = struct.Struct("<4sH2xIIQ") # 24 bayt
+ENTRY = struct.Struct("<BB2xIIIQ") # 24 bayt
+
+FLAG_USED = 1
+FLAG_PINNED = 2
+
+def lat_lon_to_world(lat: float, lon: float):
+    """Enlem/boylamı Web Mercator dünya koordinatına (0..1, 0..1) çevirir. Piksel = dünya * TILE_SIZE * 2^zoom."""
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    sin_lat = math.sin(math.radians(lat))
+    x = (lon + 180.0) / 360.0
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return x, y
+
+def world_to_lat_lon(x: float, y: float):
+    lon = x * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+    return lat, lon
+
+def tile_range(lat1: float, lon1: float, lat2: float, lon2: float, zoom: int):
+    """Verilen dikdörtgeni kaplayan karolar (x, y) üreteci."""
+    n = 2 ** zoom
+    x1, y1 = lat_lon_to_world(max(lat1, lat2), min(lon1, lon2))
+    x2, y2 = lat_lon_to_world(min(lat1, lat2), max(lon1, lon2))
+    for x in range(max(int(x1 * n), 0), min(int(x2 * n), n - 1) + 1):
+        for y in range(max(int(y1 * n), 0), min(int(y2 * n), n - 1) + 1):
+            yield x, y
+
+def url_fetcher(template: str, timeout: float = 10.0, user_agent: str = "DroneCore-GroundControl"):
+    """
+    "https://.../{z}/{x}/{y}.png" şablonundan karo indiren fetch fonksiyonu döndürür (sadece seed için).
+    Karo sunucusunun kullanım koşullarına uyulmalıdır.
+    """
+    import urllib.request # Sadece çevrimiçi seed sırasında gerekir
+
+    def fetch(zoom: int, x: int, y: int):
+        request = urllib.request.Request(template.format(z=zoom, x=x, y=y), headers={"User-Agent": user_agent})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read()
+    return fetch
+
+class TileCache:
+    '''
+    Karoları tek, sabit boyutlu yuvalardan oluşan bir dosyada tutan mmap tabanlı önbellek.
+    Örnek:
+        cache = TileCache("harita.cache").open()
+        cache.seed_directory("tiles/")       # tiles/{z}/{x}/{y}.png
+        data = cache.get(16, 37601, 24417)   # PNG/JPEG baytları veya None
+    Tek thread (Tk döngüsü) için tasarlanmıştır.
+    '''
+    def __init__(self, path: str, capacity: int = DEFAULT_CAPACITY, slot_size: int = DEFAULT_SLOT_SIZE):
+        """
+        :param capacity: Yuva sayısı. Dosya zaten varsa dosyadaki değer kullanılır.
+        :param slot_size: Yuva boyutu (bayt). Dosya zaten varsa dosyadaki değer kullanılır.
+        """
+        self.path = path
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self._file = None
+        self._mm = None
+        self._slots = {} # (z, x, y) -> yuva
+        self._lru = OrderedDict() # Sabitlenmemiş karolar; baştaki en eski
+        self._free = []
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def _data_offset(self) -> int:
+        return HEADER.size + self.capacity * ENTRY.size
+
+    def open(self):
+        exists = os.path.exists(self.path) and os.path.getsize(self.path) >= HEADER.size
+        self._file = open(self.path, "r+b" if exists else "w+b")
+        if exists:
+            magic, version, self.slot_size, self.capacity, self._clock = HEADER.unpack(self._file.read(HEADER.size))
+            if magic != CACHE_MAGIC or version != CACHE_LAYOUT_VERSION:
+                self._file.close()
+                raise ValueError(f"'{self.path}' bir karo önbelleği değil veya dosya düzeni uyumsuz.")
+        else:
+            self._file.write(HEADER.pack(CACHE_MAGIC, CACHE_LAYOUT_VERSION, self.slot_size, self.capacity, 0))
+        size = self._data_offset + self.capacity * self.slot_size
+        if os.path.getsize(self.path) < size:
+            self._file.truncate(size) # Seyrek dosya; yazılmayan yuvalar diskte yer kaplamaz
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        self._load_index()
+        return self
+
+    def _load_index(self):
+        used = []
+        for slot in range(self.capacity):
+            zoom, flags, x, y, length, last_used = ENTRY.unpack_from(self._mm, HEADER.size + slot * ENTRY.size)
+            if flags & FLAG_USED:
+                self._slots[(zoom, x, y)] = slot
+                self._clock = max(self._clock, last_used) # close() çağrılmadan kapanmış olabilir
+                if not flags & FLAG_PINNED:
+                    used.append((last_used, (zoom, x, y)))
+            else:
+                self._free.append(slot)
+        self._free.reverse() # pop() küçük yuvalardan başlasın
+        for _, key in sorted(used):
+            self._lru[key] = None
+
+    def close(self):
+        if self._mm is None:
+            return
+        HEADER.pack_into(self._mm, 0, CACHE_MAGIC, CACHE_LAYOUT_VERSION, self.slot_size, self.capacity, self._clock)
+        self._mm.flush()
+        self._mm.close()
+        self._file.close()
+        self._mm = None
+        self._file = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key) -> bool:
+        return key in self._slots
+
+    def _entry_offset(self, slot: int) -> int:
+        return HEADER.size + slot * ENTRY.size
+
+    def get(self, zoom: int, x: int, y: int):
+        """Karonun baytlarını döndürür; önbellekte yoksa None."""
+        key = (zoom, x, y)
+        slot = self._slots.get(key)
+        if slot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        offset = self._entry_offset(slot)
+        length = ENTRY.unpack_from(self._mm, offset)[4]
+        self._clock += 1
+        struct.pack_into("<Q", self._mm, offset + 16, self._clock) # son_kullanım
+        if key in self._lru:
+            self._lru.move_to_end(key)
+        start = self._data_offset + slot * self.slot_size
+        return self._mm[start:start + length]
+
+    def _take_slot(self):
+        if self._free:
+            return self._free.pop()
+        if not self._lru:
+            return None # Tüm yuvalar sabitlenmiş
+        key, _ = self._lru.popitem(last=False)
+        slot = self._slots.pop(key)
+        struct.pack_into("<B", self._mm, self._entry_offset(slot) + 1, 0) # Önce kayıt geçersiz olur
+        self.evictions += 1
+        return slot
+
+    def put(self, zoom: int, x: int, y: int, data: bytes, pinned: bool = False) -> bool:
+        """Karoyu yazar. Yuvaya sığmıyorsa veya tüm yuvalar sabitlenmişse False döndürür."""
+        if len(data) > self.slot_size:
+            return False
+        key = (zoom, x, y)
+        slot = self._slots.get(key)
+        if slot is not None:
+            struct.pack_into("<B", self._mm, self._entry_offset(slot) + 1, 0)
+            self._lru.pop(key, None)
+        else:
+            slot = self._take_slot()
+            if slot is None:
+                return False
+        start = self._data_offset + slot * self.slot_size
+        self._mm[start:start + len(data)] = data
+        self._clock += 1
+        # Bayrak en son yazılır: yazım yarıda kalırsa yuva boş sayılır
+        ENTRY.pack_into(self._mm, self._entry_offset(slot), zoom, FLAG_USED | (FLAG_PINNED if pinned else 0),
+                        x, y, len(data), self._clock)
+        self._slots[key] = slot
+        if not pinned:
+            self._lru[key] = None
+        return True
+
+    def seed_directory(self, root: str, zooms=None, pinned: bool = True) -> int:
+        """{root}/{z}/{x}/{y}.(png|jpg|jpeg) dizin yapısındaki karoları yükler; yüklenen karo sayısını döndürür."""
+        count = 0
+        for zoom_name in sorted(os.listdir(root)):
+            if not zoom_name.isdigit() or (zooms is not None and int(zoom_name) not in zooms):
+                continue
+            zoom_dir = os.path.join(root, zoom_name)
+            for x_name in os.listdir(zoom_dir):
+                if not x_name.isdigit():
+                    continue
+                x_dir = os.path.join(zoom_dir, x_name)
+                for file_name in os.listdir(x_dir):
+                    y_name, extension = os.path.splitext(file_name)
+                    if not y_name.isdigit() or extension.lower() not in (".png", ".jpg", ".jpeg"):
+                        continue
+                    with open(os.path.join(x_dir, file_name), "rb") as f:
+                        if self.put(int(zoom_name), int(x_name), int(y_name), f.read(), pinned=pinned):
+                            count += 1
+        self._mm.flush()
+        return count
+
+    def seed_region(self, lat1: float, lon1: float, lat2: float, lon2: float, zooms, fetch, pinned: bool = True) -> int:
+        """Dikdörtgeni kaplayan karoları fetch(z, x, y) ile indirip yükler; eksik olanlar atlanır."""
+        count = 0
+        for zoom in zooms:
+            for x, y in tile_range(lat1, lon1, lat2, lon2, zoom):
+                if (zoom, x, y) in self._slots:
+                    continue
+                try:
+                    data = fetch(zoom, x, y)
+                except OSError as e:
+                    print(f"Karo indirilemedi ({zoom}/{x}/{y}): {e}")
+                    continue
+                if data and self.put(zoom, x, y, data, pinned=pinned):
+                    count += 1
+        self._mm.flush()
+        return count
+
+    def stats(self) -> dict:
+        return {"tiles": len(self._slots), "capacity": self.capacity, "pinned": len(self._slots) - len(self._lru),
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+def main(argv=None):
+    """Uçuş öncesi çevrimdışı harita hazırlığı (seed)."""
+    parser = argparse.ArgumentParser(description="Yer istasyonu karo önbelleğini hazırlar")
+    parser.add_argument("cache", help="Önbellek dosyası (örn. harita.cache)")
+    parser.add_argument("--dir", dest="directory", help="{z}/{x}/{y}.png dizin yapısındaki karolar")
+    parser.add_argument("--url", help='Karo sunucusu şablonu, örn. "https://.../{z}/{x}/{y}.png"')
+    parser.add_argument("--bounds", type=float, nargs=4, metavar=("LAT1", "LON1", "LAT2", "LON2"))
+    parser.add_argument("--zoom", type=int, nargs=2, metavar=("MIN", "MAX"), default=(12, 17))
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY)
+    parser.add_argument("--unpinned", action="store_true",
+                        help="Karoları sabitlemeden yükle (önbellek dolunca en eski kullanılan silinir)")
+    args = parser.parse_args(argv)
+    pinned = not args.unpinned
+
+    cache = TileCache(args.cache, capacity=args.capacity).open()
+    zooms = range(args.zoom[0], args.zoom[1] + 1)
+    try:
+        if args.directory:
+            print(f"{cache.seed_directory(args.directory, zooms, pinned=pinned)} karo dizinden yüklendi.")
+        if args.url:
+            if not args.bounds:
+                parser.error("--url ile --bounds verilmelidir.")
+            print(f"{cache.seed_region(*args.bounds, zooms, url_fetcher(args.url), pinned=pinned)} karo indirildi.")
+        print(f"Önbellek: {cache.stats()}")
+    finally:
+        cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+import math
+import asyncio
+from itertools import islice
+
+EARTH_RADIUS_M = 6371000.0
+
+class _LocalFrame:
+    '''Çokgenin ilk köşesine göre yerel metre koordinatları; tarama açısı kadar döndürülmüş.'''
+    def __init__(self, ref_lat: float, ref_lon: float, angle_deg: float):
+        self.ref_lat = ref_lat
+        self.ref_lon = ref_lon
+        self.cos_ref = math.cos(math.radians(ref_lat))
+        self.cos_a = math.cos(math.radians(angle_deg))
+        self.sin_a = math.sin(math.radians(angle_deg))
+
+    def to_xy(self, lat: float, lon: float):
+        east = math.radians(lon - self.ref_lon) * self.cos_ref * EARTH_RADIUS_M
+        north = math.radians(lat - self.ref_lat) * EARTH_RADIUS_M
+        # Tarama çizgileri döndürülmüş eksende yatay (sabit y) olur
+        return east * self.cos_a + north * self.sin_a, -east * self.sin_a + north * self.cos_a
+
+    def to_latlon(self, x: float, y: float):
+        east = x * self.cos_a - y * self.sin_a
+        north = x * self.sin_a + y * self.cos_a
+        return (self.ref_lat + math.degrees(north / EARTH_RADIUS_M),
+                self.ref_lon + math.degrees(east / (EARTH_RADIUS_M * self.cos_ref)))
+
+    def heading(self, direction: int) -> float:
+        """Tarama yönündeki (+x veya -x) pusula başlığı (derece, kuzey=0)."""
+        east, north = self.cos_a * direction, self.sin_a * direction
+        return math.degrees(math.atan2(east, north)) % 360
+
+def _line_intervals(edges, y: float) -> list:
+    """y yatay çizgisinin çokgen içinde kalan [x_başlangıç, x_bitiş] aralıkları."""
+    xs = sorted((x2 - x1) * (y - y1) / (y2 - y1) + x1
+                for (x1, y1), (x2, y2) in edges if (y1 > y) != (y2 > y))
+    return list(zip(xs[0::2], xs[1::2]))
+
+def coverage_path(polygon, footprint_width: float, overlap: float = 0.2, angle: float = 0.0,
+                  point_spacing: float = None, margin: float = 1.0):
+    """
+    Çokgeni boustrophedon (tırpan/çim biçme) deseniyle tarayan waypointleri tembel (lazy) üretir.
+    Her seferinde sadece bir tarama çizgisi hesaplanır; 10.000 noktalık planlar bile belleğe alınmaz.
+    :param polygon: [(lat, lon), ...] köşeler.
+    :param footprint_width: Sensörün yerdeki tarama genişliği (metre).
+    :param overlap: Komşu şeritler arası örtüşme oranı (0-1).
+    :param angle: Tarama çizgilerinin doğudan saat yönünün tersine açısı (derece).
+    :param point_spacing: Verilirse çizgi boyunca bu aralıkla (metre) ara noktalar eklenir (örn. fotoğraf noktaları).
+    :param margin: Çizgi uçlarının sınırdan içeri çekilme mesafesi (metre); uçlar tam sınırda kalıp geofence'e takılmasın.
+    :return: (lat, lon, heading) üreten generator.
+    """
+    if not 0 <= overlap < 1:
+        raise ValueError("overlap 0 ile 1 arasında olmalı.")
+    if footprint_width <= 0:
+        raise ValueError("footprint_width pozitif olmalı.")
+    if len(polygon) < 3:
+        raise ValueError("Kapsama çokgeni en az 3 köşe içermeli.")
+
+    frame = _LocalFrame(polygon[0][0], polygon[0][1], angle)
+    xy = [frame.to_xy(lat, lon) for lat, lon in polygon]
+    edges = [(xy[i], xy[(i + 1) % len(xy)]) for i in range(len(xy))]
+    min_y = min(y for _, y in xy)
+    max_y = max(y for _, y in xy)
+    lane_spacing = footprint_width * (1 - overlap)
+
+    direction = 1
+    y = min_y + lane_spacing / 2
+    while y < max_y:
+        intervals = _line_intervals(edges, y)
+        if direction < 0:
+            intervals = [(end, start) for start, end in reversed(intervals)]
+        heading = frame.heading(direction)
+        for start, end in intervals:
+            start += margin * direction
+            end -= margin * direction
+            if (end - start) * direction < 0:
+                continue # Şerit kenar payından kısa
+            yield (*frame.to_latlon(start, y), heading)
+            if point_spacing:
+                steps = int(abs(end - start) // point_spacing)
+                for k in range(1, steps + 1):
+                    x = start + k * point_spacing * direction
+                    if (end - x) * direction > 1e-6:
+                        yield (*frame.to_latlon(x, y), heading)
+            yield (*frame.to_latlon(end, y), heading)
+        direction = -direction
+        y += lane_spacing
+
+def chunked(iterable, size: int):
+    """Bir iterable'ı en fazla size elemanlı listeler halinde tembel olarak böler."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+async def stream_to_waypoints(path, store, alt: float, start_id: int = 1, chunk_size: int = 50, on_chunk=None) -> int:
+    """
+    Üretilen yolu parça parça waypoint deposuna yazar; her parçadan sonra kontrolü event loop'a bırakır.
+    :param path: (lat, lon, heading) üreten iterable (örn. coverage_path).
+    :param store: waypoints nesnesi (add_many metodu kullanılır).
+    :param on_chunk: Her parçadan sonra eklenen id listesiyle çağrılır; async olabilir
+                     (örn. XBee 'W' gönderimi veya görev yükleme, geri basınç burada uygulanabilir).
+    :return: Eklenen waypoint sayısı.
+    """
+    next_id = start_id
+    total = 0
+    for chunk in chunked(path, chunk_size):
+        items = [(str(next_id + k), lat, lon, alt, heading) for k, (lat, lon, heading) in enumerate(chunk)]
+        next_id += len(items)
+        added = store.add_many(items)
+        total += len(added)
+        if on_chunk is not None:
+            result = on_chunk(added)
+            if asyncio.iscoroutine(result):
+                await result
+        await asyncio.sleep(0) # Diğer görevler (telemetri, mesajlar) çalışabilsin
+    return total
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+import time
+import heapq
+import asyncio
+
+# Görev durumları (MS paketindeki "status" alanı)
+MISSION_PENDING = "pending"
+MISSION_RUNNING = "continues"
+MISSION_PREEMPTED = "preempted"
+MISSION_SUCCESSFUL = "successful"
+MISSION_FAILED = "failed"
+
+class MissionStep:
+    '''
+    Görev grafiğindeki tek bir adım.
+    action argümansız bir async fonksiyondur; depends_on bu adımdan önce bitmesi gereken adım adlarıdır.
+    '''
+    __slots__ = ("name", "action", "depends_on")
+
+    def __init__(self, name: str, action, depends_on=()):
+        self.name = name
+        self.action = action
+        self.depends_on = tuple(depends_on)
+
+class Mission:
+    '''
+    Adımlardan oluşan yönlü döngüsüz grafik (DAG) şeklinde görev.
+    Bağımlılıkları tamamlanan adımlar eşzamanlı çalışır. Biten adımlar kontrol noktası olarak
+    tutulur; görev kesilip yeniden başlatıldığında sadece bitmemiş adımlar çalışır.
+    '''
+    def __init__(self, name: str, steps, priority: int = 0, params: dict = None):
+        self.name = name
+        self.steps = {step.name: step for step in steps}
+        self.priority = priority
+        self.params = params if params is not None else {}
+        self.completed = set()
+        self.status = MISSION_PENDING
+        self.step_times = {} # Adım adı -> süre (saniye)
+        self.error = None
+        self._done = None
+
+        for step in self.steps.values():
+            for dependency in step.depends_on:
+                if dependency not in self.steps:
+                    raise ValueError(f"'{self.name}' görevinde '{step.name}' adımı bilinmeyen adıma bağlı: {dependency}")
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, visited = set(), set()
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"'{self.name}' görevinde döngüsel bağımlılık var: {name}")
+            visiting.add(name)
+            for dependency in self.steps[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+        for name in self.steps:
+            visit(name)
+
+    @classmethod
+    def sequence(cls, name: str, actions, priority: int = 0, params: dict = None):
+        """(ad, action) çiftlerinden sıralı (zincir) bir görev oluşturur."""
+        steps = []
+        previous = ()
+        for step_name, action in actions:
+            steps.append(MissionStep(step_name, action, previous))
+            previous = (step_name,)
+        return cls(name, steps, priority, params)
+
+    def ready_steps(self, running) -> list:
+        """Bağımlılıkları bitmiş, henüz çalışmayan ve tamamlanmamış adımlar."""
+        return [step for name, step in self.steps.items()
+                if name not in self.completed and name not in running
+                and all(dependency in self.completed for dependency in step.depends_on)]
+
+    @property
+    def is_complete(self) -> bool:
+        return len(self.completed) == len(self.steps)
+
+    def checkpoint(self) -> dict:
+        """Kalıcı olarak saklanabilecek kontrol noktası."""
+        return {"name": self.name, "priority": self.priority, "params": self.params,
+                "completed": sorted(self.completed), "status": self.status}
+
+    def restore(self, checkpoint: dict):
+        """Kontrol noktasındaki tamamlanmış adımları geri yükler."""
+        self.completed = {name for name in checkpoint.get("completed", ()) if name in self.steps}
+
+    def done_future(self):
+        if self._done is None:
+            self._done = asyncio.get_running_loop().create_future()
+        return self._done
+
+    async def wait(self):
+        """Görev bitene (başarılı veya başarısız) kadar bekler ve durumunu döndürür."""
+        return await self.done_future()
+
+    def _finish(self, status: str):
+        self.status = status
+        future = self.done_future()
+        if not future.done():
+            future.set_result(status)
+
+class MissionEngine:
+    '''
+    Görevleri önceliğe göre çalıştıran motor.
+    Daha yüksek öncelikli bir görev gelirse çalışan görev hemen kesilir (preemption),
+    yeni görev bitince kesilen görev kontrol noktasından devam eder.
+    '''
+    def __init__(self, on_status=None, on_checkpoint=None):
+        """
+        :param on_status: Görev durumu değişince çağrılır (mission, status).
+        :param on_checkpoint: Her adım bittiğinde çağrılır (mission); kalıcı saklama için.
+        """
+        self.on_status = on_status
+        self.on_checkpoint = on_checkpoint
+        self.current = None
+        self._pending = [] # (-öncelik, sıra, görev) yığını
+        self._counter = 0
+        self._wakeup = asyncio.Event()
+        self._current_task = None
+        self._preempted = False
+
+    def _set_status(self, mission: Mission, status: str):
+        mission.status = status
+        if self.on_status is not None:
+            self.on_status(mission, status)
+
+    def _push(self, mission: Mission, order: int = None):
+        """order verilirse (kesilen görev) görev kuyruktaki ilk sırasını korur."""
+        if order is None:
+            self._counter += 1
+            order = self._counter
+        heapq.heappush(self._pending, (-mission.priority, order, mission))
+
+    def submit(self, mission: Mission) -> Mission:
+        """
+        Görevi kuyruğa ekler. Çalışan görevden daha yüksek öncelikliyse onu hemen keser.
+        Senkron çağrılır; mesaj işleme döngüsünden aynı kontrol döngüsünde tepki verilir.
+        """
+        mission.done_future()
+        self._push(mission)
+        if (self.current is not None and self._current_task is not None
+                and mission.priority > self.current.priority and not self._current_task.done()):
+            print(f"Görev '{self.current.name}' kesiliyor, yüksek öncelikli görev: '{mission.name}'")
+            self._preempted = True
+            self._current_task.cancel()
+        self._wakeup.set()
+        return mission
+
+    async def _run_step(self, mission: Mission, step: MissionStep):
+        started = time.perf_counter()
+        try:
+            await step.action()
+        finally:
+            mission.step_times[step.name] = mission.step_times.get(step.name, 0.0) + time.perf_counter() - started
+
+    async def _execute(self, mission: Mission):
+        """Görev grafiğini çalıştırır: hazır adımlar eşzamanlı başlatılır."""
+        running = {} # adım adı -> task
+        try:
+            while not mission.is_complete:
+                for step in mission.ready_steps(running):
+                    running[step.name] = asyncio.create_task(self._run_step(mission, step))
+                if not running:
+                    raise RuntimeError(f"'{mission.name}' görevinde çalıştırılabilir adım kalmadı.")
+                done, _ = await asyncio.wait(running.values(), return_when=asyncio.FIRST_COMPLETED)
+                for name, task in list(running.items()):
+                    if task in done:
+                        del running[name]
+                        task.result() # Adım hata verdiyse burada yükselir
+                        mission.completed.add(name)
+                        if self.on_checkpoint is not None:
+                            self.on_checkpoint(mission)
+        finally:
+            for task in running.values():
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.values(), return_exceptions=True)
+
+    async def run(self):
+        """Motor döngüsü; asenkron bir görev olarak çalıştırılır."""
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            _, order, mission = heapq.heappop(self._pending)
+            self.current = mission
+            self._set_status(mission, MISSION_RUNNING)
+            self._current_task = asyncio.create_task(self._execute(mission))
+            try:
+                await self._current_task
+                mission._finish(MISSION_SUCCESSFUL)
+                self._set_status(mission, MISSION_SUCCESSFUL)
+            except asyncio.CancelledError:
+                if not self._preempted:
+                    self._current_task.cancel()
+                    raise # Motorun kendisi iptal edildi
+                self._preempted = False
+                self._set_status(mission, MISSION_PREEMPTED)
+                self._push(mission, order) # Kontrol noktasından devam etmek üzere aynı sırayla kuyruğa geri
+            except Exception as e:
+                mission.error = e
+                print(f"Görev '{mission.name}' başarısız: {e}")
+                mission._finish(MISSION_FAILED)
+                self._set_status(mission, MISSION_FAILED)
+            finally:
+                self.current = None
+                self._current_task = None
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+
+import math
+import numpy as np
+
+try: # scipy varsa Hungarian (linear_sum_assignment), yoksa numpy ile auction algoritması kullanılır
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+EARTH_RADIUS_M = 6371000.0
+
+OBJECTIVE_TOTAL = "total"       # Toplam uçuş mesafesini en aza indir
+OBJECTIVE_MAKESPAN = "makespan" # En uzun rotayı kısaltmak için yükü dronelar arasında dengele
+# OBJECTIVE_TOTAL'da kapasite verilmezse drone başına en fazla eşit payın bu katı kadar waypoint atanır;
+# mesafe öncelikli kalır ama bütün iş en yakın tek drona yığılmaz
+TOTAL_LOAD_FACTOR = 1.5
+
+def distance_matrix(from_positions, to_positions) -> np.ndarray:
+    """
+    İki konum kümesi arasındaki mesafeleri (metre) tek seferde hesaplar.
+    Konumlar (lat, lon) derece dizileridir; kısa mesafeler için eşdikdörtgen yaklaşımı kullanılır.
+    :return: (len(from_positions), len(to_positions)) boyutunda matris.
+    """
+    a = np.radians(np.asarray(from_positions, dtype=float).reshape(-1, 2))
+    b = np.radians(np.asarray(to_positions, dtype=float).reshape(-1, 2))
+    mean_lat = (a[:, 0, None] + b[None, :, 0]) / 2
+    dx = (b[None, :, 1] - a[:, 1, None]) * np.cos(mean_lat)
+    dy = b[None, :, 0] - a[:, 0, None]
+    return EARTH_RADIUS_M * np.hypot(dx, dy)
+
+def auction_assignment(cost, epsilon_factor: float = 4.0, tolerance: float = 1e-6):
+    """
+    Bertsekas auction algoritması ile dikdörtgen atama problemi (en küçük maliyet).
+    Tüm atanmamış teklifçiler aynı anda teklif verir (Jacobi), epsilon adım adım küçültülür.
+    Sonuç en iyi çözüme n * epsilon (maliyet aralığının tolerance katı) kadar yakındır.
+    :return: linear_sum_assignment ile aynı biçimde (satır_indeksleri, sütun_indeksleri).
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape # n <= m: her satır (teklifçi) bir sütuna (nesne) atanır
+    if n == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    # Kare probleme çevrilir: boşta kalacak sütunlar sıfır maliyetli sahte teklifçilere gider,
+    # aksi halde önceki epsilon turlarından kalan fiyatlar sonucu bozar
+    real_rows = n
+    if n < m:
+        cost = np.vstack([cost, np.zeros((m - n, m))])
+        n = m
+
+    benefit = -cost
+    spread = float(np.ptp(benefit)) or 1.0
+    final_epsilon = spread * tolerance / real_rows
+    epsilon = spread / epsilon_factor
+    prices = np.zeros(m)
+    owner = np.full(m, -1)
+    assigned = np.full(n, -1)
+    rows = np.arange(n)
+
+    while True:
+        owner[:] = -1
+        assigned[:] = -1
+        while True:
+            bidders = np.flatnonzero(assigned < 0)
+            if bidders.size == 0:
+                break
+            values = benefit[bidders] - prices
+            best = values.argmax(axis=1)
+            best_value = values[np.arange(bidders.size), best]
+            if m > 1:
+                values[np.arange(bidders.size), best] = -np.inf
+                second_value = values.max(axis=1)
+            else:
+                second_value = best_value
+            bids = prices[best] + best_value - second_value + epsilon
+
+            # Aynı nesneye gelen tekliflerden en yükseği kazanır
+            highest = np.full(m, -np.inf)
+            np.maximum.at(highest, best, bids)
+            winning = bids >= highest[best]
+            objects, first = np.unique(best[winning], return_index=True)
+            winners = bidders[winning][first]
+
+            previous = owner[objects]
+            assigned[previous[previous >= 0]] = -1
+            owner[objects] = winners
+            assigned[winners] = objects
+            prices[objects] = highest[objects]
+        if epsilon <= final_epsilon:
+            break
+        epsilon = max(epsilon / epsilon_factor, final_epsilon)
+
+    rows, assigned = rows[:real_rows], assigned[:real_rows]
+    if transposed:
+        order = np.argsort(assigned)
+        return assigned[order], rows[order]
+    return rows, assigned
+
+def solve_assignment(cost):
+    """Uygun çözücüyle atama yapar (scipy varsa Hungarian, yoksa auction)."""
+    if linear_sum_assignment is not None:
+        return linear_sum_assignment(cost)
+    return auction_assignment(cost)
+
+def order_route(start, positions) -> list:
+    """Rotayı başlangıç noktasından en yakın komşu sırasıyla dizer; positions içindeki indeksleri döndürür."""
+    remaining = np.arange(len(positions))
+    if remaining.size == 0:
+        return []
+    distances = distance_matrix(positions, positions)
+    current = int(distance_matrix([start], positions)[0].argmin())
+    route = [current]
+    remaining = remaining[remaining != current]
+    while remaining.size:
+        current = int(remaining[distances[current, remaining].argmin()])
+        route.append(current)
+        remaining = remaining[remaining != current]
+    return route
+
+def route_length(start, positions) -> float:
+    """Başlangıçtan sırayla tüm noktalardan geçen rotanın uzunluğu (metre)."""
+    if len(positions) == 0:
+        return 0.0
+    points = np.vstack([np.asarray(start, dtype=float).reshape(1, 2), np.asarray(positions, dtype=float)])
+    a, b = np.radians(points[:-1]), np.radians(points[1:])
+    dx = (b[:, 1] - a[:, 1]) * np.cos((a[:, 0] + b[:, 0]) / 2)
+    dy = b[:, 0] - a[:, 0]
+    return float(EARTH_RADIUS_M * np.hypot(dx, dy).sum())
+
+class Allocation:
+    '''Atama sonucu: her drone için sıralı waypoint id listesi ve rota uzunlukları.'''
+    def __init__(self, routes: dict, drone_positions: dict, waypoint_positions: dict, objective: str,
+                 added: dict = None):
+        self.routes = routes # drone_id -> [waypoint_id, ...]
+        self.added = added or {} # Yeniden atamada her dronun rotasına eklenen waypointler (sadece bunlar gönderilir)
+        self.drone_positions = drone_positions
+        self.waypoint_positions = waypoint_positions
+        self.objective = objective
+        self.route_lengths = {drone_id: route_length(drone_positions[drone_id],
+                                                     [waypoint_positions[i] for i in route])
+                              for drone_id, route in routes.items()}
+
+    @property
+    def total(self) -> float:
+        return sum(self.route_lengths.values())
+
+    @property
+    def makespan(self) -> float:
+        return max(self.route_lengths.values(), default=0.0)
+
+    def __repr__(self):
+        return f"Allocation(drones={len(self.routes)}, total={self.total:.0f}m, makespan={self.makespan:.0f}m)"
+
+def default_capacity(objective: str, waypoint_count: int, drone_count: int) -> int:
+    """
+    Kapasite verilmediğinde drone başına en fazla waypoint: makespan için eşit pay,
+    toplam mesafe için eşit payın TOTAL_LOAD_FACTOR katı.
+    """
+    if drone_count == 0:
+        return 0
+    share = waypoint_count / drone_count
+    return math.ceil(share if objective == OBJECTIVE_MAKESPAN else share * TOTAL_LOAD_FACTOR)
+
+def _assign(drone_ids, starts, waypoint_ids, waypoint_positions, capacity: int) -> dict:
+    """
+    Waypointleri kapasiteli drone yuvalarına atama çözücüsüyle (Hungarian/auction) atar ve her dronun
+    rotasını sıralar. Her drone capacity kadar yuvaya çoğaltılır; yuva sırası küçük bir ceza alır, yük yayılır.
+    """
+    routes = {drone_id: [] for drone_id in drone_ids}
+    if not waypoint_ids or not drone_ids:
+        return routes
+    costs = distance_matrix(starts, [waypoint_positions[i] for i in waypoint_ids])
+    slots = np.repeat(costs, capacity, axis=0)
+    slots += np.tile(np.arange(capacity), len(drone_ids))[:, None] * 1e-3
+    waypoint_rows, slot_cols = solve_assignment(slots.T)
+    owners = np.empty(len(waypoint_ids), dtype=int)
+    owners[waypoint_rows] = slot_cols // capacity
+    for drone_index, drone_id in enumerate(drone_ids):
+        members = [waypoint_ids[i] for i in np.flatnonzero(owners == drone_index)]
+        positions = [waypoint_positions[i] for i in members]
+        routes[drone_id] = [members[i] for i in order_route(starts[drone_index], positions)]
+    return routes
+
+def allocate(drone_positions: dict, waypoint_positions: dict, objective: str = OBJECTIVE_TOTAL,
+             capacity: int = None) -> Allocation:
+    """
+    Waypointleri dronelara atar.
+    :param drone_positions: drone_id -> (lat, lon)
+    :param waypoint_positions: waypoint_id -> (lat, lon)
+    :param objective: OBJECTIVE_TOTAL (toplam mesafe) veya OBJECTIVE_MAKESPAN (en uzun rota).
+    :param capacity: Drone başına en fazla waypoint. Verilmezse default_capacity kullanılır
+                     (makespan için eşit pay, toplam mesafe için eşit payın TOTAL_LOAD_FACTOR katı).
+    """
+    if objective not in (OBJECTIVE_TOTAL, OBJECTIVE_MAKESPAN):
+        raise ValueError(f"Bilinmeyen amaç fonksiyonu: {objective}")
+    drone_ids = list(drone_positions)
+    waypoint_ids = list(waypoint_positions)
+    if capacity is None:
+        capacity = default_capacity(objective, len(waypoint_ids), len(drone_ids))
+    if capacity is not None and drone_ids and capacity * len(drone_ids) < len(waypoint_ids):
+        raise ValueError(f"Kapasite yetersiz: {len(drone_ids)} drone x {capacity} < {len(waypoint_ids)} waypoint")
+    starts = [drone_positions[drone_id] for drone_id in drone_ids]
+    routes = _assign(drone_ids, starts, waypoint_ids, waypoint_positions, capacity)
+    return Allocation(routes, dict(drone_positions), dict(waypoint_positions), objective)
+
+def reallocate_dropped(allocation: Allocation, dropped_id: str, completed=(), drone_positions: dict = None) -> Allocation:
+    """
+    Bir drone düştüğünde sadece onun tamamlanmamış waypointlerini kalan dronelara dağıtır.
+    Diğer dronların mevcut rotaları değişmez (yeni waypointler rotalarının sonuna eklenir),
+    böylece sadece etkilenen dronelara yeni emir gönderilir; eklenenler sonucun added alanındadır.
+    :param completed: Tamamlanmış waypoint id'leri (yeniden atanmaz).
+    :param drone_positions: Kalan dronların güncel konumları (verilmezse eskileri kullanılır).
+    """
+    positions = dict(allocation.drone_positions)
+    if drone_positions is not None:
+        positions.update(drone_positions)
+    positions.pop(dropped_id, None)
+    completed = set(completed)
+    orphans = [i for i in allocation.routes.get(dropped_id, ()) if i not in completed]
+    routes = {drone_id: [i for i in route if i not in completed]
+              for drone_id, route in allocation.routes.items() if drone_id != dropped_id}
+    if orphans and not routes:
+        raise ValueError("Waypointleri devralacak drone kalmadı.")
+
+    # Yeni waypointler her dronun rotasının bittiği noktadan itibaren planlanır
+    drone_ids = list(routes)
+    ends = [allocation.waypoint_positions[routes[d][-1]] if routes[d] else positions[d] for d in drone_ids]
+    capacity = default_capacity(allocation.objective, len(orphans), len(drone_ids))
+    extra = _assign(drone_ids, ends, orphans, allocation.waypoint_positions, capacity)
+    for drone_id in drone_ids:
+        routes[drone_id] = routes[drone_id] + extra[drone_id]
+    added = {drone_id: extra[drone_id] for drone_id in drone_ids if extra[drone_id]}
+    return Allocation(routes, positions, allocation.waypoint_positions, allocation.objective, added)
@@ -0,0 +1,87 @@
+import pytest
+
+from controllers.clock_sync import ClockSync, PeerClock, wall_ms, unwrap_ms, STAMP_MODULO
+from controllers.xbee_controller import XBeePackage, ReceivedPackage, MAX_PAYLOAD_SIZE
+from controllers.loopback_radio import LoopbackAir, LoopbackXBeeModule
+from controllers.timer_wheel import TimerWheel
+
+def test_unwrap_ms_picks_nearest_wrap():
+    now = 1_700_000_000.123
+    assert unwrap_ms(wall_ms(now), now) == pytest.approx(now, abs=1e-3)
+    assert unwrap_ms(STAMP_MODULO - 1, STAMP_MODULO / 1000 + 0.5) == pytest.approx((STAMP_MODULO - 1) / 1000)
+
+def test_peer_clock_offset_and_drift():
+    clock = PeerClock()
+    for second in range(5):
+        t1 = 100.0 + second
+        offset = 0.25 + 1e-4 * second # Eşin saati 100 ppm ileri kayıyor
+        clock.add_sample(t1, t1 + 0.01 + offset, t1 + 0.02 + offset, t1 + 0.03)
+    assert clock.offset_at(104.015) == pytest.approx(0.2504, abs=1e-6)
+    assert clock.drift == pytest.approx(1e-4, rel=1e-3)
+    clock.add_sample(0.0, 5.0, 5.0, -1.0) # Negatif gecikme atılır
+    assert len(clock.samples) == 5
+
+def _reply(params, now):
+    return ReceivedPackage("H", "0", params, timestamp=now, sent_at=wall_ms(now))
+
+def test_reply_needs_our_recent_request():
+    sync = ClockSync(node_id="1", reply_timeout=5.0)
+    now = 1_700_000_000.0
+    assert sync.handle_handshake(_reply({"b": wall_ms(now), "d": "1"}, now)) is None # İstek yok
+    sync.note_request(wall_ms(now - 10.0))
+    sync.handle_handshake(_reply({"b": wall_ms(now), "d": "1"}, now)) # Zaman aşımı
+    sync.note_request(wall_ms(now - 0.02))
+    sync.handle_handshake(_reply({"b": wall_ms(now - 0.01), "d": "2"}, now)) # Başka düğüme
+    assert sync.peers == {} and sync.foreign_replies == 3
+    sync.handle_handshake(_reply({"b": wall_ms(now - 0.01), "d": "1"}, now))
+    assert len(sync.peer("0").samples) == 1
+
+def test_request_reply_fits_payload():
+    sync = ClockSync(node_id="0")
+    request = ReceivedPackage("H", "123", {"d": "0"}, timestamp=1_700_000_000.0, sent_at=STAMP_MODULO - 1)
+    reply = XBeePackage("H", "0", sync.handle_handshake(request), sent_at=STAMP_MODULO - 1)
+    assert reply.params["d"] == "123"
+    assert len(bytes(reply)) <= MAX_PAYLOAD_SIZE
+
+def _pump(modules):
+    while any([module._send_tick() for module in modules]):
+        pass
+
+@pytest.fixture
+def swarm():
+    # Başlatılmamış zamanlayıcı: paketler sadece _pump ile gider. Şeffaf kanal cevapları AT modundaki gibi herkese iletir
+    scheduler = TimerWheel()
+    air = LoopbackAir(transparent=True)
+    modules = {node_id: LoopbackXBeeModule(air, node_id=node_id, scheduler=scheduler) for node_id in ("0", "1", "2")}
+    for module in modules.values():
+        module.connect()
+    yield modules
+    for module in modules.values():
+        module.disconnect()
+
+def _request(module):
+    module.send_data(XBeePackage("H", module.node_id, {"d": "0"}, timestamped=True))
+
+def test_only_requester_takes_the_reply(swarm):
+    _request(swarm["1"])
+    _pump(swarm.values())
+    assert len(swarm["1"].clock_sync.peer("0").samples) == 1
+    assert "0" not in swarm["2"].clock_sync.peers # Yayınlanan cevabı duydu ama örnek almadı
+    assert swarm["2"].clock_sync.foreign_replies == 1
+    assert "1" not in swarm["0"].clock_sync.peers # İsteğe cevap veren taraf da örnek almaz
+
+def test_concurrent_requests_stay_separate(swarm):
+    for _ in range(3):
+        _request(swarm["1"])
+        _request(swarm["2"])
+        _pump(swarm.values())
+    for node_id in ("1", "2"):
+        clock = swarm[node_id].clock_sync.peer("0")
+        assert len(clock.samples) == 3
+        assert abs(clock.offset) < 0.05 # Aynı makine; saat farkı ~0
+
+def test_ground_station_request_answered_by_all(swarm):
+    swarm["0"].send_data(XBeePackage("H", "0", timestamped=True))
+    _pump(swarm.values())
+    assert sorted(swarm["0"].clock_sync.peers) == ["1", "2"]
+    assert swarm["1"].clock_sync.foreign_replies == 1 # Drone 2'nin yer istasyonuna cevabı
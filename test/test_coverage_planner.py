@@ -0,0 +1,62 @@
+import math
+import asyncio
+
+import pytest
+
+from missions.coverage_planner import coverage_path, chunked, stream_to_waypoints, EARTH_RADIUS_M
+from controllers.waypoint_controller import waypoints
+
+REF_LAT, REF_LON = 40.0, 29.0
+
+def _offset(east_m, north_m):
+    return (REF_LAT + math.degrees(north_m / EARTH_RADIUS_M),
+            REF_LON + math.degrees(east_m / (EARTH_RADIUS_M * math.cos(math.radians(REF_LAT)))))
+
+def _local(lat, lon):
+    return (math.radians(lon - REF_LON) * math.cos(math.radians(REF_LAT)) * EARTH_RADIUS_M,
+            math.radians(lat - REF_LAT) * EARTH_RADIUS_M)
+
+SQUARE = [_offset(0, 0), _offset(100, 0), _offset(100, 100), _offset(0, 100)]
+
+def test_boustrophedon_lanes_alternate_inside_margin():
+    path = [(*_local(lat, lon), heading) for lat, lon, heading in coverage_path(SQUARE, 20, overlap=0.0)]
+    assert len(path) == 10 # 5 şerit x 2 uç
+    for lane in range(5):
+        (x1, y1, h1), (x2, y2, h2) = path[2 * lane], path[2 * lane + 1]
+        assert y1 == pytest.approx(10 + 20 * lane, abs=0.01) and y2 == pytest.approx(y1, abs=0.01)
+        expected = (1.0, 99.0) if lane % 2 == 0 else (99.0, 1.0) # Kenar payı 1 m, yön her şeritte döner
+        assert (x1, x2) == pytest.approx(expected, abs=0.01)
+        assert h1 == h2 == pytest.approx(90.0 if lane % 2 == 0 else 270.0)
+
+def test_rotated_lanes_and_point_spacing():
+    path = list(coverage_path(SQUARE, 20, overlap=0.5, angle=90, point_spacing=25))
+    xs = {round(_local(lat, lon)[0]) for lat, lon, _ in path}
+    assert xs == {5, 15, 25, 35, 45, 55, 65, 75, 85, 95} # Şeritler kuzey-güney, 10 m aralıkla
+    assert {round(heading) for _, _, heading in path} == {0, 180}
+    assert len(path) == 10 * 5 # Her şeritte iki uç ve 25 m aralıklı üç ara nokta
+
+def test_path_is_lazy_and_validates_arguments():
+    path = coverage_path(SQUARE, 0.01) # ~10 milyon nokta; sadece ilk nokta hesaplanır
+    assert len(next(path)) == 3
+    for kwargs in ({"footprint_width": 0}, {"footprint_width": 10, "overlap": 1.0}):
+        with pytest.raises(ValueError):
+            next(coverage_path(SQUARE, **kwargs))
+    with pytest.raises(ValueError):
+        next(coverage_path(SQUARE[:2], 10))
+
+def test_chunked():
+    assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked([], 3)) == []
+
+def test_stream_to_waypoints_in_chunks():
+    store = waypoints()
+    chunks = []
+
+    async def on_chunk(ids):
+        chunks.append(ids)
+
+    total = asyncio.run(stream_to_waypoints(coverage_path(SQUARE, 20, overlap=0.0), store, alt=30.0,
+                                            start_id=5, chunk_size=4, on_chunk=on_chunk))
+    assert total == 10 and [len(ids) for ids in chunks] == [4, 4, 2]
+    assert chunks[0][0] == "5" and chunks[-1][-1] == "14"
+    assert store.read("14").alt == 30.0
@@ -0,0 +1,32 @@
+import pytest
+
+from controllers.drone_config import load_config, DEFAULT_CONFIG
+
+def _load(**env):
+    return load_config(argv=[], environ={"DRONECORE_" + key.upper(): value for key, value in env.items()})
+
+def test_defaults_and_typed_overrides():
+    config = _load(baudrate="9600", target_alt="12.5", tdma="evet", relay_types="G,H")
+    assert config["baudrate"] == 9600 and config["target_alt"] == 12.5 and config["tdma"] is True
+    assert config["relay_types"] == ["G", "H"]
+    assert config["drone_id"] == str(DEFAULT_CONFIG["drone_id"]) and config["profile"] == "sitl"
+
+def test_optional_keys_are_typed():
+    config = _load(link_timeout="5", geofence='{"include": [[[40.0, 29.0], [40.1, 29.0], [40.0, 29.1]]]}',
+                   coverage='{"polygon": [], "footprint_width": 30}', mavsdk_server_address="localhost")
+    assert config["link_timeout"] == 5.0 and isinstance(config["link_timeout"], float)
+    assert config["geofence"]["include"][0][1] == [40.1, 29.0]
+    assert config["coverage"]["footprint_width"] == 30
+    assert config["mavsdk_server_address"] == "localhost"
+
+def test_null_disables_optional_keys():
+    config = _load(link_timeout="null", geofence="none", state_db="")
+    assert config["link_timeout"] is None and config["geofence"] is None and config["state_db"] is None
+
+def test_non_object_json_is_rejected():
+    with pytest.raises(ValueError):
+        _load(geofence="[1, 2]")
+
+def test_command_line_wins_over_environment():
+    config = load_config(argv=["--link-timeout", "3", "--drone-id", "4"], environ={"DRONECORE_LINK_TIMEOUT": "9"})
+    assert config["link_timeout"] == 3.0 and config["drone_id"] == "4"
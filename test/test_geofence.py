@@ -0,0 +1,64 @@
+import pytest
+
+from controllers.geofence import (Geofence, FenceZone, GeofenceMonitor, GEOFENCE_BREACH, GEOFENCE_CLEARED)
+
+# ~1.1 km'lik kare alan ve ortasında ~220 m'lik yasak bölge
+CONFIG = {
+    "include": [[[39.90, 32.80], [39.90, 32.81], [39.91, 32.81], [39.91, 32.80]]],
+    "exclude": [[[39.904, 32.804], [39.904, 32.806], [39.906, 32.806], [39.906, 32.804]]],
+}
+
+@pytest.fixture
+def fence():
+    return Geofence.from_config(CONFIG)
+
+def test_zone_needs_three_points():
+    with pytest.raises(ValueError):
+        FenceZone([(0, 0), (1, 1)])
+    with pytest.raises(ValueError):
+        Geofence([])
+
+@pytest.mark.parametrize("lat, lon, inside", [
+    (39.901, 32.801, True),   # İzin verilen alanda
+    (39.905, 32.805, False),  # Yasak bölgede
+    (39.92, 32.805, False),   # Dışarıda
+    (39.905, 32.8039, True),  # Yasak bölgenin hemen yanında
+])
+def test_contains(fence, lat, lon, inside):
+    assert fence.contains(lat, lon) is inside
+
+def test_grid_index_matches_contains_many(fence):
+    import numpy as np
+    rng = np.random.default_rng(3)
+    lats = rng.uniform(39.898, 39.912, 500)
+    lons = rng.uniform(32.798, 32.812, 500)
+    expected = [fence.contains(lat, lon) for lat, lon in zip(lats, lons)]
+    assert list(fence.contains_many(lats, lons)) == expected
+    assert list(Geofence.from_config(CONFIG, grid_size=4).contains_many(lats, lons)) == expected
+
+def test_boundary_distance(fence):
+    distance, zone = fence.boundary_distance(39.901, 32.805)
+    assert zone == "include-0"
+    assert distance == pytest.approx(111.2, rel=1e-2) # 0.001 derece enlem
+
+def test_monitor_reports_breach_and_clear(fence):
+    events = []
+    monitor = GeofenceMonitor(fence, events.append)
+    assert monitor.update(39.901, 32.801)
+    assert events == [] # İçeride başlamak olay değil
+    assert not monitor.update(39.905, 32.805)
+    assert monitor.update(39.902, 32.802)
+    assert [event.kind for event in events] == [GEOFENCE_BREACH, GEOFENCE_CLEARED]
+
+def test_monitor_skips_checks_far_from_boundary(fence):
+    monitor = GeofenceMonitor(fence)
+    monitor.update(39.902, 32.802)
+    for step in range(10):
+        assert monitor.update(39.902 + step * 1e-6, 32.802)
+    assert monitor.skipped == 10
+    assert monitor.checks == 1
+
+def test_monitor_starting_outside_reports_breach(fence):
+    events = []
+    GeofenceMonitor(fence, events.append).update(39.92, 32.805)
+    assert [event.kind for event in events] == [GEOFENCE_BREACH]
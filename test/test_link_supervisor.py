@@ -0,0 +1,74 @@
+import asyncio
+
+from controllers.link_supervisor import LinkSupervisor, LINK_UP, LINK_DOWN, LINK_RECONNECTING
+from controllers.xbee_controller import XBeePackage
+from controllers.loopback_radio import LoopbackAir, LoopbackXBeeModule
+from controllers.timer_wheel import TimerWheel
+
+class FlakyModule(LoopbackXBeeModule):
+    '''İlk failures kadar connect denemesi başarısız olan loopback radyo.'''
+    def __init__(self, failures: int, **kw):
+        super().__init__(LoopbackAir(), node_id="1", scheduler=TimerWheel(), time_sync=False, **kw)
+        self.failures = failures
+        self.attempts = 0
+
+    def connect(self):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            return False
+        return super().connect()
+
+def test_health_problem_reasons():
+    module = FlakyModule(failures=0)
+    supervisor = LinkSupervisor(module, error_threshold=2, heartbeat_timeout=10)
+    assert supervisor.health_problem(now=100.0) == "port kapalı"
+    module.connect()
+    assert supervisor.health_problem(now=100.0) is None
+    module.error_count += 2
+    assert "hata" in supervisor.health_problem(now=100.0)
+    assert supervisor.health_problem(now=100.0) is None # Hatalar bir kez sayılır
+    module.last_receive_time = 100.0
+    assert supervisor.health_problem(now=105.0) is None
+    assert "paket yok" in supervisor.health_problem(now=111.0)
+
+def test_backoff_delay_is_bounded():
+    supervisor = LinkSupervisor(FlakyModule(failures=0), backoff_initial=0.5, backoff_max=4.0)
+    for attempt in range(10):
+        assert 0.0 <= supervisor.backoff_delay(attempt) <= min(4.0, 0.5 * 2 ** attempt)
+
+def test_reconnects_after_port_loss_and_keeps_queue():
+    module = FlakyModule(failures=3)
+    states = []
+    supervisor = LinkSupervisor(module, check_interval=0.01, backoff_initial=0.01, on_state_change=states.append)
+
+    async def scenario():
+        assert not await supervisor.connect() # İlk bağlantı başarısız; run() yine de başlatılır
+        task = asyncio.create_task(supervisor.run())
+        while supervisor.state != LINK_UP:
+            await asyncio.sleep(0.01)
+        module.send_data(XBeePackage("O", "1", {"w": [1]}))
+        module.xbee_device.close() # Port düştü
+        while supervisor.reconnect_count < 2:
+            await asyncio.sleep(0.01)
+        await supervisor.disconnect()
+        await task
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+    assert module.attempts == 5 and module.pending_count() == 1
+    assert states == [LINK_RECONNECTING, LINK_UP, LINK_RECONNECTING, LINK_UP, LINK_DOWN]
+
+def test_heartbeat_only_when_idle_and_time_sync_is_addressed():
+    module = FlakyModule(failures=0)
+    module.connect()
+    heartbeat = XBeePackage("H", "1", {})
+    sync = XBeePackage("H", "1", {"d": "0"}, timestamped=True)
+    supervisor = LinkSupervisor(module, heartbeat_package=heartbeat, heartbeat_interval=5,
+                                time_sync_package=sync, time_sync_interval=30)
+    module.neighbours.update("0013A2FF000000AA", "0")
+    supervisor._send_time_sync(100.0)
+    supervisor._send_heartbeat(100.0) # Kuyrukta senkronizasyon isteği var: kalp atışı atlanır
+    assert [(package.params, address) for package, address in module.send_queue] == [({"d": "0"}, "0013A2FF000000AA")]
+    module.send_queue.clear()
+    supervisor._send_time_sync(110.0)
+    supervisor._send_heartbeat(110.0)
+    assert [package for package, _ in module.send_queue] == [heartbeat]
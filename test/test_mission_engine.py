@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from missions.mission_engine import (Mission, MissionStep, MissionEngine, MISSION_RUNNING, MISSION_PREEMPTED,
+                                     MISSION_SUCCESSFUL, MISSION_FAILED)
+
+def _noop():
+    async def action():
+        pass
+    return action
+
+def test_unknown_dependency_rejected():
+    with pytest.raises(ValueError):
+        Mission("m", [MissionStep("a", _noop(), depends_on=("x",))])
+
+def test_cycle_rejected():
+    with pytest.raises(ValueError):
+        Mission("m", [MissionStep("a", _noop(), ("b",)), MissionStep("b", _noop(), ("a",))])
+
+def test_ready_steps_follow_dependencies():
+    mission = Mission("m", [MissionStep("a", _noop()), MissionStep("b", _noop()),
+                            MissionStep("c", _noop(), ("a", "b"))])
+    assert {step.name for step in mission.ready_steps({})} == {"a", "b"}
+    mission.completed = {"a"}
+    assert [step.name for step in mission.ready_steps({"b": None})] == []
+    mission.completed = {"a", "b"}
+    assert [step.name for step in mission.ready_steps({})] == ["c"]
+
+def test_checkpoint_restore_skips_completed_steps():
+    mission = Mission.sequence("m", [("a", _noop()), ("b", _noop())], priority=2, params={"k": 1})
+    mission.completed = {"a"}
+    restored = Mission.sequence("m", [("a", _noop()), ("b", _noop())])
+    restored.restore(mission.checkpoint())
+    assert restored.completed == {"a"}
+    assert [step.name for step in restored.ready_steps({})] == ["b"]
+
+async def _run_engine(engine, coroutine):
+    runner = asyncio.create_task(engine.run())
+    try:
+        return await asyncio.wait_for(coroutine, 5.0)
+    finally:
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+
+def test_independent_steps_run_concurrently():
+    async def scenario():
+        started = []
+        both = asyncio.Event()
+        def step(name):
+            async def action():
+                started.append(name)
+                if len(started) == 2:
+                    both.set()
+                await both.wait() # Biri diğerini beklemeden başlamazsa kilitlenir
+            return action
+        engine = MissionEngine()
+        mission = engine.submit(Mission("m", [MissionStep("a", step("a")), MissionStep("b", step("b"))]))
+        return await _run_engine(engine, mission.wait())
+    assert asyncio.run(scenario()) == MISSION_SUCCESSFUL
+
+def test_failed_step_fails_mission():
+    async def scenario():
+        async def broken():
+            raise RuntimeError("arıza")
+        engine = MissionEngine()
+        mission = engine.submit(Mission.sequence("m", [("a", broken), ("b", _noop())]))
+        status = await _run_engine(engine, mission.wait())
+        return status, mission
+    status, mission = asyncio.run(scenario())
+    assert status == MISSION_FAILED
+    assert "b" not in mission.completed
+    assert isinstance(mission.error, RuntimeError)
+
+def test_preempted_mission_resumes_from_checkpoint():
+    async def scenario():
+        calls = []
+        statuses = []
+        release = asyncio.Event()
+        def record(name):
+            async def action():
+                calls.append(name)
+            return action
+        async def long_step():
+            calls.append("low-b")
+            await release.wait()
+        engine = MissionEngine(on_status=lambda mission, status: statuses.append((mission.name, status)))
+        low = engine.submit(Mission.sequence("low", [("a", record("low-a")), ("b", long_step), ("c", record("low-c"))]))
+
+        async def drive():
+            while "low-b" not in calls:
+                await asyncio.sleep(0)
+            high = engine.submit(Mission.sequence("high", [("x", record("high-x"))], priority=5))
+            assert await high.wait() == MISSION_SUCCESSFUL
+            release.set()
+            return await low.wait()
+        status = await _run_engine(engine, drive())
+        return status, calls, statuses
+    status, calls, statuses = asyncio.run(scenario())
+    assert status == MISSION_SUCCESSFUL
+    # "a" tekrar çalışmaz; kesilen "b" baştan, ardından "c" çalışır
+    assert calls == ["low-a", "low-b", "high-x", "low-b", "low-c"]
+    assert ("low", MISSION_PREEMPTED) in statuses
+    assert statuses.index(("high", MISSION_SUCCESSFUL)) < statuses.index(("low", MISSION_SUCCESSFUL))
+    assert statuses.count(("low", MISSION_RUNNING)) == 2
+
+def test_preempted_mission_keeps_its_queue_position():
+    async def scenario():
+        order = []
+        started = asyncio.Event()
+        release = asyncio.Event()
+        def record(name):
+            async def action():
+                order.append(name)
+            return action
+        async def first_step():
+            order.append("a")
+            started.set()
+            await release.wait()
+        engine = MissionEngine()
+        first = engine.submit(Mission.sequence("first", [("a", first_step)], priority=1))
+
+        async def drive():
+            await started.wait()
+            engine.submit(Mission.sequence("second", [("b", record("b"))], priority=1)) # Aynı öncelik, sonra gelen
+            urgent = engine.submit(Mission.sequence("urgent", [("u", record("u"))], priority=5))
+            await urgent.wait()
+            release.set()
+            await first.wait()
+            while "b" not in order:
+                await asyncio.sleep(0)
+        await _run_engine(engine, drive())
+        return order
+    # Kesilen görev, kendisinden sonra kuyruğa giren eşit öncelikli görevin önünde devam eder
+    assert asyncio.run(scenario()) == ["a", "u", "a", "b"]
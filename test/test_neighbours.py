@@ -0,0 +1,62 @@
+import pytest
+
+from controllers.xbee_controller import NeighbourTable, XBeePackage
+from controllers.loopback_radio import LoopbackAir, LoopbackXBeeModule
+from controllers.timer_wheel import TimerWheel
+
+def test_address_of_follows_latest_address_and_expires():
+    table = NeighbourTable(expiry_seconds=30)
+    table.update("AA", "1", now=100.0)
+    table.update("BB", None, now=100.0) # Drone id taşımayan paket: sadece adres
+    assert table.address_of("1", now=120.0) == "AA"
+    assert table.address_of("1", now=131.0) is None
+    table.update("CC", "1", now=140.0) # Radyo değişti
+    assert table.address_of("1", now=140.0) == "CC"
+    table.update("AA", "2", now=141.0) # Eski adres artık başka drona ait
+    assert table.address_of("2", now=141.0) == "AA" and table.address_of("1", now=141.0) == "CC"
+    assert {neighbour.address for neighbour in table.neighbours(now=141.0)} == {"AA", "CC"}
+
+def test_update_rssi_only_for_known_neighbours():
+    table = NeighbourTable()
+    table.update("AA", "1", now=100.0, rssi=40)
+    table.update_rssi("AA", 55)
+    table.update_rssi("ZZ", 10)
+    assert [(neighbour.address, neighbour.rssi) for neighbour in table.neighbours(now=100.0)] == [("AA", 55)]
+
+def _pump(modules):
+    while any([module._send_tick() for module in modules]):
+        pass
+
+@pytest.fixture
+def swarm():
+    scheduler = TimerWheel() # Başlatılmaz; paketler _pump ile gönderilir
+    air = LoopbackAir()
+    modules = {node_id: LoopbackXBeeModule(air, node_id=node_id, scheduler=scheduler, time_sync=False)
+               for node_id in ("0", "1", "2")}
+    for module in modules.values():
+        module.connect()
+    yield modules
+    for module in modules.values():
+        module.disconnect()
+
+def _drain(module):
+    records = []
+    while (record := module.read_received_data()) is not None:
+        records.append(record)
+    return records
+
+def test_send_by_drone_id_is_unicast_once_known(swarm):
+    ground = swarm["0"]
+    ground.send_data(XBeePackage("O", "1", {"w": [1]}), drone_id="1") # Adres henüz bilinmiyor: broadcast
+    _pump(swarm.values())
+    assert len(_drain(swarm["1"])) == 1 and len(_drain(swarm["2"])) == 1
+
+    swarm["1"].send_data(XBeePackage("G", "1", {"x": 1, "y": 2}))
+    _pump(swarm.values())
+    assert ground.neighbours.address_of("1") .upper() == swarm["1"].xbee_device.address_hex
+    _drain(swarm["2"])
+
+    ground.send_data(XBeePackage("O", "2", {"w": [2]}), drone_id="1")
+    _pump(swarm.values())
+    assert [record.params for record in _drain(swarm["1"])] == [{"w": [2]}]
+    assert _drain(swarm["2"]) == []
@@ -0,0 +1,63 @@
+import math
+import time
+import asyncio
+
+import pytest
+
+from controllers.offboard_controller import LoopStats, PurePursuit, deadline_ticks
+
+def test_loop_stats_histogram_and_summary():
+    stats = LoopStats(0.05)
+    assert stats.summary() == "Döngü istatistiği yok."
+    stats.record(0.0004, 0.05)
+    stats.record(0.003, 0.056, compute_time=0.002)
+    stats.record(0.2, 0.25)
+    assert stats.jitter_histogram == [1, 0, 0, 1, 0, 0, 0, 1]
+    assert stats.period_histogram == [1, 0, 0, 0, 1, 0, 0, 1] # 6 ms sapma "<=10ms" kovasına düşer
+    assert stats.max_jitter == 0.2 and stats.compute_max == 0.002
+    assert "3 tick @ 20 Hz" in stats.summary() and ">50ms:1" in stats.summary()
+
+def test_deadline_ticks_skip_missed_ticks_without_drift():
+    stats = LoopStats(0.01)
+
+    async def run():
+        ticks = []
+        async for tick, deadline in deadline_ticks(0.01, stats):
+            ticks.append((tick, deadline))
+            if len(ticks) == 3:
+                time.sleep(0.035) # Döngüyü bloklayan uzun hesaplama: sonraki üç tick kaçırılır
+            if len(ticks) == 5:
+                return ticks
+
+    ticks = asyncio.run(run())
+    numbers = [tick for tick, _ in ticks]
+    assert numbers[3] >= numbers[2] + 3
+    start = ticks[0][1]
+    assert all(deadline == pytest.approx(start + tick * 0.01) for tick, deadline in ticks) # Mutlak hedefler
+    assert stats.overruns == sum(later - earlier - 1 for earlier, later in zip(numbers, numbers[1:]))
+    assert stats.samples == 5
+
+def _fly(tracker, x=0.0, y=0.0, dt=0.05, steps=2000):
+    speeds = []
+    for _ in range(steps):
+        vx, vy, done = tracker.update(x, y)
+        if done:
+            return (x, y), speeds
+        speeds.append(math.hypot(vx, vy))
+        x, y = x + vx * dt, y + vy * dt
+    raise AssertionError("Yol tamamlanamadı")
+
+def test_pure_pursuit_follows_corner_and_stops_at_goal():
+    path = [(0.0, 0.0), (40.0, 0.0), (40.0, 30.0)]
+    tracker = PurePursuit(path, lookahead=5.0, cruise_speed=4.0, accept_radius=1.0)
+    (x, y), speeds = _fly(tracker)
+    assert math.hypot(x - 40.0, y - 30.0) <= 1.0
+    assert max(speeds) <= 4.0 + 1e-9 and speeds[-1] < 1.5 # Hedefe yaklaşırken yavaşlar
+    assert tracker.reached_index() == len(path) - 1
+
+def test_pure_pursuit_aims_ahead_on_path():
+    tracker = PurePursuit([(0.0, 0.0), (100.0, 0.0)], lookahead=10.0, cruise_speed=5.0)
+    vx, vy, done = tracker.update(0.0, 3.0) # Yolun 3 m yanında: lookahead noktasına (10, 0) doğru
+    assert not done and vy / vx == pytest.approx(-3.0 / 10.0)
+    assert math.hypot(vx, vy) == pytest.approx(5.0)
+    assert PurePursuit([(0.0, 0.0)]).update(0.0, 0.0) == (0.0, 0.0, True)
@@ -0,0 +1,78 @@
+import os
+import sys
+import types
+import asyncio
+
+import pytest
+
+pytest.importorskip("mavsdk") # DroneController bir MAVSDK System nesnesi oluşturur
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "controllers"))
+
+from drone_controller import DroneController
+from loopback_radio import LoopbackAir
+from timer_wheel import TimerWheel
+
+def _stream(items, delay=0.0):
+    async def generator():
+        for item in items:
+            await asyncio.sleep(delay)
+            yield item
+        await asyncio.Event().wait() # Gerçek telemetri akışları kendiliğinden bitmez
+    return generator
+
+class FakeSystem:
+    '''Uçuş öncesi ve kalkışta kullanılan MAVSDK System çağrılarının alt kümesi.'''
+    def __init__(self, delay: float = 0.05, altitudes=(5.0, 19.8) + (20.0,) * 20):
+        self.calls = []
+        ns = types.SimpleNamespace
+        self.core = ns(connection_state=_stream([ns(is_connected=False), ns(is_connected=True)], delay))
+        self.telemetry = ns(
+            health=_stream([ns(is_global_position_ok=True, is_home_position_ok=True)], delay),
+            home=_stream([ns(absolute_altitude_m=500.0)], delay),
+            status_text=_stream([]),
+            position=_stream([ns(relative_altitude_m=altitude) for altitude in altitudes], 0.001),
+            velocity_ned=_stream([ns(down_m_s=speed) for speed in (-2.0, -0.5, 0.1)]),
+        )
+        self.action = ns(set_takeoff_altitude=self._record("set_takeoff_altitude", delay),
+                         arm=self._record("arm"), takeoff=self._record("takeoff"))
+        self.param = ns(get_param_float=self._param)
+
+    def _record(self, name, delay=0.0):
+        async def call(*args):
+            await asyncio.sleep(delay)
+            self.calls.append((name, args))
+        return call
+
+    async def _param(self, name):
+        if name == "MPC_XY_CRUISE":
+            raise RuntimeError("parametre yok")
+        return 2.5
+
+    async def connect(self, system_address):
+        self.calls.append(("connect", (system_address,)))
+
+@pytest.fixture
+def controller():
+    drone = DroneController(drone_id="1", scheduler=TimerWheel(), loopback_air=LoopbackAir())
+    drone.drone = FakeSystem()
+    drone.target_alt = 20.0
+    return drone
+
+def test_preflight_phases_run_concurrently(controller):
+    asyncio.run(controller.preflight())
+    assert controller.flying_alt == 520.0
+    assert controller.param_values == {"MIS_TAKEOFF_ALT": 2.5} # Okunamayan parametre atlanır
+    assert ("set_takeoff_altitude", (20.0,)) in controller.drone.calls
+    sequential = sum(controller.phase_times[name] for name in ("connection", "health", "home", "params"))
+    assert controller.phase_times["preflight"] < sequential
+
+def test_preflight_times_out(controller):
+    controller.drone.telemetry.health = _stream([]) # Sağlık kontrolü hiç geçmez
+    controller.preflight_timeout = 0.3
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(controller.preflight())
+
+def test_takeoff_waits_for_altitude_and_still_vertical_speed(controller):
+    asyncio.run(asyncio.wait_for(controller.arm_and_takeoff(), timeout=5))
+    assert [name for name, _ in controller.drone.calls] == ["arm", "takeoff"]
+    assert "takeoff" in controller.phase_times and "arm" in controller.phase_times
@@ -0,0 +1,58 @@
+import pytest
+
+from controllers.rate_controller import AimdRateController, LinkQualityMonitor
+
+def test_additive_increase_when_idle():
+    controller = AimdRateController(initial_interval=1.0, min_interval=0.2, additive_step=0.5)
+    controller.update(0, now=0.0)
+    assert controller.update(0, now=2.0) == pytest.approx(0.5) # 1 Hz + 2 s * 0.5 Hz/s
+    for second in range(3, 30):
+        controller.update(0, now=float(second))
+    assert controller.interval == pytest.approx(0.2) # max_rate sınırı
+
+def test_queue_congestion_halves_rate_once_per_hold():
+    controller = AimdRateController(initial_interval=0.5, decrease_hold=2.0, queue_threshold=3)
+    controller.update(0, now=0.0)
+    assert controller.update(5, now=0.0) == pytest.approx(1.0)
+    assert controller.update(5, now=1.0) == pytest.approx(1.0) # Bekleme süresi dolmadı
+    assert controller.update(5, now=2.0) == pytest.approx(2.0)
+    assert controller.decreases == 2
+
+def test_feedback_loss_decreases_and_is_consumed():
+    controller = AimdRateController(initial_interval=1.0, additive_step=0.0)
+    controller.update(0, now=0.0)
+    controller.on_feedback(0.3, now=1.0)
+    assert controller.update(0, now=1.0) == pytest.approx(2.0)
+    assert controller.update(0, now=5.0) == pytest.approx(2.0) # Aynı bildirim iki kez sayılmaz
+
+def test_stale_feedback_ignored():
+    controller = AimdRateController(feedback_timeout=10.0)
+    controller.on_feedback(0.5, delay=3.0, now=0.0)
+    assert controller.congestion(0, now=20.0) is None
+    assert controller.congestion(0, now=5.0) is not None
+
+def test_send_capacity_caps_rate():
+    controller = AimdRateController(initial_interval=0.5, min_interval=0.2, capacity_share=0.8)
+    for second in range(50):
+        controller.update(0, now=float(second), send_capacity=1.0)
+    assert controller.interval == pytest.approx(1.25)
+
+def test_link_quality_counts_loss_and_delay():
+    monitor = LinkQualityMonitor()
+    monitor.observe("1", None, 0.3)
+    monitor.observe("1", 0)
+    monitor.observe("1", 2)
+    assert monitor.feedback("1") == {"l": 33, "d": 300}
+    assert "1" in monitor.drones()
+
+def test_link_quality_duplicates_and_reordering():
+    monitor = LinkQualityMonitor(counter_modulo=256)
+    for counter in (0, 2, 2, 1, 3):
+        monitor.observe("1", counter)
+    assert monitor.feedback("1")["l"] == 0 # Kopya sayılmaz, geç gelen paket kaybı geri alır
+
+def test_link_quality_counter_wraps():
+    monitor = LinkQualityMonitor(counter_modulo=256)
+    for counter in (254, 255, 0, 1):
+        monitor.observe("1", counter)
+    assert monitor.feedback("1")["l"] == 0
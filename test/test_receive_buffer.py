@@ -0,0 +1,48 @@
+from controllers.xbee_controller import (ReceiveBuffer, ReceivedPackage, DROP_OLDEST, DROP_NEWEST,
+                                         LATEST_PER_SENDER, MAX_RECEIVE_CHANNELS)
+
+def _record(package_type, sender, timestamp):
+    return ReceivedPackage(package_type, sender, {}, timestamp=timestamp)
+
+def test_drop_oldest_keeps_newest_records():
+    buffer = ReceiveBuffer(capacity=2, policies={}, default_policy=DROP_OLDEST)
+    for second in range(3):
+        assert buffer.put(_record("W", str(second), 100.0 + second))
+    assert [buffer.pop(now=103.0).sender for _ in range(2)] == ["1", "2"]
+    assert buffer.pop(now=103.0) is None
+    assert buffer.drop_counts["W"]["overflow"] == 1
+
+def test_drop_newest_rejects_when_full():
+    buffer = ReceiveBuffer(capacity=2, policies={"O": DROP_NEWEST})
+    assert buffer.put(_record("O", "1", 100.0)) and buffer.put(_record("O", "2", 101.0))
+    assert not buffer.put(_record("O", "3", 102.0))
+    assert [buffer.pop(now=103.0).sender for _ in range(2)] == ["1", "2"]
+    assert buffer.stats()["drops"]["O"]["overflow"] == 1
+
+def test_latest_per_sender_replaces_telemetry():
+    buffer = ReceiveBuffer(capacity=2) # Varsayılan politikada 'G' gönderici başına son paket
+    buffer.put(_record("G", "1", 100.0))
+    buffer.put(_record("G", "2", 100.5))
+    buffer.put(_record("G", "1", 101.0)) # 1'in eski konumu yerine geçer, sıranın sonuna taşınır
+    buffer.put(_record("G", "3", 101.5)) # Kapasite 2: en uzun süredir güncellenmeyen 2 atılır
+    assert len(buffer) == 2
+    assert [(record.sender, record.timestamp) for record in (buffer.pop(now=102.0), buffer.pop(now=102.0))] == [
+        ("1", 101.0), ("3", 101.5)]
+    assert buffer.drop_counts["G"] == {"overflow": 1, "expired": 0, "replaced": 1}
+
+def test_pop_merges_channels_by_age_and_expires_stale():
+    buffer = ReceiveBuffer(capacity=8, retention_seconds=10)
+    buffer.put(_record("W", "1", 100.0))
+    buffer.put(_record("G", "2", 105.0))
+    buffer.put(_record("O", "3", 103.0))
+    assert buffer.pop(now=112.0).package_type == "O" # 'W' süresi geçti, atlandı
+    assert buffer.pop(now=112.0).package_type == "G"
+    assert not buffer
+    assert buffer.drop_counts["W"]["expired"] == 1
+
+def test_unknown_types_share_one_channel_past_limit():
+    buffer = ReceiveBuffer(capacity=4)
+    for index in range(MAX_RECEIVE_CHANNELS + 5):
+        buffer.put(_record(f"X{index}", "1", 100.0 + index))
+    depth = buffer.stats()["depth"]
+    assert len(depth) == MAX_RECEIVE_CHANNELS + 1 and depth[None] == 4
@@ -0,0 +1,44 @@
+import pickle
+
+import pytest
+
+from controllers.xbee_controller import XBeePackage, ReceivedPackage, XBeeModule
+from controllers.loopback_radio import LoopbackMessage
+
+def test_from_frame_decodes_fields():
+    frame = bytes(XBeePackage("G", "3", {"x": 1, "y": 2}, seq=7, origin="3", hops=1, hop_limit=2, sent_at=99))
+    record = ReceivedPackage.from_frame(frame, "ADDR", 1.5)
+    assert (record.package_type, record.sender, record.params) == ("G", "3", {"x": 1, "y": 2})
+    assert (record.seq, record.origin, record.hops, record.hop_limit, record.sent_at) == (7, "3", 1, 2, 99)
+    assert (record.source_addr, record.timestamp) == ("ADDR", 1.5)
+    assert record["t"] == "G" and "p" in record and record.get("error") is None
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+def test_from_frame_accepts_buffers(wrap):
+    record = ReceivedPackage.from_frame(wrap('{"t":"H","s":"0","p":{"a":1}}'.encode("utf-8")))
+    assert record.params == {"a": 1}
+
+def test_paramless_record_is_picklable():
+    record = ReceivedPackage.from_frame(b'{"t":"H","s":"0"}')
+    assert record.params == {}
+    copy = pickle.loads(pickle.dumps(record))
+    assert (copy.package_type, copy.sender, copy.params) == ("H", "0", {})
+
+@pytest.mark.parametrize("frame", [b'{"t":"H","s":"0","p":5}', b'{"t":"H","s":"0","p":[1]}', b'[1,2]', b'{"t":', b'\xff'])
+def test_from_frame_rejects_malformed(frame):
+    with pytest.raises(ValueError):
+        ReceivedPackage.from_frame(frame)
+
+def test_malformed_params_become_error_record():
+    module = XBeeModule(port="test", node_id="1")
+    module._receive_data_callback(LoopbackMessage(b'{"t":"H","s":"0","p":5,"m":1}', None))
+    record = module.read_received_data()
+    assert record.error is not None
+    assert record.raw_data_hex == b'{"t":"H","s":"0","p":5,"m":1}'.hex()
+
+def test_to_package_round_trip():
+    record = ReceivedPackage.from_frame(b'{"t":"W","s":"5","p":{"x":1,"y":2,"h":3}}')
+    package = record.to_package()
+    assert bytes(package) == b'{"t":"W","s":"5","p":{"x":1,"y":2,"h":3}}'
+    package.params["x"] = 9 # Kayıttan bağımsız kopya
+    assert record.params["x"] == 1
@@ -0,0 +1,66 @@
+import pytest
+
+from controllers.xbee_controller import SeenCache, XBeePackage
+from controllers.loopback_radio import LoopbackAir, LoopbackXBeeModule
+from controllers.timer_wheel import TimerWheel
+
+def test_seen_cache_suppresses_repeats_and_forgets_oldest():
+    cache = SeenCache(capacity=2)
+    assert cache.add(("1", 0)) and not cache.add(("1", 0))
+    cache.add(("1", 1))
+    cache.add(("1", 2)) # ("1", 0) en eski: unutulur
+    assert len(cache) == 2 and cache.add(("1", 0))
+
+class ChainAir(LoopbackAir):
+    '''Sadece ardışık bağlanan cihazlar birbirini duyar: 1 - 2 - 3 zinciri.'''
+    def _deliver(self, target, message):
+        if abs(int(target.address_hex, 16) - int(message.remote_device.address_hex, 16)) == 1:
+            super()._deliver(target, message)
+
+def _pump(modules):
+    while any([module._send_tick() for module in modules]):
+        pass
+
+def _chain(relay_hops, relay_probability=1.0):
+    scheduler = TimerWheel() # Başlatılmaz; paketler _pump ile gönderilir
+    air = ChainAir()
+    modules = [LoopbackXBeeModule(air, node_id=node_id, scheduler=scheduler, time_sync=False, relay_types={"G"},
+                                  relay_hops=relay_hops, relay_probability=relay_probability)
+               for node_id in ("1", "2", "3")]
+    for module in modules:
+        module.connect()
+    return modules
+
+def _drain(module):
+    records = []
+    while (record := module.read_received_data()) is not None:
+        records.append(record)
+    return records
+
+def test_relay_reaches_end_of_chain_once():
+    first, middle, last = _chain(relay_hops=2)
+    first.send_data(XBeePackage("G", "1", {"x": 1, "y": 2}))
+    _pump([first, middle, last])
+    assert [(record.sender, record.hops) for record in _drain(last)] == [("1", 1)]
+    assert [(record.sender, record.hops) for record in _drain(middle)] == [("1", 0)]
+    assert _drain(first) == [] # Kendi paketimiz röleden geri geldi
+    assert middle.relay_stats["forwarded"] == 1 and last.relay_stats["forwarded"] == 1
+    assert first.relay_stats["duplicates"] == 1 and middle.relay_stats["duplicates"] == 1
+    # Röle edilen paketin adresi röleye aittir; drone 1 son düğümün komşusu sayılmaz
+    assert last.neighbours.address_of("1") is None
+
+def test_hop_limit_stops_forwarding():
+    first, middle, last = _chain(relay_hops=1)
+    first.send_data(XBeePackage("G", "1", {"x": 1, "y": 2}))
+    _pump([first, middle, last])
+    assert len(_drain(last)) == 1
+    assert last.relay_stats["forwarded"] == 0 and middle.relay_stats["duplicates"] == 0
+
+def test_untyped_or_suppressed_packets_are_not_forwarded():
+    first, middle, last = _chain(relay_hops=2, relay_probability=0.0)
+    first.send_data(XBeePackage("G", "1", {"x": 1, "y": 2}))
+    first.send_data(XBeePackage("W", "5", {"x": 1, "y": 2, "h": 0})) # Röle tipi değil: sıra no almaz
+    _pump([first, middle, last])
+    assert [record.package_type for record in _drain(middle)] == ["G", "W"]
+    assert _drain(last) == []
+    assert middle.relay_stats["suppressed"] == 1
@@ -0,0 +1,55 @@
+import asyncio
+
+from controllers.state_store import StateStore, STATE_WAYPOINT, STATE_MISSION
+
+def test_pending_changes_visible_before_flush(tmp_path):
+    store = StateStore(str(tmp_path / "state.db")).open()
+    store.put(STATE_WAYPOINT, 1, {"lat": 39.9})
+    assert store.dirty
+    assert store.load(STATE_WAYPOINT) == {"1": {"lat": 39.9}}
+    assert store.load(STATE_MISSION) == {}
+    store.close()
+
+def test_writes_coalesce_into_one_flush(tmp_path):
+    store = StateStore(str(tmp_path / "state.db")).open()
+    for lat in (1.0, 2.0, 3.0):
+        store.put(STATE_WAYPOINT, "7", {"lat": lat})
+    store.put(STATE_WAYPOINT, "8", {"lat": 0.0})
+    store.delete(STATE_WAYPOINT, "8")
+    assert store.flush() == 2 # Aynı anahtara yazımlar birleşir
+    assert store.flush() == 0
+    assert not store.dirty
+    assert store.load(STATE_WAYPOINT) == {"7": {"lat": 3.0}}
+    store.close()
+
+def test_close_persists_pending_changes(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = StateStore(path).open()
+    store.put(STATE_MISSION, "survey", {"completed": ["takeoff"]})
+    store.put(STATE_WAYPOINT, "1", {"lat": 39.9})
+    store.close()
+    store.delete(STATE_WAYPOINT, "1") # Kapalı depoda etkisiz
+    reopened = StateStore(path).open()
+    assert reopened.load(STATE_MISSION) == {"survey": {"completed": ["takeoff"]}}
+    assert reopened.load(STATE_WAYPOINT) == {"1": {"lat": 39.9}}
+    reopened.close()
+
+def test_run_flushes_periodically(tmp_path):
+    path = str(tmp_path / "state.db")
+    async def scenario():
+        store = StateStore(path, flush_interval=0.01).open()
+        writer = asyncio.create_task(store.run())
+        store.put(STATE_WAYPOINT, "1", {"lat": 39.9})
+        for _ in range(200):
+            if store.flush_count:
+                break
+            await asyncio.sleep(0.01)
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        return store
+    store = asyncio.run(scenario())
+    assert store.flush_count >= 1
+    other = StateStore(path).open() # Ayrı bağlantı; sadece diske yazılanları görür
+    assert other.load(STATE_WAYPOINT) == {"1": {"lat": 39.9}}
+    other.close()
+    store.close()
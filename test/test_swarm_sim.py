@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+
+import pytest
+
+from controllers.timer_wheel import TimerWheel
+from controllers.xbee_controller import XBeePackage
+from controllers.loopback_radio import LoopbackAir, LoopbackXBeeModule
+
+def _advance(wheel, ticks):
+    for _ in range(ticks):
+        wheel._advance()
+
+def test_timer_wheel_runs_once_periodic_and_long_delays():
+    wheel = TimerWheel(tick=0.01, slots=8)
+    calls = []
+    wheel.call_later(0.03, lambda: calls.append("later"))
+    periodic = wheel.call_every(0.02, lambda: calls.append("every"))
+    wheel.call_later(0.2, lambda: calls.append("long")) # Tekerlekten uzun: birkaç tur bekler
+    _advance(wheel, 6)
+    assert calls == ["every", "later", "every", "every"]
+    periodic.cancel()
+    _advance(wheel, 14)
+    assert calls[-1] == "long" and calls.count("every") == 3
+
+def test_timer_wheel_survives_failing_callback():
+    wheel = TimerWheel(tick=0.01, slots=8)
+    calls = []
+    wheel.call_every(0.01, lambda: 1 / 0)
+    wheel.call_every(0.01, lambda: calls.append(1))
+    _advance(wheel, 3)
+    assert len(calls) == 3
+
+def _module(air, node_id, scheduler):
+    module = LoopbackXBeeModule(air, node_id=node_id, scheduler=scheduler, time_sync=False)
+    module.connect()
+    return module
+
+def test_loopback_latency_is_delivered_by_the_wheel():
+    wheel = TimerWheel(tick=0.01, slots=16)
+    air = LoopbackAir(scheduler=wheel, latency=0.05)
+    sender, receiver = _module(air, "1", wheel), _module(air, "2", wheel)
+    sender.send_data(XBeePackage("G", "1", {"x": 1, "y": 2}))
+    sender._send_tick()
+    assert receiver.read_received_data() is None
+    _advance(wheel, 5)
+    assert receiver.read_received_data().params == {"x": 1, "y": 2}
+
+def test_loopback_loss_and_addressing():
+    wheel = TimerWheel()
+    lossy = LoopbackAir(loss=1.0)
+    sender, receiver = _module(lossy, "1", wheel), _module(lossy, "2", wheel)
+    sender.send_data(XBeePackage("G", "1", {"x": 1, "y": 2}))
+    sender._send_tick()
+    assert receiver.read_received_data() is None and lossy.stats == {"sent": 1, "delivered": 0, "lost": 1}
+
+    for transparent, expected in ((False, 0), (True, 1)):
+        air = LoopbackAir(transparent=transparent)
+        nodes = [_module(air, node_id, wheel) for node_id in ("1", "2", "3")]
+        nodes[0].send_data(XBeePackage("O", "1", {"w": [1]}), remote_xbee_addr_hex=nodes[1].xbee_device.address_hex)
+        nodes[0]._send_tick()
+        assert nodes[1].read_received_data() is not None
+        assert len(nodes[2].received_queue) == expected # Şeffaf (AT) modda adresli çerçeveyi herkes duyar
+
+def test_load_swarm_config(tmp_path):
+    pytest.importorskip("mavsdk") # swarm_runner DroneController'ı (MAVSDK) yükler
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "controllers"))
+    from swarm_runner import load_swarm_config
+    path = tmp_path / "swarm.json"
+    path.write_text(json.dumps({"drones": []}))
+    with pytest.raises(ValueError):
+        load_swarm_config(str(path))
+    path.write_text(json.dumps({"drones": [{"drone_id": "1"}]}))
+    assert load_swarm_config(str(path))["drones"][0]["drone_id"] == "1"
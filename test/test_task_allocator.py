@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from missions.task_allocator import (allocate, reallocate_dropped, auction_assignment, distance_matrix,
+                                     default_capacity, OBJECTIVE_TOTAL, OBJECTIVE_MAKESPAN, TOTAL_LOAD_FACTOR)
+
+def _brute_force_cost(cost):
+    from itertools import permutations
+    rows, cols = cost.shape
+    return min(sum(cost[r, c] for r, c in zip(range(rows), perm)) for perm in permutations(range(cols), rows))
+
+def test_distance_matrix_shape_and_scale():
+    distances = distance_matrix([(0.0, 0.0), (1.0, 0.0)], [(0.0, 0.0), (0.0, 1.0), (1.0, 0.0)])
+    assert distances.shape == (2, 3)
+    assert distances[0, 0] == 0.0
+    assert distances[0, 2] == pytest.approx(111195, rel=1e-3) # 1 derece enlem
+
+@pytest.mark.parametrize("shape", [(4, 4), (3, 6), (6, 3)])
+def test_auction_matches_optimal_assignment(shape):
+    cost = np.random.default_rng(7).uniform(0, 100, shape)
+    rows, cols = auction_assignment(cost)
+    assert len(set(rows)) == len(rows) == min(shape)
+    assert len(set(cols)) == len(cols)
+    assert cost[rows, cols].sum() == pytest.approx(_brute_force_cost(cost if shape[0] <= shape[1] else cost.T), abs=1e-3)
+
+def _grid(count):
+    return {str(i + 1): (39.90 + (i // 5) * 1e-3, 32.80 + (i % 5) * 1e-3) for i in range(count)}
+
+def test_allocate_covers_every_waypoint_once():
+    drones = {"1": (39.90, 32.80), "2": (39.905, 32.805)}
+    allocation = allocate(drones, _grid(20))
+    assigned = [i for route in allocation.routes.values() for i in route]
+    assert sorted(assigned) == sorted(_grid(20))
+    assert allocation.makespan <= allocation.total
+
+def test_makespan_objective_balances_routes():
+    drones = {"1": (39.90, 32.80), "2": (39.90, 32.801), "3": (39.90, 32.802)}
+    allocation = allocate(drones, _grid(15), objective=OBJECTIVE_MAKESPAN)
+    assert [len(route) for route in allocation.routes.values()] == [5, 5, 5]
+    assert allocation.makespan <= allocate(drones, _grid(15), objective=OBJECTIVE_TOTAL).makespan + 1e-6
+
+def test_total_objective_does_not_pile_onto_nearest_drone():
+    drones = {"1": (39.90, 32.80), "2": (39.95, 32.85)} # Tüm waypointler 1'e çok daha yakın
+    allocation = allocate(drones, _grid(20))
+    limit = default_capacity(OBJECTIVE_TOTAL, 20, 2)
+    assert limit == int(10 * TOTAL_LOAD_FACTOR)
+    assert [len(route) for route in allocation.routes.values()] == [limit, 20 - limit]
+    assert allocation.total <= allocate(drones, _grid(20), objective=OBJECTIVE_MAKESPAN).total + 1e-6
+
+def test_insufficient_capacity_rejected():
+    with pytest.raises(ValueError):
+        allocate({"1": (39.9, 32.8)}, _grid(3), capacity=2)
+    with pytest.raises(ValueError):
+        allocate({"1": (39.9, 32.8)}, _grid(3), objective="bilinmeyen")
+
+def test_reallocate_dropped_only_extends_survivors():
+    waypoint_positions = {str(i): (39.90 + i * 1e-4, 32.80) for i in range(1, 9)}
+    allocation = allocate({"1": (39.90, 32.80), "2": (39.91, 32.80)}, waypoint_positions)
+    allocation.routes = {"1": ["1", "2", "3", "4", "5"], "2": ["8", "7", "6"]}
+    result = reallocate_dropped(allocation, "2", completed=["1", "2"])
+    assert "2" not in result.routes
+    assert result.routes["1"][:3] == ["3", "4", "5"] # Mevcut rota değişmez
+    assert sorted(result.added["1"]) == ["6", "7", "8"]
+    assert result.routes["1"][3:] == result.added["1"]
+
+def test_reallocate_without_survivors_raises():
+    allocation = allocate({"1": (39.90, 32.80)}, _grid(3))
+    with pytest.raises(ValueError):
+        reallocate_dropped(allocation, "1")
@@ -0,0 +1,53 @@
+import pytest
+
+from controllers.tdma import TdmaSchedule
+from controllers.xbee_controller import XBeePackage
+from controllers.loopback_radio import LoopbackAir, LoopbackXBeeModule
+from controllers.timer_wheel import TimerWheel
+
+def test_default_layout_and_slot_indices():
+    schedule = TdmaSchedule("2")
+    assert (schedule.slot_count, schedule.slot_length, schedule.frame_length) == (4, 0.25, 1.0)
+    assert schedule.packets_per_slot == 15 # (0.25 - 0.005) / 0.016
+    assert [TdmaSchedule(node_id).slot_index for node_id in ("0", "1", "2", "3", "4")] == [0, 1, 2, 3, 1]
+    assert 1 <= TdmaSchedule("alpha").slot_index <= 3 # Sayısal olmayan id'ler yer istasyonu penceresine düşmez
+
+def test_slot_window_and_guard_time():
+    schedule = TdmaSchedule("2")
+    assert schedule.slot_window(10.1) == pytest.approx((10.5, 10.745))
+    assert schedule.slot_window(10.6) == pytest.approx((10.5, 10.745))
+    assert schedule.slot_window(10.75) == pytest.approx((11.5, 11.745)) # Koruma süresinde: sıradaki çerçeve
+    assert schedule.in_slot(10.6) and not schedule.in_slot(10.75)
+
+def test_windows_of_swarm_do_not_overlap():
+    schedules = [TdmaSchedule(node_id, expected_nodes=7) for node_id in ("0", "1", "2", "3", "4", "5", "6", "7")]
+    windows = sorted(schedule.slot_window(100.0) for schedule in schedules)
+    assert all(end <= next_start for (_, end), (next_start, _) in zip(windows, windows[1:]))
+
+def test_swarm_size_follows_heard_nodes():
+    schedule = TdmaSchedule("1")
+    for node_id in range(2, 10):
+        schedule.observe_node(str(node_id), now=100.0)
+    schedule.observe_node("0", now=100.0) # Yer istasyonu sayılmaz
+    schedule.update_swarm_size(now=100.0)
+    assert (schedule.slot_count, schedule.slot_length) == (16, 0.0625)
+    schedule.update_swarm_size(now=131.0) # Hepsinin süresi geçti
+    assert schedule.slot_count == 4
+
+def test_frame_stretches_at_min_slot_length():
+    schedule = TdmaSchedule("1", expected_nodes=64)
+    schedule.observe_node("99", now=100.0) # Sabit sürü boyutunda yok sayılır
+    schedule.update_swarm_size(now=100.0)
+    assert (schedule.slot_count, schedule.slot_length) == (128, 0.03)
+    assert schedule.frame_length == pytest.approx(3.84) and schedule.packets_per_slot == 1
+
+def test_module_sends_at_most_packets_per_slot():
+    tdma = TdmaSchedule("1", expected_nodes=64, packet_time=0.01) # 30 ms pencerede 2 paket
+    module = LoopbackXBeeModule(LoopbackAir(), node_id="1", scheduler=TimerWheel(), time_sync=False, tdma=tdma)
+    module.connect()
+    for index in range(5):
+        module.send_data(XBeePackage("W", str(index), {"x": 1, "y": 2, "h": 0}))
+    module._send_slot(slot_end=float("inf"))
+    assert module.pending_count() == 3
+    assert module.send_capacity() == pytest.approx(2 / 3.84)
+    module.disconnect()
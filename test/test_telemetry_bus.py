@@ -0,0 +1,81 @@
+import uuid
+import threading
+
+import pytest
+
+from controllers.telemetry_bus import TelemetryBusWriter, TelemetryBusReader, SEQ, _DRONE_OFFSET
+
+@pytest.fixture
+def bus():
+    writer = TelemetryBusWriter(f"dronecore_test_{uuid.uuid4().hex[:12]}", max_peers=2)
+    reader = TelemetryBusReader(name=writer.name, max_retries=100)
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+def test_unwritten_records_read_as_none(bus):
+    _, reader = bus
+    assert reader.read_state() is None and reader.read_peers() == []
+
+def test_state_round_trip_keeps_unset_fields(bus):
+    writer, reader = bus
+    writer.publish_state(timestamp=100.0, lat=40.1, lon=29.2, rel_alt=20.0, airborne=True,
+                         mission="survey-north", mission_status="running", waypoint_version=7)
+    writer.publish_state(timestamp=101.0, lat=40.2)
+    state = reader.read_state()
+    assert (state.timestamp, state.lat, state.lon, state.airborne) == (101.0, 40.2, 29.2, True)
+    assert (state.mission, state.mission_status, state.waypoint_version) == ("survey-north", "running", 7)
+    assert state.rel_alt == pytest.approx(20.0)
+
+def test_peer_slots_are_reused_and_bounded(bus):
+    writer, reader = bus
+    assert writer.publish_peer("2", 100.0, 40.0, 29.0)
+    assert writer.publish_peer("3", 100.0, 41.0, 30.0)
+    assert writer.publish_peer("2", 101.0, 40.5, 29.5, lat_rate=1e-5)
+    assert not writer.publish_peer("4", 101.0, 42.0, 31.0) # max_peers=2
+    peers = {peer.drone_id: peer for peer in reader.read_peers()}
+    assert set(peers) == {"2", "3"} and peers["2"].lat == 40.5 and peers["2"].lat_rate == 1e-5
+
+def test_torn_or_in_progress_record_is_not_returned(bus):
+    writer, reader = bus
+    writer.publish_state(timestamp=100.0, lat=40.0)
+    seq, crc = SEQ.unpack_from(writer._buf, _DRONE_OFFSET)
+    SEQ.pack_into(writer._buf, _DRONE_OFFSET, seq, crc ^ 1) # Seq yeni, kayıt eski görünen zayıf sıralı okuma
+    with pytest.raises(TimeoutError):
+        reader.read_state()
+    SEQ.pack_into(writer._buf, _DRONE_OFFSET, seq + 1, 0) # Yazım sürüyor
+    with pytest.raises(TimeoutError):
+        reader.read_state()
+    SEQ.pack_into(writer._buf, _DRONE_OFFSET, seq, crc)
+    assert reader.read_state().lat == 40.0
+
+def test_reader_sees_consistent_records_while_writer_runs(bus):
+    writer, reader = bus
+    reader.max_retries = 100000
+    stop = threading.Event()
+
+    def write():
+        value = 0
+        while not stop.is_set():
+            value += 1
+            writer.publish_state(timestamp=float(value), lat=float(value), lon=float(value), abs_alt=float(value))
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        seen = []
+        while len(seen) < 500:
+            state = reader.read_state()
+            if state is not None:
+                assert state.timestamp == state.lat == state.lon == state.abs_alt
+                seen.append(state.timestamp)
+    finally:
+        stop.set()
+        thread.join()
+    assert seen == sorted(seen)
+
+def test_reader_rejects_foreign_segment(bus):
+    writer, _ = bus
+    writer._buf[:4] = b"XXXX" # Başka bir uygulamanın aynı adlı segmenti
+    with pytest.raises(ValueError):
+        TelemetryBusReader(name=writer.name)
@@ -0,0 +1,106 @@
+import pytest
+
+from interface.tile_cache import TileCache, lat_lon_to_world, world_to_lat_lon
+from interface.map_view import douglas_peucker, TrackTrail
+
+def _tile(n, size=100):
+    return bytes([n % 256]) * size
+
+def test_put_get_and_stats(tmp_path):
+    cache = TileCache(str(tmp_path / "tiles.cache"), capacity=4, slot_size=256).open()
+    assert cache.put(16, 1, 2, _tile(1))
+    assert cache.get(16, 1, 2) == _tile(1)
+    assert cache.get(16, 9, 9) is None
+    assert not cache.put(16, 3, 3, _tile(3, 300)) # Yuvaya sığmaz
+    assert (16, 1, 2) in cache and len(cache) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["tiles"], stats["capacity"]) == (1, 1, 1, 4)
+    cache.close()
+
+def test_lru_evicts_only_unpinned_tiles(tmp_path):
+    cache = TileCache(str(tmp_path / "tiles.cache"), capacity=3, slot_size=256).open()
+    cache.put(10, 0, 0, _tile(0), pinned=True)
+    cache.put(10, 1, 0, _tile(1))
+    cache.put(10, 2, 0, _tile(2))
+    cache.get(10, 1, 0) # (10, 2, 0) en eski kullanılan olur
+    assert cache.put(10, 3, 0, _tile(3))
+    assert (10, 2, 0) not in cache
+    assert (10, 0, 0) in cache and (10, 1, 0) in cache
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+def test_put_fails_when_all_slots_pinned(tmp_path):
+    cache = TileCache(str(tmp_path / "tiles.cache"), capacity=2, slot_size=256).open()
+    assert cache.put(10, 0, 0, _tile(0), pinned=True)
+    assert cache.put(10, 1, 0, _tile(1), pinned=True)
+    assert not cache.put(10, 2, 0, _tile(2))
+    assert cache.stats()["pinned"] == 2
+    cache.close()
+
+def test_tiles_and_lru_order_survive_reopen(tmp_path):
+    path = str(tmp_path / "tiles.cache")
+    cache = TileCache(path, capacity=3, slot_size=256).open()
+    cache.put(12, 0, 0, _tile(0), pinned=True)
+    cache.put(12, 1, 0, _tile(1))
+    cache.put(12, 2, 0, _tile(2))
+    cache.get(12, 1, 0)
+    cache.close()
+    reopened = TileCache(path, capacity=99, slot_size=1).open() # Dosyadaki değerler kullanılır
+    assert (reopened.capacity, reopened.slot_size) == (3, 256)
+    assert reopened.get(12, 2, 0) == _tile(2)
+    reopened.put(12, 3, 0, _tile(3))
+    assert (12, 1, 0) not in reopened # Yeniden açınca (12, 2, 0) okunduğu için en eski bu
+    assert reopened.get(12, 0, 0) == _tile(0)
+    reopened.close()
+
+def test_foreign_file_rejected(tmp_path):
+    path = tmp_path / "not-a-cache"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        TileCache(str(path)).open()
+
+def test_seed_directory(tmp_path):
+    root = tmp_path / "tiles"
+    for z, x, y in ((15, 1, 2), (16, 3, 4)):
+        (root / str(z) / str(x)).mkdir(parents=True, exist_ok=True)
+        (root / str(z) / str(x) / f"{y}.png").write_bytes(_tile(z))
+    (root / "16" / "3" / "notes.txt").write_bytes(b"-")
+    cache = TileCache(str(tmp_path / "tiles.cache"), capacity=8, slot_size=256).open()
+    assert cache.seed_directory(str(root), zooms=[16]) == 1
+    assert cache.get(16, 3, 4) == _tile(16)
+    assert cache.stats()["pinned"] == 1
+    cache.close()
+
+def test_world_projection_round_trip():
+    x, y = lat_lon_to_world(39.92, 32.85)
+    assert 0.0 < x < 1.0 and 0.0 < y < 1.0
+    lat, lon = world_to_lat_lon(x, y)
+    assert lat == pytest.approx(39.92) and lon == pytest.approx(32.85)
+
+def test_douglas_peucker_drops_collinear_points():
+    points = [(float(i), 0.0) for i in range(10)]
+    assert douglas_peucker(points, 0.1) == [(0.0, 0.0), (9.0, 0.0)]
+    assert douglas_peucker(points[:2], 0.1) == points[:2]
+
+def test_douglas_peucker_keeps_corners_beyond_tolerance():
+    points = [(0.0, 0.0), (1.0, 0.05), (2.0, 0.0), (3.0, 2.0), (4.0, 0.0)]
+    assert douglas_peucker(points, 0.1) == [(0.0, 0.0), (2.0, 0.0), (3.0, 2.0), (4.0, 0.0)]
+    assert douglas_peucker(points, 5.0) == [(0.0, 0.0), (4.0, 0.0)]
+
+def test_track_trail_chunks_join_into_one_run():
+    trail = TrackTrail(max_points=1000, chunk_size=8)
+    for i in range(30):
+        trail.append(39.9 + i * 1e-4, 32.8 + (i % 2) * 1e-4) # Zikzak; sadeleştirmede kaybolmaz
+    trail.append(39.9 + 29 * 1e-4, 32.8 + 1e-4) # Aynı nokta eklenmez
+    everything = (0.0, 0.0, 1.0, 1.0)
+    runs = trail.visible_runs(22, everything, tolerance_px=0.5)
+    assert len(runs) == 1
+    assert len(runs[0]) == 30
+    assert trail.visible_runs(22, (0.0, 0.0, 0.1, 0.1)) == [] # Ekran dışında
+
+def test_track_trail_drops_oldest_chunks():
+    trail = TrackTrail(max_points=16, chunk_size=8)
+    for i in range(100):
+        trail.append(39.9 + i * 1e-4, 32.8)
+    assert len(trail.chunks) == 2
+    assert len(trail) <= 17
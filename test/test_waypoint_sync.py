@@ -0,0 +1,95 @@
+from controllers.xbee_controller import XBeePackage, ReceivedPackage, MAX_PAYLOAD_SIZE
+from controllers.waypoint_controller import waypoints
+from controllers.waypoint_sync import WaypointSyncServer, WaypointSyncClient, SYNC_ACK
+
+ALT = 10.0
+
+def _over_air(package):
+    """Paketi kodlayıp çözer (radyodan geçmiş gibi); 72 bayt sınırını da doğrular."""
+    frame = bytes(package)
+    assert len(frame) <= MAX_PAYLOAD_SIZE
+    return ReceivedPackage.from_frame(frame)
+
+def _deliver_to_drone(client, store, packages, now):
+    """Drone tarafındaki mesaj döngüsünün 'W' ve 'S' işleyişi; yer istasyonuna gidecek paketleri döndürür."""
+    replies = []
+    for package in packages:
+        record = _over_air(package)
+        if record.package_type == "W":
+            lat, lon = record.params["x"] / 1e6, record.params["y"] / 1e6
+            if not client.stage(record.sender, lat, lon, ALT, record.params["h"], now=now):
+                store.add(record.sender, lat, lon, ALT, record.params["h"])
+        else:
+            replies.extend(client.handle(record, now=now))
+    return replies
+
+def _sync(server, client, drone_store, now=0.0, max_rounds=20):
+    """Özetten başlayarak oturumu sonuna kadar yürütür; giden paket sayısını döndürür."""
+    sent = 0
+    to_drone = [server.summary_package()]
+    for _ in range(max_rounds):
+        if not to_drone:
+            break
+        sent += len(to_drone)
+        to_ground = _deliver_to_drone(client, drone_store, to_drone, now)
+        to_drone = []
+        for package in to_ground:
+            to_drone.extend(server.handle(_over_air(package)))
+    return sent
+
+def _populate(store, count, offset=0.0):
+    for i in range(1, count + 1):
+        store.add(str(i), 39.9 + i * 1e-4 + offset, 32.8 + i * 1e-4, ALT, i % 360)
+
+def _same(a, b):
+    return a.root_hash() == b.root_hash() and set(a.list) == set(b.list)
+
+def test_empty_drone_receives_all_waypoints():
+    ground, drone = waypoints(), waypoints()
+    _populate(ground, 40)
+    server = WaypointSyncServer(ground)
+    client = WaypointSyncClient(drone, sender="3")
+    _sync(server, client, drone)
+    assert _same(ground, drone)
+    assert drone.version == ground.version
+    assert not server.needs_sync("3")
+    assert not client.active
+
+def test_in_sync_drone_only_acks():
+    ground, drone = waypoints(), waypoints()
+    _populate(ground, 20)
+    _populate(drone, 20)
+    server = WaypointSyncServer(ground)
+    client = WaypointSyncClient(drone, sender="3")
+    replies = client.handle(_over_air(server.summary_package()), now=0.0)
+    assert [reply.params["f"] for reply in replies] == [SYNC_ACK]
+
+def test_single_change_sends_only_changed_waypoint():
+    ground, drone = waypoints(), waypoints()
+    _populate(ground, 200)
+    _populate(drone, 200)
+    ground.add("57", 40.0, 33.0, ALT, 90)
+    ground.remove("120")
+    server = WaypointSyncServer(ground)
+    client = WaypointSyncClient(drone, sender="3")
+    sent = _sync(server, client, drone)
+    assert _same(ground, drone)
+    assert drone.read("57").lat == 40.0
+    assert "120" not in drone.list
+    assert sent < 20 # Tüm liste yerine sadece farklı dallar
+
+def test_w_outside_session_is_applied_directly():
+    drone = waypoints()
+    client = WaypointSyncClient(drone, sender="3")
+    _deliver_to_drone(client, drone, [XBeePackage("W", sender="5", params={"x": 39900000, "y": 32800000, "h": 0})], now=0.0)
+    assert drone.read("5").lat == 39.9
+
+def test_session_timeout_applies_staged_waypoints():
+    ground, drone = waypoints(), waypoints()
+    _populate(ground, 3)
+    client = WaypointSyncClient(drone, sender="3", session_timeout=5.0)
+    client.handle(_over_air(WaypointSyncServer(ground).summary_package()), now=0.0)
+    assert client.stage("1", 39.9, 32.8, ALT, 0, now=1.0)
+    assert "1" not in drone.list
+    assert not client.stage("2", 39.9, 32.8, ALT, 0, now=10.0) # Oturum zaman aşımına uğradı
+    assert "1" in drone.list
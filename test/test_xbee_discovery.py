@@ -0,0 +1,80 @@
+
+from controllers import xbee_discovery
+from controllers.xbee_discovery import (XBeeLink, serial_port_of, candidate_ports, discover_xbee, load_cached_link,
+                                        save_cached_link, _valid_api_response, _probe_api)
+
+def _api_frame(frame: bytes) -> bytes:
+    return bytes([0x7E, 0x00, len(frame)]) + frame + bytes([0xFF - (sum(frame) & 0xFF)])
+
+def test_serial_port_of():
+    assert serial_port_of("serial:///dev/ttyACM0:115200") == "/dev/ttyACM0"
+    assert serial_port_of("serial:///dev/ttyACM0") == "/dev/ttyACM0"
+    assert serial_port_of("udpin://0.0.0.0:14540") is None and serial_port_of(None) is None
+
+def test_candidate_ports_rank_and_exclude(monkeypatch):
+    devices = {"/dev/ttyUSB*": ["/dev/ttyUSB1", "/dev/ttyUSB0"], "/dev/ttyACM*": ["/dev/ttyACM0"],
+               "/dev/ttyAMA*": ["/dev/ttyAMA0"], "/dev/serial0": [], "/dev/ttyS0": []}
+    monkeypatch.setattr(xbee_discovery.platform, "system", lambda: "Linux")
+    monkeypatch.setattr(xbee_discovery.glob, "glob", lambda pattern: list(devices[pattern]))
+    ports = candidate_ports(exclude=["/dev/ttyUSB1"], prefer=["/dev/ttyAMA0"])
+    assert ports == ["/dev/ttyAMA0", "/dev/ttyUSB0", "/dev/ttyACM0"] # Önbellekteki önce, uçuş kontrolcüsü hariç
+
+def test_valid_api_response_needs_checksum_and_ap_reply():
+    reply = _api_frame(b"\x88\x01AP\x00\x01")
+    assert _valid_api_response(b"\x00garbage" + reply)
+    assert not _valid_api_response(reply[:-1] + bytes([reply[-1] ^ 1])) # Bozuk checksum
+    assert not _valid_api_response(_api_frame(b"\x88\x01ID\x00\x01"))
+
+class FakeSerial:
+    '''Sorguya hazır cevap veren seri port yerine geçen nesne.'''
+    def __init__(self, reply: bytes):
+        self.reply = reply
+        self.written = b""
+        self._pending = b""
+
+    @property
+    def in_waiting(self):
+        return len(self._pending)
+
+    def reset_input_buffer(self):
+        self._pending = b""
+
+    def write(self, data):
+        self.written += data
+        self._pending += self.reply
+
+    def flush(self):
+        pass
+
+    def read(self, size):
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+def test_probe_api():
+    assert _probe_api(FakeSerial(_api_frame(b"\x88\x01AP\x00\x01"))) == "api"
+    assert _probe_api(FakeSerial(b"")) is None
+
+def test_cached_link_round_trip(tmp_path):
+    path = str(tmp_path / "cache" / "xbee_link.json")
+    assert load_cached_link(path) is None
+    save_cached_link(XBeeLink("/dev/ttyUSB0", 9600, "at"), path)
+    link = load_cached_link(path)
+    assert (link.port, link.baudrate, link.mode) == ("/dev/ttyUSB0", 9600, "at")
+
+def test_discover_uses_cache_first_then_probes_and_saves(monkeypatch, tmp_path):
+    path = str(tmp_path / "xbee_link.json")
+    probed = []
+    def probe_port(port, baud_rates, try_at_mode=True, stop_event=None, try_api_mode=True):
+        probed.append((port, tuple(baud_rates)))
+        return XBeeLink(port, 57600, "api") if port == "/dev/ttyUSB1" else None
+    monkeypatch.setattr(xbee_discovery, "probe_port", probe_port)
+
+    save_cached_link(XBeeLink("/dev/ttyUSB1", 57600, "api"), path)
+    assert discover_xbee(ports=["/dev/ttyUSB0"], cache_path=path).port == "/dev/ttyUSB1"
+    assert probed == [("/dev/ttyUSB1", (57600,))] # Önbellekteki port tek sorguyla doğrulandı
+
+    probed.clear()
+    link = discover_xbee(ports=["/dev/ttyUSB0", "/dev/ttyUSB1", "/dev/ttyACM0"], cache_path=path, use_cache=False,
+                         exclude=["/dev/ttyACM0"])
+    assert link.port == "/dev/ttyUSB1" and "/dev/ttyACM0" not in [port for port, _ in probed]
+    assert load_cached_link(path).port == "/dev/ttyUSB1"
@@ -0,0 +1,69 @@
+import pytest
+
+from controllers.xbee_controller import XBeePackage
+from controllers.xbee_multilink import XBeeMultiLink
+from controllers.loopback_radio import LoopbackAir, LoopbackXBeeModule
+from controllers.timer_wheel import TimerWheel
+
+def _pump(modules):
+    while any([module._send_tick() for module in modules]):
+        pass
+
+@pytest.fixture
+def bonded():
+    # Yer istasyonu iki radyoyla iki ayrı kanalda; drone 1 her iki kanalda da bir radyoya sahip
+    scheduler = TimerWheel() # Başlatılmaz; paketler _pump ile gönderilir
+    airs = [LoopbackAir(), LoopbackAir()]
+    link = XBeeMultiLink(["radio-a", "radio-b"], type_routes={"G": 0, "O": 1}, module_cls=LoopbackXBeeModule,
+                         node_id="0", scheduler=scheduler, time_sync=False)
+    for radio, air in zip(link.links, airs):
+        radio.air = air
+    drone = [LoopbackXBeeModule(air, node_id="1", scheduler=scheduler, time_sync=False, relay_types={"G"})
+             for air in airs]
+    link.connect()
+    for radio in drone:
+        radio.connect()
+    yield link, drone
+    link.disconnect()
+    for radio in drone:
+        radio.disconnect()
+
+def _drain(module):
+    records = []
+    while (record := module.read_received_data()) is not None:
+        records.append(record)
+    return records
+
+def test_copies_from_both_radios_are_read_once(bonded):
+    link, drone = bonded
+    for radio in drone:
+        radio.send_data(XBeePackage("W", "7", {"x": 1, "y": 2, "h": 0})) # Sıra numarasız: zaman penceresiyle
+        radio.send_data(XBeePackage("G", "1", {"x": 1, "y": 2})) # Sıra numaralı: ortak SeenCache ile
+    _pump(drone)
+    assert sorted(record.package_type for record in _drain(link)) == ["G", "W"]
+    assert link.duplicate_count == 1
+    assert sum(radio.relay_stats["duplicates"] for radio in link.links) == 1
+
+def test_type_routes_and_least_loaded_choice(bonded):
+    link, _ = bonded
+    link.send_data(XBeePackage("G", "0", {"x": 1, "y": 2}))
+    link.send_data(XBeePackage("O", "1", {"w": [1]}))
+    link.send_data(XBeePackage("W", "2", {"x": 1, "y": 2, "h": 0})) # Rotası yok: kuyruklar eşit, ilk radyo
+    assert [len(radio.send_queue) for radio in link.links] == [2, 1]
+    assert link.pending_count() == 3
+
+def test_failover_moves_pending_packets(bonded):
+    link, _ = bonded
+    link.send_data(XBeePackage("G", "0", {"x": 1, "y": 2}))
+    link.links[0].xbee_device.close() # Port düştü
+    link.send_data(XBeePackage("G", "0", {"x": 3, "y": 4})) # 'G' rotası kapalı: çalışan radyoya
+    assert len(link.links[0].send_queue) == 0 and len(link.links[1].send_queue) == 2
+    assert link.active_links() == [link.links[1]]
+
+def test_unicast_uses_the_radio_that_knows_the_drone(bonded):
+    link, drone = bonded
+    drone[1].send_data(XBeePackage("G", "1", {"x": 1, "y": 2})) # Sadece ikinci kanalda duyuldu
+    _pump(drone)
+    _drain(link)
+    link.send_data(XBeePackage("W", "3", {"x": 1, "y": 2, "h": 0}), drone_id="1")
+    assert link.links[1].send_queue[0][1].upper() == drone[1].xbee_device.address_hex
@@ -0,0 +1,85 @@
+import time
+import threading
+import multiprocessing
+from functools import partial
+
+from controllers.xbee_controller import XBeePackage, ReceivedPackage
+from controllers.loopback_radio import LoopbackAir, LoopbackXBeeModule
+from controllers.xbee_process import _radio_process_main, XBeeProcessModule
+
+class CapturingModule(LoopbackXBeeModule):
+    '''Radyo döngüsünün oluşturduğu modüle testten erişmek için.'''
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instances.append(self)
+
+def _next(conn, kind, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if conn.poll(0.05):
+            message = conn.recv()
+            if message[0] == kind:
+                return message
+    raise AssertionError(f"'{kind}' mesajı gelmedi")
+
+def _start_loop(air):
+    parent, child = multiprocessing.Pipe()
+    CapturingModule.instances.clear()
+    loop = threading.Thread(target=_radio_process_main, daemon=True,
+                            args=(child, {"port": "loop", "node_id": "1"}, 0.005, partial(CapturingModule, air)))
+    loop.start()
+    parent.send(("connect",))
+    assert _next(parent, "connected")[1] is True
+    return parent, loop
+
+def test_paramless_frame_crosses_the_pipe():
+    air = LoopbackAir()
+    parent, loop = _start_loop(air)
+    ground = air.attach(None)
+    air.transmit(ground, b'{"t":"H","s":"0"}') # LinkSupervisor kalp atışı gibi
+    record = _next(parent, "received")[1][0]
+    assert (record.package_type, record.sender, record.params) == ("H", "0", {})
+    air.transmit(ground, b'{"t":"G","s":"0","p":{"x":1}}')
+    assert _next(parent, "received")[1][0].params == {"x": 1}
+    parent.send(("stop",))
+    loop.join(timeout=5.0)
+    assert not loop.is_alive()
+
+def test_unpicklable_record_does_not_kill_the_loop():
+    air = LoopbackAir()
+    parent, loop = _start_loop(air)
+    module = CapturingModule.instances[0]
+    module.received_queue.put(ReceivedPackage("X", "9", {"lock": threading.Lock()}, timestamp=time.time()))
+    module.received_queue.put(ReceivedPackage("Y", "9", {"a": 1}, timestamp=time.time()))
+    assert [record.package_type for record in _next(parent, "received")[1]] == ["Y"]
+    assert loop.is_alive()
+    parent.send(("stop",))
+    loop.join(timeout=5.0)
+
+def _wait(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+def test_outbox_flushed_after_reconnect():
+    radio = XBeeProcessModule(port="loop", module_cls=LoopbackXBeeModule, node_id="1", send_interval=0.01)
+    try:
+        radio.send_data(XBeePackage("G", "1", {"x": 1}))
+        assert radio.pending_count() == 1 # Süreç yok; paket bekler
+        assert radio.connect()
+        assert _wait(lambda: radio.pending_count() == 0)
+
+        radio._process.terminate()
+        radio._process.join(timeout=5.0)
+        assert _wait(lambda: not radio.is_connected())
+        radio.send_data(XBeePackage("G", "1", {"x": 2}))
+        assert radio.pending_count() == 1
+        assert radio.connect() # Yeni radyo süreci
+        assert _wait(lambda: radio.pending_count() == 0)
+    finally:
+        radio.close()